@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+AD_DETAIL_CACHE_KEY = 'ads:detail:{}'
+AD_DETAIL_LOCK_KEY = 'ads:detail:{}:lock'
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_cached_ad_detail(ad_id, compute):
+    """
+    Zwraca zserializowane ogłoszenie z cache, a przy braku wpisu liczy je
+    ``compute()``. Tylko proces, który zdobędzie blokadę (``cache.add``),
+    odpytuje bazę - pozostali czekają chwilę na jego wynik.
+    """
+    key = AD_DETAIL_CACHE_KEY.format(ad_id)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    lock_key = AD_DETAIL_LOCK_KEY.format(ad_id)
+    if cache.add(lock_key, 1, settings.AD_DETAIL_CACHE_LOCK_TIMEOUT):
+        try:
+            data = compute()
+            cache.set(key, data, settings.AD_DETAIL_CACHE_TIMEOUT)
+            return data
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + settings.AD_DETAIL_CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        data = cache.get(key)
+        if data is not None:
+            return data
+        if cache.get(lock_key) is None:
+            break
+    return compute()
+
+
+def invalidate_ad_detail(ad_id):
+    cache.delete(AD_DETAIL_CACHE_KEY.format(ad_id))
@@ -0,0 +1,91 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Case, F, IntegerField, Value, When
+from .models import Ad
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounterBuffer:
+    """
+    Zlicza wyświetlenia ogłoszeń w pamięci procesu i zapisuje je jednym
+    UPDATE, gdy bufor osiągnie AD_VIEW_FLUSH_THRESHOLD wyświetleń albo minie
+    AD_VIEW_FLUSH_INTERVAL sekund od ostatniego zapisu. Termin pilnuje też
+    wątek w tle, więc bufor jest zapisywany również wtedy, gdy ruch ustanie.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    def record(self, ad_id):
+        with self._lock:
+            self._counts[ad_id] += 1
+            self._pending += 1
+            if self._timer is None:
+                self._timer = threading.Thread(target=self.run_timer, name='ad-view-flush', daemon=True)
+                self._timer.start()
+            due = (
+                self._pending >= settings.AD_VIEW_FLUSH_THRESHOLD
+                or time.monotonic() - self._last_flush >= settings.AD_VIEW_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def run_timer(self):
+        while True:
+            time.sleep(settings.AD_VIEW_FLUSH_INTERVAL or 1)
+            try:
+                self.flush_if_due()
+            except Exception:
+                # Wątek musi przeżyć błąd pojedynczego zapisu, inaczej bufor znów czekałby na ruch.
+                logger.exception("Nie udało się zapisać bufora wyświetleń ogłoszeń.")
+
+    def flush_if_due(self):
+        with self._lock:
+            due = self._pending and time.monotonic() - self._last_flush >= settings.AD_VIEW_FLUSH_INTERVAL
+        if not due:
+            return 0
+        try:
+            return self.flush()
+        finally:
+            # Połączenie wątku w tle nie jest zamykane przez obsługę żądań.
+            connection.close()
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._pending = 0
+            self._last_flush = time.monotonic()
+        if not counts:
+            return 0
+
+        increment = Case(
+            *[When(pk=ad_id, then=Value(count)) for ad_id, count in counts.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        try:
+            Ad.objects.filter(pk__in=list(counts)).update(view_count=F('view_count') + increment)
+        except DatabaseError:
+            # Utrata ograniczona do jednej partii - nie ponawiamy, żeby bufor nie rósł bez końca.
+            logger.exception("Nie udało się zapisać %s wyświetleń ogłoszeń.", sum(counts.values()))
+            return 0
+        return sum(counts.values())
+
+
+view_counter = ViewCounterBuffer()
+atexit.register(view_counter.flush)
@@ -0,0 +1,138 @@
+import csv
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Ad, AdTombstone
+from .serializers import AdRowSerializer
+
+EXPORT_FIELDS = [
+    'id', 'title', 'description', 'price', 'category', 'city', 'street', 'postal_code',
+    'image', 'image_renditions', 'user', 'created_at', 'updated_at',
+]
+# Eksport przyrostowy zawiera też ogłoszenia wyłączone i usunięte, żeby kopia mogła je zdjąć.
+INCREMENTAL_EXPORT_FIELDS = EXPORT_FIELDS + ['is_active', 'deleted']
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+# Wiersze są sklejane w większe fragmenty, żeby nie wysyłać każdego osobno.
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+class LineBuffer:
+    # Cel dla csv.writer - zwraca zapisaną linię zamiast ją buforować.
+    def write(self, value):
+        return value
+
+
+def parse_updated_since(value):
+    """
+    Parsuje ``updated_since`` (ISO 8601). Starsza data niż okres przechowywania
+    śladów usunięć jest odrzucana - kopia nie dowiedziałaby się o części usunięć.
+    """
+    try:
+        updated_since = parse_datetime(value)
+    except ValueError:
+        updated_since = None
+    if updated_since is None:
+        raise ValueError("Nieprawidłowa data, oczekiwany format ISO 8601.")
+    if timezone.is_naive(updated_since):
+        updated_since = timezone.make_aware(updated_since)
+    cutoff = timezone.now() - timedelta(days=settings.AD_TOMBSTONE_RETENTION_DAYS)
+    if updated_since < cutoff:
+        raise ValueError(
+            f"Eksport przyrostowy obejmuje najwyżej {settings.AD_TOMBSTONE_RETENTION_DAYS} dni - "
+            f"pobierz pełny eksport."
+        )
+    return updated_since
+
+
+def export_queryset(updated_since=None):
+    queryset = Ad.objects.all()
+    if updated_since is None:
+        queryset = queryset.filter(is_active=True)
+    else:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+    # Porządek po (updated_at, id) korzysta z indeksu i pozwala klientowi zapamiętać ostatni znacznik czasu.
+    return queryset.order_by('updated_at', 'id')
+
+
+def iter_export(fmt, updated_since=None, request=None, chunk_size=None):
+    """
+    Generuje eksport ogłoszeń w formacie NDJSON lub CSV. Wiersze pochodzą
+    z kursora po stronie serwera (``iterator(chunk_size)``), więc zużycie
+    pamięci nie zależy od wielkości katalogu.
+
+    Pełny eksport zawiera tylko aktywne ogłoszenia. Z ``updated_since``
+    dochodzą wyłączone (``is_active``) oraz usunięte od tej chwili
+    (``deleted``, tylko ``id`` i ``updated_at`` - czas usunięcia). Ślady
+    usunięć są przechowywane AD_TOMBSTONE_RETENTION_DAYS dni.
+    """
+    chunk_size = chunk_size or settings.AD_EXPORT_CHUNK_SIZE
+    fields = EXPORT_FIELDS if updated_since is None else INCREMENTAL_EXPORT_FIELDS
+    serializer = AdRowSerializer(EXPORT_FIELDS + ['is_active'], context={'request': request})
+    queryset = export_queryset(updated_since)
+    rows = queryset.values(*serializer.get_columns(queryset)).iterator(chunk_size=chunk_size)
+    items = (item for row in rows for item in serializer.to_representation([row]))
+    if updated_since is not None:
+        items = chain_tombstones(items, serializer, updated_since, chunk_size)
+    lines = iter_csv_lines(items, fields) if fmt == 'csv' else iter_ndjson_lines(items, fields)
+
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= WRITE_BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def aiter_chunks(chunks):
+    """
+    Podaje fragmenty ``iter_export`` serwerowi ASGI. Django czyta synchroniczny
+    strumień pod ASGI przez ``sync_to_async(list)``, czyli cały eksport trafiłby
+    do pamięci przed pierwszym bajtem - tu każdy fragment jest pobierany osobno.
+    Wszystkie wywołania idą do jednego wątku (``thread_sensitive``), więc kursor
+    po stronie serwera zostaje na tym samym połączeniu z bazą.
+    """
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+def chain_tombstones(items, serializer, updated_since, chunk_size):
+    for item in items:
+        item['deleted'] = False
+        yield item
+    convert_datetime = dict(serializer.converters)['updated_at']
+    tombstones = (
+        AdTombstone.objects.filter(deleted_at__gte=updated_since)
+        .order_by('deleted_at', 'id').values_list('ad_id', 'deleted_at')
+    )
+    for ad_id, deleted_at in tombstones.iterator(chunk_size=chunk_size):
+        yield {'id': ad_id, 'updated_at': convert_datetime(deleted_at), 'deleted': True}
+
+
+def iter_ndjson_lines(items, fields):
+    for item in items:
+        item = {name: item[name] for name in fields if name in item}
+        yield json.dumps(item, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def iter_csv_lines(items, fields):
+    writer = csv.writer(LineBuffer())
+    yield writer.writerow(fields)
+    for item in items:
+        yield writer.writerow([
+            json.dumps(value, separators=(',', ':')) if isinstance(value, dict) else value
+            for value in (item.get(name) for name in fields)
+        ])
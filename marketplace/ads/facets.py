@@ -0,0 +1,92 @@
+import hashlib
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+FACETS = ('category', 'city', 'price')
+IGNORED_PARAMS = ('cursor', 'page_size', 'ordering', 'facets')
+
+
+def parse_price_buckets(raw):
+    if not raw:
+        return [Decimal(edge) for edge in settings.AD_FACET_PRICE_BUCKETS]
+    try:
+        edges = sorted({Decimal(edge.strip()) for edge in raw.split(',') if edge.strip()})
+    except InvalidOperation:
+        raise ValueError("Nieprawidłowe progi cenowe.")
+    # 'inf' i 'NaN' przechodzą przez Decimal, ale nie dają się zapisać w JSON.
+    if not edges or len(edges) > settings.AD_FACET_MAX_PRICE_BUCKETS or not all(edge.is_finite() for edge in edges):
+        raise ValueError("Nieprawidłowe progi cenowe.")
+    return edges
+
+
+def facets_cache_key(query_params):
+    normalized = sorted(
+        (key, sorted(query_params.getlist(key)))
+        for key in query_params
+        if key not in IGNORED_PARAMS
+    )
+    digest = hashlib.md5(json.dumps(normalized).encode('utf-8')).hexdigest()
+    return f'ads:facets:{digest}'
+
+
+def category_facet(queryset):
+    rows = queryset.order_by().values('category_id').annotate(count=Count('id')).order_by('-count', 'category_id')
+    return [{'id': row['category_id'], 'count': row['count']} for row in rows]
+
+
+def city_facet(queryset):
+    rows = queryset.order_by().values('city').annotate(count=Count('id')).order_by('-count', 'city')
+    return [{'value': row['city'], 'count': row['count']} for row in rows[:settings.AD_FACET_CITY_LIMIT]]
+
+
+def price_facet(queryset, edges):
+    # Przedziały są otwarte na krańcach (null) - każda cena trafia do któregoś z nich.
+    bounds = list(zip(edges, edges[1:] + [None]))
+    if edges[0] > 0:
+        bounds.insert(0, (None, edges[0]))
+    aggregates = {}
+    for index, (low, high) in enumerate(bounds):
+        condition = Q()
+        if low is not None:
+            condition &= Q(price__gte=low)
+        if high is not None:
+            condition &= Q(price__lt=high)
+        aggregates[f'bucket_{index}'] = Count('id', filter=condition)
+    counts = queryset.order_by().aggregate(**aggregates)
+    return [
+        {
+            'min': None if low is None else f'{low:.2f}',
+            'max': None if high is None else f'{high:.2f}',
+            'count': counts[f'bucket_{index}'],
+        }
+        for index, (low, high) in enumerate(bounds)
+    ]
+
+
+def compute_facets(queryset, facets, price_edges):
+    result = {}
+    if 'category' in facets:
+        result['category'] = category_facet(queryset)
+    if 'city' in facets:
+        result['city'] = city_facet(queryset)
+    if 'price' in facets:
+        result['price'] = price_facet(queryset, price_edges)
+    return result
+
+
+def get_facets(queryset, query_params):
+    requested = query_params.get('facets')
+    requested = set(requested.split(',')) if requested else set(FACETS)
+    facets = [facet for facet in FACETS if facet in requested]
+    price_edges = parse_price_buckets(query_params.get('price_buckets'))
+
+    key = facets_cache_key(query_params) + ':' + ','.join(facets)
+    result = cache.get(key)
+    if result is None:
+        result = compute_facets(queryset, facets, price_edges)
+        cache.set(key, result, settings.AD_FACETS_CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,71 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F
+from django_filters import rest_framework as django_filters
+from rest_framework import filters
+from categories.models import Category
+from .models import Ad
+
+# Konfiguracja tworzona w migracji 0003_ad_search_vector (unaccent + simple).
+SEARCH_CONFIG = 'polish_unaccent'
+
+
+def filter_category_subtree(queryset, category_id):
+    path = Category.objects.filter(pk=category_id).values_list('path', flat=True).first()
+    if path is None:
+        return queryset.none()
+    return queryset.filter(category__path__startswith=path)
+
+
+class AdFilter(django_filters.FilterSet):
+    category_tree = django_filters.NumberFilter(method='filter_category_tree')
+
+    class Meta:
+        model = Ad
+        fields = ['category', 'city', 'street', 'postal_code', 'price']
+
+    def filter_category_tree(self, queryset, name, value):
+        return filter_category_subtree(queryset, value)
+
+
+class AdSearchFilter(filters.SearchFilter):
+    """
+    Na PostgreSQL wyszukuje po kolumnie ``search_vector`` (indeks GIN)
+    i dodaje adnotację ``search_rank``; na innych bazach zachowuje się
+    jak zwykły SearchFilter (icontains po ``search_fields``).
+    """
+    rank_annotation = 'search_rank'
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        terms = ' '.join(self.get_search_terms(request))
+        if not terms:
+            return queryset
+
+        query = SearchQuery(terms, search_type='websearch', config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            **{self.rank_annotation: SearchRank(F('search_vector'), query)}
+        )
+
+
+class AdOrderingFilter(filters.OrderingFilter):
+    """
+    Bez jawnego ``?ordering=`` wyniki wyszukiwania są sortowane po trafności.
+    ``?ordering=trending`` to skrót dla ``-trending_score`` (najpopularniejsze najpierw).
+    """
+    ordering_aliases = {
+        'trending': '-trending_score',
+        '-trending': 'trending_score',
+    }
+
+    def get_ordering(self, request, queryset, view):
+        rank = AdSearchFilter.rank_annotation
+        if self.ordering_param not in request.query_params and rank in queryset.query.annotations:
+            return [f'-{rank}']
+        return super().get_ordering(request, queryset, view)
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        fields = [self.ordering_aliases.get(field, field) for field in fields]
+        return super().remove_invalid_fields(queryset, fields, view, request)
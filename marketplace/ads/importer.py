@@ -0,0 +1,230 @@
+import codecs
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+from categories.models import Category
+from .caching import invalidate_ad_detail
+from .models import Ad
+from .serializers import AdSerializer
+
+IMPORT_FORMATS = {
+    'csv': ['text/csv', 'application/csv'],
+    'ndjson': ['application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/x-jsonlines'],
+}
+IMPORT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+READ_CHUNK_SIZE = 64 * 1024
+IMPORT_RETRIES = 2
+CONFLICT_MESSAGE = "Nie udało się zapisać wiersza z powodu konfliktu z równoległym importem."
+
+
+class AdImportSerializer(AdSerializer):
+    # Kategorie sprawdzane zbiorem wczytanym raz na partię zamiast zapytania na wiersz.
+    category = serializers.IntegerField()
+    external_id = serializers.CharField(max_length=100, required=False)
+    is_favorite = None
+    image_renditions = None
+
+    class Meta(AdSerializer.Meta):
+        fields = [
+            'external_id', 'title', 'description', 'price', 'is_active',
+            'category', 'city', 'street', 'postal_code',
+        ]
+
+    def validate_category(self, value):
+        if value not in self.context['category_ids']:
+            message = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+            raise serializers.ValidationError(message.format(pk_value=value))
+        return value
+
+
+# Pola, które import może zmienić w istniejącym ogłoszeniu (tylko te obecne w wierszu).
+UPSERT_FIELDS = [name for name in AdImportSerializer.Meta.fields if name != 'external_id']
+
+
+def detect_format(content_type='', filename=''):
+    content_type = content_type.split(';')[0].strip().lower()
+    for name, content_types in IMPORT_FORMATS.items():
+        if content_type in content_types:
+            return name
+    for extension, name in IMPORT_EXTENSIONS.items():
+        if filename.lower().endswith(extension):
+            return name
+    return None
+
+
+def iter_text_lines(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Dekoduje strumień bajtów (plik, ciało żądania) do linii z zachowaniem
+    znaku końca, czytając po ``chunk_size`` bajtów - w pamięci jest najwyżej
+    jeden fragment i niedokończona linia.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def iter_csv_rows(lines):
+    reader = csv.DictReader(lines)
+    for number, row in enumerate(reader, start=1):
+        # Pusta komórka CSV oznacza brak wartości, nie pusty napis.
+        yield number, {key: value for key, value in row.items() if key and value not in ('', None)}, None
+
+
+def iter_ndjson_rows(lines):
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, {'non_field_errors': [f"Nieprawidłowy JSON: {e}"]}
+            continue
+        if not isinstance(row, dict):
+            yield number, None, {'non_field_errors': ["Wiersz musi być obiektem JSON."]}
+            continue
+        yield number, row, None
+
+
+ROW_READERS = {
+    'csv': iter_csv_rows,
+    'ndjson': iter_ndjson_rows,
+}
+
+
+class AdImporter:
+    """
+    Import ogłoszeń partnera: wiersze są walidowane regułami ``AdSerializer``
+    i zapisywane partiami (``bulk_create``/``bulk_update``) z upsertem po
+    ``external_id`` w obrębie użytkownika. Zwraca raport z błędami wierszy.
+
+    Aktualizacja zmienia tylko pola obecne w wierszu - pominięte (np.
+    ``is_active``) zostają bez zmian.
+
+    ``bulk_create`` i ``bulk_update`` nie wysyłają sygnałów - cache szczegółów
+    zaktualizowanych ogłoszeń unieważniamy tutaj, a import nie przyjmuje obrazów.
+    """
+
+    def __init__(self, user, batch_size=None, max_errors=None):
+        self.user = user
+        self.batch_size = batch_size or settings.AD_IMPORT_BATCH_SIZE
+        self.max_errors = settings.AD_IMPORT_MAX_REPORTED_ERRORS if max_errors is None else max_errors
+        self.report = {'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+
+    def run(self, stream, fmt):
+        rows = ROW_READERS[fmt](iter_text_lines(stream))
+        while True:
+            chunk = list(islice(rows, self.batch_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+        return self.report
+
+    def import_chunk(self, chunk):
+        context = {'category_ids': self.get_category_ids(row for _, row, _ in chunk if row)}
+        valid = []
+        for number, row, errors in chunk:
+            if errors is None:
+                serializer = AdImportSerializer(data=row, context=context)
+                if serializer.is_valid():
+                    valid.append((number, serializer.validated_data))
+                    continue
+                errors = serializer.errors
+            self.add_error(number, row, errors)
+        if valid:
+            self.save(valid)
+
+    def get_category_ids(self, rows):
+        candidates = set()
+        for row in rows:
+            try:
+                candidates.add(int(row.get('category')))
+            except (TypeError, ValueError):
+                pass
+        return set(Category.objects.filter(pk__in=candidates).values_list('pk', flat=True))
+
+    def add_error(self, number, row, errors):
+        self.report['failed'] += 1
+        if len(self.report['errors']) < self.max_errors:
+            external_id = row.get('external_id') if row else None
+            self.report['errors'].append({'row': number, 'external_id': external_id, 'errors': errors})
+
+    def save(self, valid):
+        # Równoległy import mógł już dodać ogłoszenie z tym samym external_id (blokada
+        # select_for_update nie obejmuje nieistniejących wierszy) - ponawiamy partię,
+        # a te identyfikatory trafiają wtedy do aktualizacji.
+        for attempt in range(IMPORT_RETRIES + 1):
+            try:
+                with transaction.atomic():
+                    created, updated = self.write([attrs for _, attrs in valid])
+            except IntegrityError:
+                if attempt < IMPORT_RETRIES:
+                    continue
+                for number, attrs in valid:
+                    self.add_error(number, attrs, {'non_field_errors': [CONFLICT_MESSAGE]})
+                return
+            break
+
+        ids = [ad.pk for ad in updated]
+        transaction.on_commit(lambda: [invalidate_ad_detail(pk) for pk in ids])
+        self.report['created'] += created
+        self.report['updated'] += len(updated)
+
+    def get_existing(self, external_ids):
+        return dict(
+            Ad.objects.select_for_update()
+            .filter(user=self.user, external_id__in=external_ids)
+            .values_list('external_id', 'pk')
+        )
+
+    def write(self, valid):
+        new, by_external_id = [], {}
+        for attrs in valid:
+            if attrs.get('external_id'):
+                # Powtórzony identyfikator w partii - wygrywa ostatni wiersz.
+                by_external_id[attrs['external_id']] = attrs
+            else:
+                new.append(attrs)
+
+        existing = self.get_existing(list(by_external_id))
+        now = timezone.now()
+        # Aktualizacja zmienia tylko kolumny obecne w wierszu - bulk_update osobno dla każdego zestawu pól.
+        updates = defaultdict(list)
+        for external_id, attrs in by_external_id.items():
+            if external_id in existing:
+                fields = tuple(name for name in UPSERT_FIELDS if name in attrs)
+                updates[fields].append(self.build(attrs, pk=existing[external_id], updated_at=now))
+            else:
+                new.append(attrs)
+        Ad.objects.bulk_create([self.build(attrs) for attrs in new], batch_size=self.batch_size)
+        updated = []
+        for fields, ads in updates.items():
+            Ad.objects.bulk_update(ads, [*fields, 'updated_at'], batch_size=self.batch_size)
+            updated.extend(ads)
+        return len(new), updated
+
+    def build(self, attrs, **extra):
+        # Nowe ogłoszenie dostaje wartości domyślne pól pominiętych w wierszu.
+        attrs = dict(attrs)
+        return Ad(user=self.user, category_id=attrs.pop('category'), **attrs, **extra)
@@ -0,0 +1,75 @@
+import decimal
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from ads.models import Ad
+from ads.serializers import AD_LIST_FIELDS, AdRowSerializer, AdSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Porównuje koszt serializacji wiersza listy ogłoszeń: AdSerializer "
+        "kontra AdRowSerializer. Dane są generowane w pamięci, bez zapytań do bazy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--fields', default=','.join(AD_LIST_FIELDS))
+
+    def handle(self, *args, **options):
+        fields = [name for name in options['fields'].split(',') if name]
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+        request = RequestFactory().get('/api/ads/', HTTP_HOST=hosts[0] if hosts else 'localhost')
+        context = {'request': request}
+
+        for count in options['rows']:
+            rows = self.build_rows(count)
+            instances = [self.build_instance(row) for row in rows]
+            # Porównujemy czasy tylko wtedy, gdy oba serializatory dają identyczny JSON.
+            renderer = JSONRenderer()
+            expected = renderer.render(AdSerializer(instances, many=True, fields=fields, context=context).data)
+            if renderer.render(AdRowSerializer(fields, context=context).to_representation(rows)) != expected:
+                raise CommandError("AdRowSerializer zwraca inny JSON niż AdSerializer.")
+
+            drf = self.measure(lambda: AdSerializer(instances, many=True, fields=fields, context=context).data, options['repeat'])
+            fast = self.measure(lambda: AdRowSerializer(fields, context=context).to_representation(rows), options['repeat'])
+            self.stdout.write(
+                f"{count} wierszy: AdSerializer {drf / count * 1e6:.1f} µs/wiersz, "
+                f"AdRowSerializer {fast / count * 1e6:.1f} µs/wiersz ({drf / fast:.1f}x)"
+            )
+
+    def build_rows(self, count):
+        now = timezone.now()
+        return [
+            {
+                'id': i, 'title': f'Ogłoszenie {i}', 'description': 'Opis ' * 40,
+                'price': decimal.Decimal(f'{100 + i % 900}.50'), 'created_at': now - timedelta(minutes=i),
+                'updated_at': now, 'is_active': True, 'image': f'ads/images/{i}.jpg' if i % 2 else '',
+                'image_renditions': {},
+                'user': 1 + i % 50, 'category': 1 + i % 20, 'city': 'Kraków',
+                'street': None, 'postal_code': '30-001', 'favorites_count': i % 7,
+                'message_count': i % 3, 'view_count': i, 'is_favorite': bool(i % 5 == 0),
+            }
+            for i in range(count)
+        ]
+
+    def build_instance(self, row):
+        values = {key: value for key, value in row.items() if key not in ('user', 'category', 'is_favorite')}
+        ad = Ad(user_id=row['user'], category_id=row['category'], **values)
+        ad.is_favorite = row['is_favorite']
+        return ad
+
+    def measure(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
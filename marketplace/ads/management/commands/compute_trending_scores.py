@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ads.trending import compute_trending_scores
+
+
+class Command(BaseCommand):
+    help = "Przelicza wskaźnik trending_score ogłoszeń (uruchamiane okresowo, np. z crona)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.TRENDING_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        updated = compute_trending_scores(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Zaktualizowano wskaźnik {updated} ogłoszeń."))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ads.exporter import EXPORT_CONTENT_TYPES, iter_export, parse_updated_since
+
+
+class Command(BaseCommand):
+    help = "Eksportuje aktywne ogłoszenia do NDJSON lub CSV (strumieniowo, kursorem bazy)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_CONTENT_TYPES), default='ndjson')
+        parser.add_argument(
+            '--updated-since',
+            help="Tylko ogłoszenia zmienione od tej chwili (ISO 8601), łącznie z wyłączonymi i usuniętymi.",
+        )
+        parser.add_argument('--output', help="Plik docelowy, domyślnie standardowe wyjście.")
+        parser.add_argument('--chunk-size', type=int, default=settings.AD_EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        updated_since = None
+        if options['updated_since']:
+            try:
+                updated_since = parse_updated_since(options['updated_since'])
+            except ValueError as e:
+                raise CommandError(f"--updated-since: {e}")
+
+        chunks = iter_export(options['format'], updated_since, chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
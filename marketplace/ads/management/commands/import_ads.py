@@ -0,0 +1,42 @@
+import sys
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from ads.importer import ROW_READERS, AdImporter, detect_format
+
+
+class Command(BaseCommand):
+    help = "Importuje ogłoszenia partnera z pliku CSV lub NDJSON (upsert po external_id)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Ścieżka do pliku lub '-' dla standardowego wejścia.")
+        parser.add_argument('--user', required=True, help="Nazwa użytkownika - właściciela ogłoszeń.")
+        parser.add_argument('--format', choices=sorted(ROW_READERS), help="Domyślnie według rozszerzenia pliku.")
+        parser.add_argument('--batch-size', type=int, default=settings.AD_IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Użytkownik {options['user']} nie istnieje.")
+
+        path = options['path']
+        fmt = options['format'] or detect_format(filename=path)
+        if fmt is None:
+            raise CommandError("Nie rozpoznano formatu pliku, podaj --format.")
+
+        importer = AdImporter(user, batch_size=options['batch_size'])
+        if path == '-':
+            report = importer.run(sys.stdin.buffer, fmt)
+        else:
+            with open(path, 'rb') as stream:
+                report = importer.run(stream, fmt)
+
+        for error in report['errors']:
+            self.stderr.write(f"Wiersz {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Utworzono {report['created']}, zaktualizowano {report['updated']}, "
+            f"odrzucono {report['failed']} ogłoszeń."
+        ))
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ads.models import AdTombstone
+from utils.helpers import iter_id_batches
+
+
+class Command(BaseCommand):
+    help = "Usuwa ślady usuniętych ogłoszeń starsze niż AD_TOMBSTONE_RETENTION_DAYS (uruchamiane z crona)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=settings.AD_TOMBSTONE_RETENTION_DAYS)
+        total = 0
+        for ids in iter_id_batches(AdTombstone.objects.filter(deleted_at__lt=cutoff), options['batch_size']):
+            total += AdTombstone.objects.filter(pk__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Usunięto {total} śladów usuniętych ogłoszeń."))
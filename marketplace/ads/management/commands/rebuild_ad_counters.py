@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from ads.models import Ad
+from favorites.models import Favorite
+from messaging.models import Message
+from utils.helpers import iter_id_batches
+
+
+class Command(BaseCommand):
+    help = "Przelicza liczniki favorites_count i message_count ogłoszeń w partiach."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = 0
+        for ids in iter_id_batches(Ad.objects.all(), options['batch_size']):
+            favorites = dict(
+                Favorite.objects.filter(ad_id__in=ids).order_by()
+                .values('ad_id').annotate(count=Count('id')).values_list('ad_id', 'count')
+            )
+            messages = dict(
+                Message.objects.filter(ad_id__in=ids).order_by()
+                .values('ad_id').annotate(count=Count('id')).values_list('ad_id', 'count')
+            )
+            with transaction.atomic():
+                ads = list(Ad.objects.select_for_update().filter(pk__in=ids).only('id'))
+                for ad in ads:
+                    ad.favorites_count = favorites.get(ad.pk, 0)
+                    ad.message_count = messages.get(ad.pk, 0)
+                Ad.objects.bulk_update(ads, ['favorites_count', 'message_count'])
+            total += len(ads)
+        self.stdout.write(self.style.SUCCESS(f"Przeliczono liczniki {total} ogłoszeń."))
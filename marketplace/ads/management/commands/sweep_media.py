@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from utils.storage import sweep_unreferenced_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Usuwa pliki mediów (ogłoszenia, awatary i ich wersje), których nie wskazuje żaden wiersz, "
+        "a które nie zostały usunięte od razu (uruchamiane okresowo, np. z crona)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int, default=settings.MEDIA_RELEASE_GRACE_SECONDS,
+                            help="Pomija pliki użyte w ciągu tylu sekund.")
+
+    def handle(self, *args, **options):
+        deleted = sweep_unreferenced_files(default_storage, options['grace'])
+        self.stdout.write(self.style.SUCCESS(f"Usunięto {deleted} nieużywanych plików."))
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0001_initial'),
+        ('categories', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='ad',
+            name='ads_ad_price_b613fd_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ad',
+            name='ads_ad_created_9f5b83_idx',
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['price', 'id'], name='ads_ad_price_1c2eeb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['created_at', 'id'], name='ads_ad_created_dd4be8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['updated_at', 'id'], name='ads_ad_updated_76be73_idx'),
+        ),
+    ]
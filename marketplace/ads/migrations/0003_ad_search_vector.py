@@ -0,0 +1,72 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:29
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'polish_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION polish_unaccent (COPY = simple);
+            ALTER TEXT SEARCH CONFIGURATION polish_unaccent
+                ALTER MAPPING FOR asciiword, asciihword, hword_asciipart, word, hword, hword_part
+                WITH unaccent, simple;
+        END IF;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION ads_ad_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('polish_unaccent', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('polish_unaccent', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER ads_ad_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, description ON ads_ad
+        FOR EACH ROW EXECUTE FUNCTION ads_ad_search_vector_update()
+    """,
+    # Wyzwalacz liczy wektor tylko przy zmianie tekstu - liczniki i wyniki trendów go nie ruszają.
+    # Przypisanie title = title też uruchamia UPDATE OF title, co wypełnia istniejące wiersze.
+    "UPDATE ads_ad SET title = title",
+    "CREATE INDEX ads_ad_search_vector_gin ON ads_ad USING gin (search_vector)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS ads_ad_search_vector_gin",
+    "DROP TRIGGER IF EXISTS ads_ad_search_vector_trigger ON ads_ad",
+    "DROP FUNCTION IF EXISTS ads_ad_search_vector_update()",
+    "DROP TEXT SEARCH CONFIGURATION IF EXISTS polish_unaccent",
+]
+
+
+def run_postgres_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0002_ad_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(run_postgres_sql(FORWARD_SQL), run_postgres_sql(REVERSE_SQL)),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0004_ad_counters'),
+        ('categories', '0002_category_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['trending_score', 'id'], name='ads_ad_trendin_677f0b_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0005_ad_trending_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0006_ad_view_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0007_ad_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ad',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='ads/images/'),
+        ),
+    ]
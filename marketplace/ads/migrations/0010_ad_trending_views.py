@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:52
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_trending_view_count(apps, schema_editor):
+    # Wyświetlenia sprzed migracji nie trafiają do rankingu jako jednorazowy skok.
+    Ad = apps.get_model('ads', 'Ad')
+    Ad.objects.update(trending_view_count=F('view_count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0009_ad_external_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='trending_computed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='ad',
+            name='trending_view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ad',
+            name='trending_views',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(seed_trending_view_count, migrations.RunPython.noop),
+    ]
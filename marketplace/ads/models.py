@@ -1,4 +1,6 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 
 class Ad(models.Model):
     title = models.CharField(max_length=255)
@@ -7,18 +9,59 @@ class Ad(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
-    image = models.ImageField(upload_to='ads/images/', blank=True, null=True)
+    # Indeks - przy magazynie adresowanym treścią referencje do pliku liczy utils.storage.is_referenced.
+    image = models.ImageField(upload_to='ads/images/', blank=True, null=True, db_index=True)
+    # {"source": <image>, "thumb": {"webp": <nazwa>, "jpeg": <nazwa>}, ...} - uzupełniane przez utils.images;
+    # nazwy wersji to skróty treści w ads/images/renditions/.
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     user = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='ads')
     category = models.ForeignKey('categories.Category', on_delete=models.CASCADE, related_name='ads')
     city = models.CharField(max_length=100)
     street = models.CharField(max_length=255, blank=True, null=True)
     postal_code = models.CharField(max_length=20, blank=True, null=True)
+    # Identyfikator ogłoszenia w systemie partnera - klucz upsertu w imporcie (ads.importer).
+    external_id = models.CharField(max_length=100, blank=True, null=True)
+    # Utrzymywane przez trigger bazy danych; indeks GIN tworzy migracja 0003 (tylko PostgreSQL).
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Liczniki zdenormalizowane - aktualizowane sygnałami przez F(), przeliczane komendą rebuild_ad_counters.
+    favorites_count = models.PositiveIntegerField(default=0, editable=False)
+    message_count = models.PositiveIntegerField(default=0, editable=False)
+    # Zapisywane partiami przez ads.counters.view_counter.
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    # Przeliczane okresowo komendą compute_trending_scores.
+    trending_score = models.FloatField(default=0, editable=False)
+    # Stan składnika wyświetleń w trending_score: zanikająca suma wyświetleń, view_count
+    # z ostatniego przeliczenia i jego czas (ads.trending.save_trending_scores).
+    trending_views = models.FloatField(default=0, editable=False)
+    trending_view_count = models.PositiveIntegerField(default=0, editable=False)
+    trending_computed_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         indexes = [
-            models.Index(fields=['price']),  
-            models.Index(fields=['created_at']), 
+            models.Index(fields=['price', 'id']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['favorites_count', 'id']),
+            models.Index(fields=['message_count', 'id']),
+            models.Index(fields=['trending_score', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'external_id'],
+                condition=Q(external_id__isnull=False),
+                name='ad_user_external_id_unique',
+            ),
         ]
     
     def __str__(self):
         return self.title
+
+
+class AdTombstone(models.Model):
+    # Ślad usuniętego ogłoszenia dla przyrostowego eksportu (ads.exporter); usuwany
+    # po AD_TOMBSTONE_RETENTION_DAYS komendą purge_ad_tombstones.
+    ad_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.ad_id} ({self.deleted_at})"
@@ -1,14 +1,29 @@
-from rest_framework import serializers
+import decimal
+
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from utils.images import ImageRenditionsField
+from utils.sparse_fields import SparseFieldsSerializerMixin
 from .models import Ad
 
-class AdSerializer(serializers.ModelSerializer):
+# Karta ogłoszenia na liście - bez opisu, który stanowi większość danych.
+AD_LIST_FIELDS = ['id', 'title', 'price', 'city', 'image', 'image_renditions', 'category', 'created_at', 'is_favorite']
+
+
+class AdSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    # Obecne tylko, gdy widok dodał adnotację (zalogowany użytkownik).
+    is_favorite = serializers.BooleanField(read_only=True)
+    image_renditions = ImageRenditionsField(storage=Ad._meta.get_field('image').storage)
+
     class Meta:
         model = Ad
         fields = [
             'id', 'title', 'description', 'price', 'created_at', 'updated_at',
-            'is_active', 'image', 'user', 'category', 'city', 'street', 'postal_code'
+            'is_active', 'image', 'image_renditions', 'user', 'category', 'city', 'street', 'postal_code',
+            'favorites_count', 'message_count', 'view_count', 'is_favorite'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'user']
+        read_only_fields = ['created_at', 'updated_at', 'user', 'favorites_count', 'message_count', 'view_count']
         extra_kwargs = {
             'price': {'required': True, 'min_value': 5.00},
             'image': {'required': False}
@@ -18,3 +33,101 @@ class AdSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError("Cena musi być większa niż 0.")
         return value
+
+    def update(self, instance, validated_data):
+        # Zapisujemy tylko zmienione kolumny - pełny zapis wiersza nadpisałby liczniki
+        # zwiększane równolegle przez F(), view_count z ads.counters i trending_score.
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+
+class AdRowSerializer:
+    """
+    Szybka serializacja list tylko do odczytu: słowniki z ``values()`` są
+    zamieniane konwerterami przygotowanymi raz na żądanie, a wynik jest
+    identyczny z ``AdSerializer(fields=...).data``.
+    """
+
+    def __init__(self, fields=None, context=None):
+        self.template = AdSerializer(fields=fields, context=context or {})
+        self.request = self.template.context.get('request')
+        self.converters = [
+            (name, self.build_converter(field)) for name, field in self.template.fields.items()
+        ]
+
+    def get_columns(self, queryset):
+        concrete = {field.name for field in Ad._meta.concrete_fields}
+        annotations = queryset.query.annotations
+        return [name for name, _ in self.converters if name in concrete or name in annotations]
+
+    def to_representation(self, rows):
+        converters = self.converters
+        data = []
+        for row in rows:
+            item = {}
+            for name, convert in converters:
+                if name not in row:
+                    continue
+                value = row[name]
+                item[name] = None if value is None else convert(value)
+            data.append(item)
+        return data
+
+    def build_converter(self, field):
+        if isinstance(field, serializers.DecimalField):
+            return self.decimal_converter(field)
+        if isinstance(field, serializers.DateTimeField):
+            return self.datetime_converter(field)
+        if isinstance(field, serializers.FileField):
+            return self.file_converter(field)
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            # values() zwraca już wartość klucza obcego.
+            return lambda value: value
+        if type(field) is serializers.CharField:
+            return str
+        return field.to_representation
+
+    def decimal_converter(self, field):
+        coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        if not coerce_to_string or field.localize:
+            return field.to_representation
+        exponent = decimal.Decimal('.1') ** field.decimal_places
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+
+        def convert(value):
+            if not isinstance(value, decimal.Decimal):
+                value = decimal.Decimal(str(value).strip())
+            return '{:f}'.format(value.quantize(exponent, rounding=field.rounding, context=context))
+        return convert
+
+    def datetime_converter(self, field):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            if not timezone.is_aware(value):
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return convert
+
+    def file_converter(self, field):
+        if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+            return lambda name: name or None
+        storage = Ad._meta.get_field(field.source).storage
+        build_absolute_uri = self.request.build_absolute_uri if self.request is not None else None
+
+        def convert(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            return build_absolute_uri(url) if build_absolute_uri else url
+        return convert
@@ -0,0 +1,41 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from utils.images import schedule_renditions
+from utils.storage import release_deleted_file, release_replaced_file, remember_file
+from .caching import invalidate_ad_detail
+from .models import Ad, AdTombstone
+
+@receiver(post_save, sender=Ad)
+@receiver(post_delete, sender=Ad)
+def invalidate_ad_detail_cache(sender, instance, **kwargs):
+    invalidate_ad_detail(instance.pk)
+    # Ponownie po commicie - równoległy odczyt mógł w międzyczasie zapisać starą wersję.
+    transaction.on_commit(partial(invalidate_ad_detail, instance.pk))
+
+
+@receiver(post_delete, sender=Ad)
+def record_ad_tombstone(sender, instance, **kwargs):
+    AdTombstone.objects.create(ad_id=instance.pk)
+
+
+@receiver(post_save, sender=Ad)
+def generate_image_renditions(sender, instance, **kwargs):
+    schedule_renditions(instance, 'image', 'image_renditions')
+
+
+@receiver(post_init, sender=Ad)
+def remember_image_file(sender, instance, **kwargs):
+    remember_file(instance, 'image', 'image_renditions')
+
+
+@receiver(post_save, sender=Ad)
+def release_replaced_image_file(sender, instance, created, **kwargs):
+    release_replaced_file(instance, 'image', 'image_renditions', created=created)
+
+
+@receiver(post_delete, sender=Ad)
+def release_deleted_image_file(sender, instance, **kwargs):
+    release_deleted_file(instance, 'image', 'image_renditions')
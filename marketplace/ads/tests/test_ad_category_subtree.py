@@ -0,0 +1,49 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdCategorySubtree:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_ads(self):
+        user = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        electronics = Category.objects.create(name='Elektronika')
+        phones = Category.objects.create(name='Telefony', parent=electronics)
+        home = Category.objects.create(name='Dom')
+
+        def make_ad(category):
+            return Ad.objects.create(user=user, category=category, title='Oferta', description='Opis', price=100, city='Kraków')
+        return electronics, phones, home, make_ad(electronics), make_ad(phones), make_ad(home)
+
+    def test_ads_by_category_include_subcategories(self, api_client, setup_ads):
+        electronics, phones, home, electronics_ad, phone_ad, home_ad = setup_ads
+        response = api_client.get(reverse('ad-by-category', kwargs={'category_id': electronics.id}))
+        assert response.status_code == status.HTTP_200_OK
+        assert {item['id'] for item in response.data['results']} == {electronics_ad.id, phone_ad.id}
+
+    def test_ads_by_leaf_category(self, api_client, setup_ads):
+        electronics, phones, home, electronics_ad, phone_ad, home_ad = setup_ads
+        response = api_client.get(reverse('ad-by-category', kwargs={'category_id': phones.id}))
+        assert [item['id'] for item in response.data['results']] == [phone_ad.id]
+
+    def test_ads_by_non_existent_category(self, api_client, setup_ads):
+        response = api_client.get(reverse('ad-by-category', kwargs={'category_id': 999}))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == []
+
+    def test_ad_list_category_tree_filter(self, api_client, setup_ads):
+        electronics, phones, home, electronics_ad, phone_ad, home_ad = setup_ads
+        response = api_client.get(reverse('ad-list'), {'category_tree': electronics.id})
+        assert {item['id'] for item in response.data['results']} == {electronics_ad.id, phone_ad.id}
+        response = api_client.get(reverse('ad-list'), {'category': electronics.id})
+        assert [item['id'] for item in response.data['results']] == [electronics_ad.id]
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from django.utils.http import http_date
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.models import Ad
+from categories.models import Category
+from favorites.models import Favorite
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdConditionalGet:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self, settings):
+        settings.AD_VIEW_FLUSH_THRESHOLD = 1000
+        settings.AD_VIEW_FLUSH_INTERVAL = 3600
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_ads(self):
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+        category = Category.objects.create(name='Elektronika')
+        ads = [
+            Ad.objects.create(user=seller, category=category, title=f'Oferta {i}', description='Opis', price=100)
+            for i in range(2)
+        ]
+        return seller, buyer, category, ads
+
+    def test_detail_not_modified(self, api_client, setup_ads):
+        seller, buyer, category, ads = setup_ads
+        url = reverse('ad-detail', args=[ads[0].id])
+        response = api_client.get(url)
+        assert not response.has_header('Last-Modified')
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_detail_etag_changes_after_update(self, api_client, setup_ads):
+        seller, buyer, category, ads = setup_ads
+        url = reverse('ad-detail', args=[ads[0].id])
+        etag = api_client.get(url)['ETag']
+        ads[0].title = 'Zmieniony tytuł'
+        ads[0].save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+    def test_detail_etag_is_per_user(self, api_client, setup_ads):
+        seller, buyer, category, ads = setup_ads
+        url = reverse('ad-detail', args=[ads[0].id])
+        api_client.force_authenticate(user=buyer)
+        etag = api_client.get(url)['ETag']
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        Favorite.objects.create(user=buyer, ad=ads[0])
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['is_favorite'] is True
+
+        api_client.force_authenticate(user=seller)
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_missing_ad_returns_404(self, api_client):
+        response = api_client.get(reverse('ad-detail', args=[999]), HTTP_IF_NONE_MATCH='"x"')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_list_not_modified_until_set_changes(self, api_client, setup_ads):
+        seller, buyer, category, ads = setup_ads
+        url = reverse('ad-list')
+        etag = api_client.get(url)['ETag']
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        ads[1].delete()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 1
+
+    def test_list_etag_depends_on_filters(self, api_client, setup_ads):
+        url = reverse('ad-list')
+        assert api_client.get(url)['ETag'] != api_client.get(url, {'ordering': 'price'})['ETag']
+
+    def test_if_modified_since_alone_does_not_hide_counter_changes(self, api_client, setup_ads):
+        seller, buyer, category, ads = setup_ads
+        future = http_date(time.time() + 3600)
+        Favorite.objects.create(user=buyer, ad=ads[0])
+        for url in [reverse('ad-by-user', args=[seller.id]), reverse('ad-detail', args=[ads[0].id])]:
+            response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=future)
+            assert response.status_code == status.HTTP_200_OK
+            assert not response.has_header('Last-Modified')
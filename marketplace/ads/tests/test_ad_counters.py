@@ -0,0 +1,98 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.models import Ad
+from ads.serializers import AdSerializer
+from categories.models import Category
+from favorites.models import Favorite
+from messaging.models import Message
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdCounters:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_data(self):
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+        category = Category.objects.create(name='Elektronika')
+        ad = Ad.objects.create(user=seller, category=category, title='Telefon', description='Opis', price=100)
+        return seller, buyer, category, ad
+
+    def test_favorite_create_and_delete_update_counter(self, setup_data):
+        seller, buyer, category, ad = setup_data
+        favorite = Favorite.objects.create(user=buyer, ad=ad)
+        Favorite.objects.create(user=seller, ad=ad)
+        ad.refresh_from_db()
+        assert ad.favorites_count == 2
+
+        favorite.delete()
+        ad.refresh_from_db()
+        assert ad.favorites_count == 1
+
+    def test_message_create_updates_counter(self, setup_data):
+        seller, buyer, category, ad = setup_data
+        Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Aktualne?')
+        Message.objects.create(sender=seller, recipient=buyer, ad=ad, content='Tak')
+        ad.refresh_from_db()
+        assert ad.message_count == 2
+
+    def test_counters_do_not_touch_updated_at(self, setup_data):
+        seller, buyer, category, ad = setup_data
+        updated_at = ad.updated_at
+        Favorite.objects.create(user=buyer, ad=ad)
+        ad.refresh_from_db()
+        assert ad.updated_at == updated_at
+
+    def test_ordering_by_favorites_count(self, api_client, setup_data):
+        seller, buyer, category, ad = setup_data
+        popular = Ad.objects.create(user=seller, category=category, title='Laptop', description='Opis', price=200)
+        Favorite.objects.create(user=buyer, ad=popular)
+        response = api_client.get(reverse('ad-list'), {'ordering': '-favorites_count', 'fields': 'id,favorites_count'})
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data['results']] == [popular.id, ad.id]
+        assert response.data['results'][0]['favorites_count'] == 1
+
+    def test_rebuild_command_fixes_drift(self, setup_data):
+        seller, buyer, category, ad = setup_data
+        Favorite.objects.create(user=buyer, ad=ad)
+        Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Aktualne?')
+        Ad.objects.filter(pk=ad.pk).update(favorites_count=7, message_count=0)
+
+        call_command('rebuild_ad_counters', batch_size=1)
+        ad.refresh_from_db()
+        assert (ad.favorites_count, ad.message_count) == (1, 1)
+
+    def test_update_keeps_concurrent_counter_increments(self, api_client, setup_data):
+        seller, buyer, category, ad = setup_data
+        stale = Ad.objects.get(pk=ad.pk)
+        Favorite.objects.create(user=buyer, ad=ad)
+        Ad.objects.filter(pk=ad.pk).update(view_count=7, trending_score=1.5)
+
+        serializer = AdSerializer(stale, data={'title': 'Nowy telefon'}, partial=True)
+        assert serializer.is_valid()
+        serializer.save()
+
+        ad.refresh_from_db()
+        assert ad.title == 'Nowy telefon'
+        assert ad.favorites_count == 1
+        assert ad.view_count == 7
+        assert ad.trending_score == 1.5
+
+    def test_toggle_active_writes_only_status(self, api_client, setup_data):
+        seller, buyer, category, ad = setup_data
+        api_client.force_authenticate(user=seller)
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.patch(reverse('ad-toggle-active', args=[ad.id]))
+        assert response.status_code == status.HTTP_200_OK
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        assert updates and all('favorites_count' not in sql for sql in updates)
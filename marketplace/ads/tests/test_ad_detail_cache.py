@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.caching import AD_DETAIL_CACHE_KEY, AD_DETAIL_LOCK_KEY, get_cached_ad_detail
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdDetailCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self, settings):
+        settings.AD_VIEW_FLUSH_THRESHOLD = 1000
+        settings.AD_VIEW_FLUSH_INTERVAL = 3600
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_ad(self):
+        user = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        category = Category.objects.create(name='Elektronika')
+        ad = Ad.objects.create(user=user, category=category, title='Telefon', description='Opis', price=100)
+        return user, ad
+
+    def test_anonymous_detail_is_served_from_cache(self, api_client, setup_ad):
+        user, ad = setup_ad
+        url = reverse('ad-detail', args=[ad.id])
+        first = api_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            second = api_client.get(url)
+        assert second.status_code == status.HTTP_200_OK
+        assert len(queries) == 0
+        assert second.data == first.data
+
+    def test_cached_media_urls_follow_request_host(self, api_client, setup_ad, settings):
+        settings.ALLOWED_HOSTS = ['*']
+        user, ad = setup_ad
+        Ad.objects.filter(pk=ad.pk).update(
+            image='ads/images/ab/telefon.jpg',
+            image_renditions={'thumb': {'jpeg': 'ads/images/renditions/telefon.jpg'}},
+        )
+        url = reverse('ad-detail', args=[ad.id])
+
+        api_client.get(url, HTTP_HOST='pierwszy.example.com')
+        response = api_client.get(url, HTTP_HOST='drugi.example.com')
+
+        assert response.data['image'] == 'http://drugi.example.com/media/ads/images/ab/telefon.jpg'
+        assert response.data['image_renditions'] == {
+            'thumb': {'jpeg': 'http://drugi.example.com/media/ads/images/renditions/telefon.jpg'},
+        }
+        assert cache.get(AD_DETAIL_CACHE_KEY.format(ad.id))['data']['image'] == '/media/ads/images/ab/telefon.jpg'
+
+    def test_update_invalidates_cache(self, api_client, setup_ad):
+        user, ad = setup_ad
+        url = reverse('ad-detail', args=[ad.id])
+        api_client.get(url)
+
+        api_client.force_authenticate(user=user)
+        api_client.patch(url, {'title': 'Nowy telefon'}, format='json')
+        api_client.force_authenticate(user=None)
+        assert api_client.get(url).data['title'] == 'Nowy telefon'
+
+    def test_toggle_invalidates_cache(self, api_client, setup_ad):
+        user, ad = setup_ad
+        url = reverse('ad-detail', args=[ad.id])
+        assert api_client.get(url).data['is_active'] is True
+
+        api_client.force_authenticate(user=user)
+        api_client.patch(reverse('ad-toggle-active', args=[ad.id]))
+        api_client.force_authenticate(user=None)
+        assert api_client.get(url).data['is_active'] is False
+
+    def test_delete_invalidates_cache(self, api_client, setup_ad):
+        user, ad = setup_ad
+        url = reverse('ad-detail', args=[ad.id])
+        api_client.get(url)
+        ad.delete()
+        assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalidation_repeated_after_commit(self, setup_ad, django_capture_on_commit_callbacks):
+        user, ad = setup_ad
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.save()
+            cache.set(AD_DETAIL_CACHE_KEY.format(ad.id), {'id': ad.id, 'title': 'Stary'})
+        assert cache.get(AD_DETAIL_CACHE_KEY.format(ad.id)) is None
+
+    def test_waiter_reuses_result_of_lock_holder(self, settings):
+        settings.AD_DETAIL_CACHE_LOCK_WAIT = 5
+        cache.add(AD_DETAIL_LOCK_KEY.format(1), 1)
+        timer = threading.Timer(0.1, cache.set, args=[AD_DETAIL_CACHE_KEY.format(1), {'id': 1}])
+        timer.start()
+        calls = []
+        data = get_cached_ad_detail(1, lambda: calls.append(1) or {'id': 1, 'fresh': True})
+        timer.join()
+        assert data == {'id': 1}
+        assert calls == []
+
+    def test_waiter_computes_when_lock_holder_is_too_slow(self, settings):
+        settings.AD_DETAIL_CACHE_LOCK_WAIT = 0.1
+        cache.add(AD_DETAIL_LOCK_KEY.format(1), 1)
+        assert get_cached_ad_detail(1, lambda: {'id': 1}) == {'id': 1}
+
+    def test_lock_is_released_when_compute_fails(self):
+        def failing():
+            raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            get_cached_ad_detail(1, failing)
+        assert cache.get(AD_DETAIL_LOCK_KEY.format(1)) is None
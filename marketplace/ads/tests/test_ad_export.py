@@ -0,0 +1,185 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads import exporter
+from ads.exporter import iter_export
+from ads.models import Ad, AdTombstone
+from ads.serializers import AdRowSerializer
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestAdExport:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_data(self):
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        category = Category.objects.create(name='Elektronika')
+        ads = [
+            Ad.objects.create(
+                user=seller, category=category, title=f'Telefon {i}', description='Opis, "cytat"\\nlinia',
+                price=100 + i, city='Wrocław',
+            )
+            for i in range(3)
+        ]
+        Ad.objects.create(user=seller, category=category, title='Ukryte', description='Opis', price=50,
+                          city='Wrocław', is_active=False)
+        return seller, category, ads
+
+    def stream(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_export_streams_active_ads(self, api_client, setup_data):
+        seller, category, ads = setup_data
+
+        response = api_client.get(reverse('ad-export', args=['ndjson']))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        items = [json.loads(line) for line in self.stream(response).splitlines()]
+        assert [item['id'] for item in items] == [ad.pk for ad in ads]
+        assert items[0]['title'] == 'Telefon 0'
+        assert items[0]['price'] == '100.00'
+        assert items[0]['category'] == category.pk
+        assert items[0]['user'] == seller.pk
+        assert items[0]['image'] is None
+
+    def test_csv_export(self, api_client, setup_data):
+        seller, category, ads = setup_data
+
+        response = api_client.get(reverse('ad-export', args=['csv']))
+
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.stream(response))))
+        assert [int(row['id']) for row in rows] == [ad.pk for ad in ads]
+        assert rows[0]['description'] == ads[0].description
+        assert rows[0]['image_renditions'] == '{}'
+
+    def test_updated_since(self, api_client, setup_data):
+        seller, category, ads = setup_data
+        cutoff = timezone.now() - timedelta(hours=1)
+        Ad.objects.filter(pk__in=[ads[0].pk, ads[1].pk]).update(updated_at=cutoff - timedelta(days=1))
+        Ad.objects.filter(title='Ukryte').update(updated_at=cutoff - timedelta(days=1))
+
+        response = api_client.get(reverse('ad-export', args=['ndjson']), {'updated_since': cutoff.isoformat()})
+
+        items = [json.loads(line) for line in self.stream(response).splitlines()]
+        assert [item['id'] for item in items] == [ads[2].pk]
+        assert items[0]['is_active'] is True
+        assert items[0]['deleted'] is False
+
+    def test_incremental_export_reports_deactivated_and_deleted_ads(self, api_client, setup_data):
+        seller, category, ads = setup_data
+        since = timezone.now()
+        api_client.force_authenticate(user=seller)
+        api_client.patch(reverse('ad-toggle-active', args=[ads[0].id]))
+        deleted_id = ads[1].pk
+        ads[1].delete()
+        api_client.force_authenticate(user=None)
+
+        response = api_client.get(reverse('ad-export', args=['csv']), {'updated_since': since.isoformat()})
+
+        rows = list(csv.DictReader(io.StringIO(self.stream(response))))
+        assert [(int(row['id']), row['is_active'], row['deleted']) for row in rows] == [
+            (ads[0].pk, 'False', 'False'),
+            (deleted_id, '', 'True'),
+        ]
+
+    def test_full_export_has_no_incremental_columns(self, api_client, setup_data):
+        response = api_client.get(reverse('ad-export', args=['ndjson']))
+        item = json.loads(self.stream(response).splitlines()[0])
+        assert 'is_active' not in item
+        assert 'deleted' not in item
+
+    def test_updated_since_beyond_tombstone_retention_requires_full_export(self, api_client, settings):
+        old = timezone.now() - timedelta(days=settings.AD_TOMBSTONE_RETENTION_DAYS + 1)
+        response = api_client.get(reverse('ad-export', args=['ndjson']), {'updated_since': old.isoformat()})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_purge_ad_tombstones(self, setup_data, settings):
+        seller, category, ads = setup_data
+        expired_id, recent_id = ads[0].pk, ads[1].pk
+        ads[0].delete()
+        ads[1].delete()
+        old = timezone.now() - timedelta(days=settings.AD_TOMBSTONE_RETENTION_DAYS + 1)
+        AdTombstone.objects.filter(ad_id=expired_id).update(deleted_at=old)
+
+        call_command('purge_ad_tombstones', stdout=io.StringIO())
+
+        assert list(AdTombstone.objects.values_list('ad_id', flat=True)) == [recent_id]
+
+    def test_invalid_updated_since(self, api_client, setup_data):
+        response = api_client.get(reverse('ad-export', args=['ndjson']), {'updated_since': 'wczoraj'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rows_are_read_in_chunks(self, setup_data, django_assert_num_queries):
+        # Generator jest leniwy - zapytanie wykonuje się dopiero przy czytaniu.
+        chunks = iter_export('ndjson', chunk_size=2)
+        with django_assert_num_queries(1):
+            output = ''.join(chunks)
+        assert len(output.splitlines()) == 3
+
+    def test_export_command(self, setup_data, tmp_path):
+        seller, category, ads = setup_data
+        path = tmp_path / 'ads.csv'
+
+        call_command('export_ads', format='csv', output=str(path), chunk_size=2)
+
+        rows = list(csv.DictReader(path.open(encoding='utf-8', newline='')))
+        assert [row['title'] for row in rows] == ['Telefon 0', 'Telefon 1', 'Telefon 2']
+
+        out = io.StringIO()
+        call_command('export_ads', stdout=out)
+        assert len(out.getvalue().splitlines()) == 3
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_export_streams_before_queryset_is_exhausted(self, setup_data, monkeypatch):
+        monkeypatch.setattr(exporter, 'WRITE_BUFFER_SIZE', 1)
+        serialized = []
+        to_representation = AdRowSerializer.to_representation
+
+        def counting_to_representation(self, rows):
+            serialized.extend(rows)
+            return to_representation(self, rows)
+
+        monkeypatch.setattr(AdRowSerializer, 'to_representation', counting_to_representation)
+
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': reverse('ad-export', args=['ndjson']), 'query_string': b'',
+            'headers': [(b'host', b'testserver')], 'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+        }
+        requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+        bodies = []
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message['type'] == 'http.response.body' and message.get('body'):
+                bodies.append((message['body'], len(serialized)))
+
+        async_to_sync(ASGIHandler())(scope, receive, send)
+
+        assert len(b''.join(body for body, _ in bodies).splitlines()) == 3
+        # Pierwszy fragment wysłano po pierwszym wierszu, a nie po zbudowaniu całego eksportu.
+        assert bodies[0][1] == 1
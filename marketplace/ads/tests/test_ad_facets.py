@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdFacetsView:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_ads(self):
+        user = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        electronics = Category.objects.create(name='Elektronika')
+        home = Category.objects.create(name='Dom')
+        for category, city, price in [
+            (electronics, 'Kraków', 50), (electronics, 'Kraków', 150), (electronics, 'Warszawa', 700),
+            (home, 'Kraków', 30), (home, 'Gdańsk', 25000),
+        ]:
+            Ad.objects.create(user=user, category=category, title='Oferta', description='Opis', price=price, city=city)
+        Ad.objects.create(user=user, category=home, title='Nieaktywna', description='Opis', price=10, city='Gdańsk', is_active=False)
+        return electronics, home
+
+    def test_facets_for_all_active_ads(self, api_client, setup_ads):
+        electronics, home = setup_ads
+        response = api_client.get(reverse('ad-facets'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['category'] == [{'id': electronics.id, 'count': 3}, {'id': home.id, 'count': 2}]
+        assert response.data['city'] == [
+            {'value': 'Kraków', 'count': 3}, {'value': 'Gdańsk', 'count': 1}, {'value': 'Warszawa', 'count': 1},
+        ]
+        assert [bucket['count'] for bucket in response.data['price']] == [2, 1, 1, 0, 0, 1]
+        assert response.data['price'][-1] == {'min': '20000.00', 'max': None, 'count': 1}
+
+    def test_facets_respect_filters(self, api_client, setup_ads):
+        electronics, home = setup_ads
+        response = api_client.get(reverse('ad-facets'), {'city': 'Kraków', 'facets': 'category'})
+        assert response.data == {'category': [{'id': electronics.id, 'count': 2}, {'id': home.id, 'count': 1}]}
+
+    def test_custom_price_buckets(self, api_client, setup_ads):
+        response = api_client.get(reverse('ad-facets'), {'facets': 'price', 'price_buckets': '1000,0'})
+        assert response.data['price'] == [
+            {'min': '0.00', 'max': '1000.00', 'count': 4},
+            {'min': '1000.00', 'max': None, 'count': 1},
+        ]
+
+    def test_prices_below_first_edge_are_counted(self, api_client, setup_ads):
+        response = api_client.get(reverse('ad-facets'), {'facets': 'price', 'price_buckets': '100,500'})
+        assert response.data['price'] == [
+            {'min': None, 'max': '100.00', 'count': 2},
+            {'min': '100.00', 'max': '500.00', 'count': 1},
+            {'min': '500.00', 'max': None, 'count': 2},
+        ]
+        assert json.loads(response.content)['price'][-1]['max'] is None
+
+    def test_invalid_price_buckets(self, api_client, setup_ads):
+        for raw in ('abc', '100,inf', 'NaN'):
+            response = api_client.get(reverse('ad-facets'), {'price_buckets': raw})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_facets_use_grouped_queries_and_cache(self, api_client, setup_ads):
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(reverse('ad-facets'), {'city': 'Kraków', 'price': '50'})
+        assert len(queries) == 3
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(reverse('ad-facets'), {'price': '50', 'city': 'Kraków', 'cursor': 'x'})
+        assert len(queries) == 0
@@ -0,0 +1,153 @@
+from io import BytesIO
+
+import pytest
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.models import Ad
+from utils.storage import ContentAddressedStorage
+from categories.models import Category
+from users.models import UserProfile
+from utils import images
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+def make_jpeg(size=(1200, 800), name='photo.jpg', color=(200, 30, 30)):
+    exif = Image.Exif()
+    exif[0x010F] = 'Aparat testowy'
+    exif[0x0112] = 6
+    buffer = BytesIO()
+    Image.new('RGB', size, color=color).save(buffer, 'JPEG', exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@pytest.mark.django_db
+class TestImageRenditions:
+    @pytest.fixture(autouse=True)
+    def media(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.IMAGE_PIPELINE_EAGER = True
+        settings.IMAGE_RENDITIONS = {'thumb': (100, 100), 'card': (300, 300)}
+        settings.MEDIA_RELEASE_GRACE_SECONDS = 0
+        cache.clear()
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+
+    @pytest.fixture
+    def create_ad(self, api_client, user, django_capture_on_commit_callbacks):
+        category = Category.objects.create(name='Elektronika')
+        api_client.force_authenticate(user=user)
+
+        def create(image):
+            with django_capture_on_commit_callbacks(execute=True):
+                response = api_client.post(reverse('ad-create'), {
+                    'title': 'Telefon', 'description': 'Opis', 'price': '100.00',
+                    'category': category.id, 'city': 'Kraków', 'image': image,
+                }, format='multipart')
+            assert response.status_code == status.HTTP_201_CREATED
+            return Ad.objects.get(pk=response.data['id'])
+        return create
+
+    def test_renditions_are_resized_and_stripped(self, create_ad):
+        ad = create_ad(make_jpeg())
+        assert ad.image_renditions['source'] == ad.image.name
+        assert set(ad.image_renditions) == {'source', 'thumb', 'card'}
+        for rendition, limit in [('thumb', 100), ('card', 300)]:
+            for fmt, expected in [('webp', 'WEBP'), ('jpeg', 'JPEG')]:
+                with default_storage.open(ad.image_renditions[rendition][fmt]) as handle, Image.open(handle) as image:
+                    assert image.format == expected
+                    assert max(image.size) == limit
+                    # Orientacja 6 została nałożona na piksele: obraz jest teraz pionowy.
+                    assert image.size[1] > image.size[0]
+                    assert not image.getexif()
+                name = ad.image_renditions[rendition][fmt]
+                assert name.startswith('ads/images/renditions/')
+                assert ContentAddressedStorage.is_content_addressed(name)
+
+    def test_serializer_exposes_url_map(self, api_client, create_ad):
+        ad = create_ad(make_jpeg())
+        response = api_client.get(reverse('ad-detail', args=[ad.id]))
+        renditions = response.data['image_renditions']
+        assert set(renditions) == {'thumb', 'card'}
+        assert renditions['thumb']['webp'].startswith('http://testserver/media/ads/images/')
+        assert renditions['thumb']['webp'].endswith('.webp')
+
+    def test_replacing_image_removes_old_renditions(self, api_client, create_ad, django_capture_on_commit_callbacks):
+        ad = create_ad(make_jpeg())
+        old = ad.image_renditions['thumb']['jpeg']
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.patch(reverse('ad-detail', args=[ad.id]), {'image': make_jpeg(name='new.jpg', color=(0, 0, 200))}, format='multipart')
+        ad.refresh_from_db()
+        assert ad.image_renditions['source'] == ad.image.name
+        assert not default_storage.exists(old)
+        assert default_storage.exists(ad.image_renditions['thumb']['jpeg'])
+
+    def test_broken_image_is_logged_and_skipped(self, user, django_capture_on_commit_callbacks, caplog):
+        name = default_storage.save('ads/images/broken.jpg', BytesIO(b'to nie jest obraz'))
+        category = Category.objects.create(name='Dom')
+        with django_capture_on_commit_callbacks(execute=True):
+            ad = Ad.objects.create(user=user, category=category, title='Stół', description='Opis', price=10, image=name)
+        ad.refresh_from_db()
+        assert ad.image_renditions == {}
+        assert 'Nie udało się przetworzyć obrazu' in caplog.text
+
+    def test_stale_renditions_are_released(self, settings, user, monkeypatch):
+        settings.IMAGE_PIPELINE_EAGER = False
+        category = Category.objects.create(name='Dom')
+        ad = Ad.objects.create(user=user, category=category, title='Stół', description='Opis', price=10,
+                               image=make_jpeg())
+        old = Ad.objects.get(pk=ad.pk).image.name
+        replacement = default_storage.save('ads/images/new.jpg', make_jpeg(color=(0, 0, 200)))
+        produced = {}
+        render = images.render_renditions
+
+        def render_then_replace(field_file):
+            produced.update(render(field_file))
+            # Użytkownik podmienia obraz, zanim wersje zostaną zapisane.
+            Ad.objects.filter(pk=ad.pk).update(image=replacement)
+            return produced
+
+        monkeypatch.setattr(images, 'render_renditions', render_then_replace)
+        images.process_renditions('ads.Ad', ad.pk, 'image', 'image_renditions')
+
+        ad.refresh_from_db()
+        assert ad.image_renditions == {}
+        assert not default_storage.exists(old)
+        assert not any(default_storage.exists(name) for name in images.rendition_names(produced))
+
+    def test_background_mode_submits_to_pool(self, settings, user, monkeypatch, django_capture_on_commit_callbacks):
+        settings.IMAGE_PIPELINE_EAGER = False
+        submitted = []
+
+        class FakeExecutor:
+            def submit(self, func, *args):
+                submitted.append(args)
+
+        monkeypatch.setattr(images, 'get_executor', FakeExecutor)
+        category = Category.objects.create(name='Dom')
+        with django_capture_on_commit_callbacks(execute=True):
+            ad = Ad.objects.create(user=user, category=category, title='Stół', description='Opis', price=10,
+                                   image=make_jpeg())
+        assert submitted == [('ads.Ad', ad.pk, 'image', 'image_renditions')]
+
+    def test_avatar_renditions_skip_default(self, api_client, user, django_capture_on_commit_callbacks):
+        assert user.profile.avatar_renditions == {}
+        api_client.force_authenticate(user=user)
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.patch(reverse('user-profile-update'), {'avatar': make_jpeg(name='avatar.jpg')}, format='multipart')
+        profile = UserProfile.objects.get(user=user)
+        assert profile.avatar_renditions['source'] == profile.avatar.name
+        response = api_client.get(reverse('public-user-profile', kwargs={'username': user.username}))
+        assert response.data['avatar_renditions']['thumb']['jpeg'].endswith('.jpg')
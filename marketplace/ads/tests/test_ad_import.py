@@ -0,0 +1,271 @@
+import io
+import json
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.asgi import ASGIRequest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, force_authenticate
+from ads.caching import AD_DETAIL_CACHE_KEY
+from ads.importer import AdImporter, iter_text_lines
+from ads.models import Ad
+from ads.views import AdImportView
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+CSV_HEADER = 'external_id,title,description,price,category,city,street,is_active\n'
+
+
+@pytest.mark.django_db
+class TestAdImport:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_data(self):
+        partner = User.objects.create_user(username='dealer', email='dealer@example.com', password='testpassword')
+        category = Category.objects.create(name='Motoryzacja')
+        return partner, category
+
+    def csv_rows(self, category, rows):
+        lines = [CSV_HEADER]
+        for external_id, title, price in rows:
+            lines.append(f'{external_id},{title},"Opis, z przecinkiem",{price},{category.pk},Kraków,,true\n')
+        return ''.join(lines).encode('utf-8')
+
+    def chunked_request(self, user, body):
+        # Żądanie chunked pod ASGI - ciało bez nagłówka Content-Length.
+        scope = {
+            'type': 'http', 'method': 'POST', 'path': reverse('ad-import'), 'query_string': b'',
+            'headers': [(b'host', b'testserver'), (b'content-type', b'text/csv'), (b'transfer-encoding', b'chunked')],
+        }
+        request = ASGIRequest(scope, io.BytesIO(body))
+        force_authenticate(request, user=user)
+        return request
+
+    def test_csv_import_creates_ads_in_batches(self, setup_data, django_assert_max_num_queries):
+        partner, category = setup_data
+        data = self.csv_rows(category, [(f'X{i}', f'Auto {i}', 1000 + i) for i in range(25)])
+
+        importer = AdImporter(partner, batch_size=10)
+        # Na partię: kategorie, istniejące external_id, INSERT (+ savepoint) - niezależnie od liczby wierszy.
+        with django_assert_max_num_queries(3 * 6):
+            report = importer.run(io.BytesIO(data), 'csv')
+
+        assert report == {'created': 25, 'updated': 0, 'failed': 0, 'errors': []}
+        ad = Ad.objects.get(user=partner, external_id='X7')
+        assert ad.title == 'Auto 7'
+        assert ad.description == 'Opis, z przecinkiem'
+        assert str(ad.price) == '1007.00'
+        assert ad.street is None
+        assert ad.is_active is True
+
+    def test_upsert_by_external_id(self, setup_data, django_capture_on_commit_callbacks):
+        partner, category = setup_data
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpassword')
+        existing = Ad.objects.create(
+            user=partner, category=category, title='Stare', description='Opis', price=100,
+            city='Gdańsk', external_id='X1',
+        )
+        foreign = Ad.objects.create(
+            user=other, category=category, title='Cudze', description='Opis', price=100,
+            city='Gdańsk', external_id='X2',
+        )
+        cache.set(AD_DETAIL_CACHE_KEY.format(existing.pk), {'data': {}})
+
+        data = self.csv_rows(category, [('X1', 'Nowe', 200), ('X2', 'Moje', 300)])
+        with django_capture_on_commit_callbacks(execute=True):
+            report = AdImporter(partner).run(io.BytesIO(data), 'csv')
+
+        assert report['created'] == 1
+        assert report['updated'] == 1
+        existing.refresh_from_db()
+        assert existing.title == 'Nowe'
+        assert existing.city == 'Kraków'
+        assert existing.updated_at > existing.created_at
+        foreign.refresh_from_db()
+        assert foreign.title == 'Cudze'
+        assert Ad.objects.get(user=partner, external_id='X2').title == 'Moje'
+        assert cache.get(AD_DETAIL_CACHE_KEY.format(existing.pk)) is None
+
+    def test_upsert_updates_only_fields_present_in_row(self, setup_data):
+        partner, category = setup_data
+        existing = Ad.objects.create(
+            user=partner, category=category, title='Stare', description='Opis', price=100,
+            city='Gdańsk', street='Długa 1', postal_code='80-001', is_active=False, external_id='X1',
+        )
+        rows = [
+            {'external_id': 'X1', 'title': 'Nowe', 'description': 'Opis', 'price': '150',
+             'category': category.pk, 'city': 'Gdańsk'},
+            {'external_id': 'X2', 'title': 'Inne', 'description': 'Opis', 'price': '150',
+             'category': category.pk, 'city': 'Gdańsk', 'street': 'Krótka 2'},
+        ]
+        data = '\n'.join(json.dumps(row) for row in rows).encode('utf-8')
+
+        report = AdImporter(partner).run(io.BytesIO(data), 'ndjson')
+
+        assert (report['created'], report['updated']) == (1, 1)
+        existing.refresh_from_db()
+        assert existing.title == 'Nowe'
+        assert (existing.street, existing.postal_code, existing.is_active) == ('Długa 1', '80-001', False)
+
+    def test_concurrently_created_external_id_is_retried_as_update(self, setup_data):
+        partner, category = setup_data
+
+        Ad.objects.create(
+            user=partner, category=category, title='Równoległe', description='Opis', price=100,
+            city='Gdańsk', external_id='X1',
+        )
+
+        class RacingImporter(AdImporter):
+            # Pierwsze wyszukanie nie widzi wiersza dodanego przez równoległy, jeszcze niezatwierdzony import.
+            raced = False
+
+            def get_existing(self, external_ids):
+                if not self.raced:
+                    self.raced = True
+                    return {}
+                return super().get_existing(external_ids)
+
+        data = self.csv_rows(category, [('X1', 'Auto', 1000), ('X2', 'Rower', 500)])
+        report = RacingImporter(partner).run(io.BytesIO(data), 'csv')
+
+        assert report == {'created': 1, 'updated': 1, 'failed': 0, 'errors': []}
+        assert Ad.objects.get(user=partner, external_id='X1').title == 'Auto'
+        assert Ad.objects.filter(user=partner).count() == 2
+
+    def test_persistent_conflict_is_reported_per_row(self, setup_data, monkeypatch):
+        partner, category = setup_data
+        Ad.objects.create(
+            user=partner, category=category, title='Istniejące', description='Opis', price=100,
+            city='Gdańsk', external_id='X1',
+        )
+        monkeypatch.setattr(AdImporter, 'get_existing', lambda self, external_ids: {})
+
+        report = AdImporter(partner).run(io.BytesIO(self.csv_rows(category, [('X1', 'Auto', 1000)])), 'csv')
+
+        assert report['failed'] == 1
+        assert report['errors'][0]['row'] == 1
+        assert report['errors'][0]['external_id'] == 'X1'
+
+    def test_reports_invalid_rows(self, setup_data):
+        partner, category = setup_data
+        lines = [
+            json.dumps({'external_id': 'A', 'title': 'Dobre', 'description': 'Opis', 'price': '50',
+                        'category': category.pk, 'city': 'Łódź'}),
+            json.dumps({'external_id': 'B', 'title': 'Tanie', 'description': 'Opis', 'price': '1',
+                        'category': category.pk, 'city': 'Łódź'}),
+            '{niepoprawny json',
+            json.dumps({'external_id': 'C', 'title': 'Bez kategorii', 'description': 'Opis', 'price': '50',
+                        'category': 999999, 'city': 'Łódź'}),
+        ]
+        data = '\n'.join(lines).encode('utf-8')
+
+        report = AdImporter(partner).run(io.BytesIO(data), 'ndjson')
+
+        assert report['created'] == 1
+        assert report['failed'] == 3
+        errors = {error['row']: error for error in report['errors']}
+        assert 'price' in errors[2]['errors']
+        assert errors[2]['external_id'] == 'B'
+        assert 'non_field_errors' in errors[3]['errors']
+        assert 'category' in errors[4]['errors']
+        assert list(Ad.objects.values_list('external_id', flat=True)) == ['A']
+
+    def test_reported_errors_are_capped(self, setup_data):
+        partner, category = setup_data
+        data = self.csv_rows(category, [(f'X{i}', 'Tanie', 1) for i in range(5)])
+
+        report = AdImporter(partner, max_errors=2).run(io.BytesIO(data), 'csv')
+
+        assert report['failed'] == 5
+        assert len(report['errors']) == 2
+
+    def test_text_lines_split_across_chunks(self):
+        data = 'pierwsza łódź\ndruga\r\ntrzecia'.encode('utf-8')
+        lines = list(iter_text_lines(io.BytesIO(data), chunk_size=3))
+        assert lines == ['pierwsza łódź\n', 'druga\r\n', 'trzecia']
+
+    def test_endpoint_accepts_raw_body(self, api_client, setup_data):
+        partner, category = setup_data
+        api_client.force_authenticate(user=partner)
+
+        response = api_client.post(
+            reverse('ad-import'), self.csv_rows(category, [('X1', 'Auto', 1000)]), content_type='text/csv',
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+        assert Ad.objects.filter(user=partner, external_id='X1').exists()
+
+    def test_endpoint_accepts_multipart_file(self, api_client, setup_data):
+        partner, category = setup_data
+        api_client.force_authenticate(user=partner)
+        upload = SimpleUploadedFile(
+            'katalog.csv', self.csv_rows(category, [('X1', 'Auto', 1000)]), content_type='application/octet-stream',
+        )
+
+        response = api_client.post(reverse('ad-import'), {'file': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+
+    def test_endpoint_rejects_unknown_format_and_oversized_body(self, api_client, setup_data, settings):
+        partner, category = setup_data
+        api_client.force_authenticate(user=partner)
+        url = reverse('ad-import')
+
+        response = api_client.post(url, b'<xml/>', content_type='application/xml')
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+        settings.AD_IMPORT_MAX_SIZE = 10
+        response = api_client.post(url, self.csv_rows(category, [('X1', 'Auto', 1000)]), content_type='text/csv')
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert not Ad.objects.exists()
+
+    def test_body_without_content_length_is_limited(self, setup_data, settings):
+        partner, category = setup_data
+        settings.AD_IMPORT_MAX_SIZE = 10
+        request = self.chunked_request(partner, self.csv_rows(category, [('X1', 'Auto', 1000)]))
+
+        response = AdImportView.as_view()(request)
+
+        assert 'CONTENT_LENGTH' not in request.META
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert not Ad.objects.exists()
+
+    def test_chunked_body_within_limit_is_imported(self, setup_data):
+        partner, category = setup_data
+        request = self.chunked_request(partner, self.csv_rows(category, [('X1', 'Auto', 1000)]))
+
+        response = AdImportView.as_view()(request)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+
+    def test_endpoint_requires_authentication(self, api_client):
+        response = api_client.post(reverse('ad-import'), b'', content_type='text/csv')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_import_command(self, setup_data, tmp_path):
+        partner, category = setup_data
+        path = tmp_path / 'katalog.csv'
+        path.write_bytes(self.csv_rows(category, [('X1', 'Auto', 1000), ('X2', 'Tanie', 1)]))
+        out, err = io.StringIO(), io.StringIO()
+
+        call_command('import_ads', str(path), user='dealer', stdout=out, stderr=err)
+
+        assert 'Utworzono 1' in out.getvalue()
+        assert 'odrzucono 1' in out.getvalue()
+        assert 'Wiersz 2' in err.getvalue()
+        assert Ad.objects.filter(user=partner).count() == 1
@@ -0,0 +1,98 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdListPagination:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+
+    @pytest.fixture
+    def category(self):
+        return Category.objects.create(name='Elektronika')
+
+    @pytest.fixture
+    def create_ads(self, user, category):
+        def make_ads(count, **kwargs):
+            return [
+                Ad.objects.create(user=user, category=category, title=f'Oferta {i}', description='Opis',
+                                  price=kwargs.get('price', 10 + i), city='Kraków')
+                for i in range(count)
+            ]
+        return make_ads
+
+    def walk(self, api_client, url):
+        ids = []
+        pages = 0
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_ad_list_is_paginated(self, api_client, create_ads):
+        create_ads(5)
+        response = api_client.get(reverse('ad-list'), {'page_size': 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 2
+        assert response.data['next'] is not None
+        assert response.data['previous'] is None
+
+    def test_walk_default_ordering_returns_every_ad_once(self, api_client, create_ads):
+        ads = create_ads(7)
+        ids, pages = self.walk(api_client, reverse('ad-list') + '?page_size=3')
+        assert pages == 3
+        assert ids == [ad.id for ad in sorted(ads, key=lambda ad: (ad.created_at, ad.id), reverse=True)]
+
+    def test_walk_price_ordering_with_ties(self, api_client, create_ads):
+        ads = create_ads(6, price=50)
+        ids, _ = self.walk(api_client, reverse('ad-list') + '?ordering=price&page_size=4')
+        assert ids == sorted(ad.id for ad in ads)
+
+    def test_previous_link_returns_previous_page(self, api_client, create_ads):
+        create_ads(6)
+        first = api_client.get(reverse('ad-list'), {'page_size': 2, 'ordering': '-price'})
+        second = api_client.get(first.data['next'])
+        back = api_client.get(second.data['previous'])
+        assert [item['id'] for item in back.data['results']] == [item['id'] for item in first.data['results']]
+        assert back.data['previous'] is None
+
+    def test_cursor_from_other_ordering_is_rejected(self, api_client, create_ads):
+        create_ads(3)
+        response = api_client.get(reverse('ad-list'), {'page_size': 1})
+        cursor = response.data['next'].split('cursor=')[1]
+        response = api_client.get(reverse('ad-list'), {'ordering': 'price', 'cursor': cursor})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_cursor(self, api_client):
+        response = api_client.get(reverse('ad-list'), {'cursor': 'nie-kursor'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data['detail'] == 'Nieprawidłowy kursor.'
+
+    def test_page_size_is_capped(self, api_client, create_ads):
+        create_ads(3)
+        response = api_client.get(reverse('ad-list'), {'page_size': 100000})
+        assert len(response.data['results']) == 3
+        assert response.data['next'] is None
+
+    def test_ads_by_category_and_user_are_paginated(self, api_client, create_ads, user, category):
+        create_ads(3)
+        by_category = api_client.get(reverse('ad-by-category', kwargs={'category_id': category.id}), {'page_size': 2})
+        by_user = api_client.get(reverse('ad-by-user', kwargs={'user_id': user.id}), {'page_size': 2})
+        assert len(by_category.data['results']) == 2
+        assert len(by_user.data['results']) == 2
+        assert by_category.data['next'] is not None
+        assert by_user.data['next'] is not None
@@ -0,0 +1,159 @@
+import os
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+from PIL import Image
+from ads.models import Ad
+from categories.models import Category
+from marketplace.views import serve_media
+from utils.storage import ContentAddressedStorage
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+def make_png(color=(0, 120, 0)):
+    buffer = BytesIO()
+    Image.new('RGB', (40, 40), color=color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+class TestContentAddressedStorage:
+    @pytest.fixture(autouse=True)
+    def media(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.IMAGE_PIPELINE_EAGER = True
+        settings.IMAGE_RENDITIONS = {'thumb': (20, 20)}
+        settings.MEDIA_RELEASE_GRACE_SECONDS = 0
+
+    @pytest.fixture
+    def setup_data(self):
+        user = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        category = Category.objects.create(name='Elektronika')
+        return user, category
+
+    @pytest.fixture
+    def create_ad(self, setup_data, django_capture_on_commit_callbacks):
+        user, category = setup_data
+
+        def create(content, name='photo.PNG'):
+            with django_capture_on_commit_callbacks(execute=True):
+                return Ad.objects.create(user=user, category=category, title='Oferta', description='Opis', price=10,
+                                         image=SimpleUploadedFile(name, content))
+        return create
+
+    def test_name_is_content_hash(self):
+        name = default_storage.save('ads/images/photo.PNG', ContentFile(b'abc'))
+        assert name == 'ads/images/ba/ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad.png'
+        assert ContentAddressedStorage.is_content_addressed(name)
+        assert not ContentAddressedStorage.is_content_addressed('ads/images/photo.png')
+
+    def test_identical_uploads_share_one_file(self, create_ad, tmp_path):
+        first = create_ad(make_png(), name='a.png')
+        second = create_ad(make_png(), name='b.png')
+        assert first.image.name == second.image.name
+        assert len(list((tmp_path / 'ads' / 'images').glob('*/*.png'))) == 1
+
+    def test_file_is_deleted_with_last_reference(self, create_ad, django_capture_on_commit_callbacks):
+        first = create_ad(make_png())
+        second = create_ad(make_png())
+        first.refresh_from_db()
+        second.refresh_from_db()
+        name, thumb = first.image.name, first.image_renditions['thumb']['webp']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            first.delete()
+        assert default_storage.exists(name) and default_storage.exists(thumb)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            second.delete()
+        assert not default_storage.exists(name)
+        assert not default_storage.exists(thumb)
+
+    def test_replaced_file_is_released(self, create_ad, django_capture_on_commit_callbacks):
+        ad = create_ad(make_png())
+        ad = Ad.objects.get(pk=ad.pk)
+        old = ad.image.name
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.image = SimpleUploadedFile('new.png', make_png(color=(255, 0, 0)))
+            ad.save()
+        assert not default_storage.exists(old)
+        assert default_storage.exists(ad.image.name)
+
+    def test_recently_used_file_waits_for_sweep(self, create_ad, django_capture_on_commit_callbacks, settings):
+        settings.MEDIA_RELEASE_GRACE_SECONDS = 3600
+        ad = create_ad(make_png())
+        ad.refresh_from_db()
+        name, thumb = ad.image.name, ad.image_renditions['thumb']['webp']
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.delete()
+        # Równoległy zapis tej samej treści mógł właśnie zdeduplikować się do tego pliku.
+        assert default_storage.exists(name) and default_storage.exists(thumb)
+
+        call_command('sweep_media', stdout=StringIO())
+        assert default_storage.exists(name)
+
+        call_command('sweep_media', grace=0, stdout=StringIO())
+        assert not default_storage.exists(name)
+        assert not default_storage.exists(thumb)
+
+    def test_sweep_keeps_referenced_files(self, create_ad):
+        ad = create_ad(make_png())
+        ad.refresh_from_db()
+        call_command('sweep_media', grace=0, stdout=StringIO())
+        assert default_storage.exists(ad.image.name)
+        assert default_storage.exists(ad.image_renditions['thumb']['jpeg'])
+
+    def test_deduplicated_save_protects_file_from_release(self):
+        name = default_storage.save('ads/images/photo.png', ContentFile(b'abc'))
+        path = default_storage.path(name)
+        os.utime(path, (0, 0))
+        assert default_storage.save('ads/images/other.png', ContentFile(b'abc')) == name
+        assert not default_storage.delete_unless_recent(name, grace=60)
+        assert default_storage.exists(name)
+
+        os.utime(path, (0, 0))
+        assert default_storage.delete_unless_recent(name, grace=60)
+        assert not default_storage.exists(name)
+
+    def test_toggle_keeps_file(self, create_ad, django_capture_on_commit_callbacks):
+        ad = Ad.objects.get(pk=create_ad(make_png()).pk)
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.is_active = False
+            ad.save()
+        assert default_storage.exists(ad.image.name)
+
+    def test_default_avatar_is_never_released(self, setup_data, django_capture_on_commit_callbacks, tmp_path):
+        user, category = setup_data
+        default_avatar = tmp_path / 'images' / 'default-avatar.png'
+        default_avatar.parent.mkdir()
+        default_avatar.write_bytes(make_png())
+        with django_capture_on_commit_callbacks(execute=True):
+            user.delete()
+        assert default_avatar.exists()
+
+    def test_media_is_served_with_immutable_headers(self, create_ad):
+        ad = create_ad(make_png())
+        response = serve_media(RequestFactory().get('/'), ad.image.name)
+        assert response.status_code == 200
+        assert response['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+    def test_media_route_exists_only_in_debug(self):
+        # Testy działają z DEBUG=False - poza DEBUG media serwuje proxy.
+        with pytest.raises(Resolver404):
+            resolve('/media/ads/images/plik.png')
+
+    def test_trash_files_are_not_served(self, create_ad):
+        ad = create_ad(make_png())
+        trash = f'{ad.image.name}.0123.deleting'
+        os.rename(default_storage.path(ad.image.name), default_storage.path(trash))
+        with pytest.raises(Http404):
+            serve_media(RequestFactory().get('/'), trash)
@@ -0,0 +1,82 @@
+import decimal
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Value
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from ads.management.commands.benchmark_ad_serialization import Command as BenchmarkCommand
+from ads.models import Ad
+from ads.serializers import AD_LIST_FIELDS, AdRowSerializer, AdSerializer
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdRowSerializer:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def setup_ads(self):
+        user = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        category = Category.objects.create(name='Elektronika')
+        with_image = Ad.objects.create(user=user, category=category, title='Zdjęcie', description='Opis',
+                                       price=decimal.Decimal('1234.5'), city='Kraków', street='Długa 1')
+        Ad.objects.filter(pk=with_image.pk).update(image='ads/images/zdjęcie 1.jpg')
+        Ad.objects.create(user=user, category=category, title='Bez zdjęcia', description='Opis', price=10,
+                          city='Gdańsk', postal_code=None)
+        return user, category
+
+    def render_both(self, fields, queryset, context):
+        expected = AdSerializer(list(queryset), many=True, fields=fields, context=context).data
+        serializer = AdRowSerializer(fields, context=context)
+        rows = queryset.values(*serializer.get_columns(queryset))
+        return JSONRenderer().render(serializer.to_representation(rows)), JSONRenderer().render(expected)
+
+    @pytest.mark.parametrize('fields', [None, AD_LIST_FIELDS, ['price', 'title']])
+    def test_output_is_byte_identical(self, setup_ads, fields):
+        context = {'request': RequestFactory().get('/api/ads/')}
+        fast, expected = self.render_both(fields, Ad.objects.order_by('id'), context)
+        assert fast == expected
+
+    def test_output_without_request_uses_relative_urls(self, setup_ads):
+        fast, expected = self.render_both(['id', 'image'], Ad.objects.order_by('id'), {})
+        assert fast == expected
+
+    def test_annotated_is_favorite_matches(self, setup_ads):
+        user, category = setup_ads
+        queryset = Ad.objects.order_by('id').annotate(is_favorite=Value(True))
+        context = {'request': RequestFactory().get('/api/ads/')}
+        fast, expected = self.render_both(AD_LIST_FIELDS, queryset, context)
+        assert fast == expected
+
+    def test_list_view_matches_model_serializer(self, setup_ads):
+        response = APIClient().get(reverse('ad-list'), {'omit': 'is_favorite'})
+        request = response.wsgi_request
+        expected = AdSerializer(
+            Ad.objects.order_by('-created_at', '-pk'), many=True,
+            fields=[name for name in AD_LIST_FIELDS if name != 'is_favorite'], context={'request': request},
+        ).data
+        assert JSONRenderer().render(response.data['results']) == JSONRenderer().render(expected)
+
+    def test_benchmark_command_runs(self, capsys):
+        call_command('benchmark_ad_serialization', rows=[10], repeat=1)
+        assert 'µs/wiersz' in capsys.readouterr().out
+
+    def test_benchmark_command_rejects_different_outputs(self, monkeypatch):
+        build_rows = BenchmarkCommand.build_rows
+
+        def rows_without_renditions(self, count):
+            return [{k: v for k, v in row.items() if k != 'image_renditions'} for row in build_rows(self, count)]
+
+        monkeypatch.setattr(BenchmarkCommand, 'build_rows', rows_without_renditions)
+        with pytest.raises(CommandError):
+            call_command('benchmark_ad_serialization', rows=[10], repeat=1)
@@ -0,0 +1,52 @@
+import pytest
+from django.db.models import FloatField, Value
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from ads.filters import AdOrderingFilter
+from ads.models import Ad
+from ads.views import AdListView
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdSearch:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def create_ad(self):
+        user = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        category = Category.objects.create(name='Elektronika')
+
+        def make_ad(title, description='Opis', **kwargs):
+            return Ad.objects.create(user=user, category=category, title=title, description=description,
+                                     price=100, city='Kraków', **kwargs)
+        return make_ad
+
+    def test_search_matches_title_and_description(self, api_client, create_ad):
+        by_title = create_ad(title='Rower górski')
+        by_description = create_ad(title='Okazja', description='Sprzedam rower miejski')
+        create_ad(title='Telefon')
+        response = api_client.get(reverse('ad-list'), {'search': 'rower'})
+        assert response.status_code == status.HTTP_200_OK
+        assert {item['id'] for item in response.data['results']} == {by_title.id, by_description.id}
+
+    def test_search_vector_is_not_exposed(self, api_client, create_ad):
+        create_ad(title='Rower')
+        response = api_client.get(reverse('ad-list'))
+        assert 'search_vector' not in response.data['results'][0]
+
+    def test_ranked_results_default_to_rank_ordering(self):
+        request = Request(APIRequestFactory().get('/api/ads/', {'search': 'rower'}))
+        queryset = Ad.objects.annotate(search_rank=Value(0.5, output_field=FloatField()))
+        assert AdOrderingFilter().get_ordering(request, queryset, AdListView()) == ['-search_rank']
+
+    def test_explicit_ordering_wins_over_rank(self):
+        request = Request(APIRequestFactory().get('/api/ads/', {'search': 'rower', 'ordering': 'price'}))
+        queryset = Ad.objects.annotate(search_rank=Value(0.5, output_field=FloatField()))
+        assert AdOrderingFilter().get_ordering(request, queryset, AdListView()) == ['price']
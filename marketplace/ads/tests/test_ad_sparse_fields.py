@@ -0,0 +1,90 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.models import Ad
+from ads.serializers import AD_LIST_FIELDS
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdSparseFields:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self, settings):
+        settings.AD_VIEW_FLUSH_THRESHOLD = 1000
+        settings.AD_VIEW_FLUSH_INTERVAL = 3600
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_ads(self):
+        user = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        category = Category.objects.create(name='Elektronika')
+        ads = [
+            Ad.objects.create(user=user, category=category, title=f'Oferta {i}', description='Długi opis ' * 50,
+                              price=100 + i, city='Kraków')
+            for i in range(3)
+        ]
+        return user, category, ads
+
+    def ad_select(self, queries):
+        return [query['sql'] for query in queries.captured_queries if 'FROM "ads_ad"' in query['sql']]
+
+    def test_list_uses_compact_representation(self, api_client, setup_ads):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse('ad-list'))
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data['results'][0]) == set(AD_LIST_FIELDS) - {'is_favorite'}
+        assert all('"description"' not in sql for sql in self.ad_select(queries) if 'SELECT' in sql)
+
+    def test_fields_param_narrows_output_and_columns(self, api_client, setup_ads):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse('ad-list'), {'fields': 'id,title,description', 'ordering': 'price'})
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data['results'][0]) == {'id', 'title', 'description'}
+        page_query = self.ad_select(queries)[-1]
+        assert '"city"' not in page_query
+        assert '"price"' in page_query
+
+    def test_omit_param(self, api_client, setup_ads):
+        response = api_client.get(reverse('ad-list'), {'omit': 'image,category'})
+        assert set(response.data['results'][0]) == set(AD_LIST_FIELDS) - {'is_favorite', 'image', 'category'}
+
+    def test_cursor_pagination_does_not_load_deferred_columns(self, api_client, setup_ads):
+        response = api_client.get(reverse('ad-list'), {'fields': 'title', 'ordering': 'price', 'page_size': 2})
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(response.data['next'])
+        assert response.status_code == status.HTTP_200_OK
+        assert len(self.ad_select(queries)) == 2
+
+    def test_unknown_field_is_rejected(self, api_client, setup_ads):
+        response = api_client.get(reverse('ad-list'), {'fields': 'title,password'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'password' in response.data['fields']
+
+    def test_detail_fields_for_anonymous_and_authenticated(self, api_client, setup_ads):
+        user, category, ads = setup_ads
+        url = reverse('ad-detail', args=[ads[0].id])
+        response = api_client.get(url, {'fields': 'title,price'})
+        assert response.data == {'title': 'Oferta 0', 'price': '100.00'}
+        assert 'description' in api_client.get(url).data
+
+        api_client.force_authenticate(user=user)
+        response = api_client.get(url, {'omit': 'description'})
+        assert 'description' not in response.data
+        assert response.data['is_favorite'] is False
+
+    def test_by_category_supports_fields(self, api_client, setup_ads):
+        user, category, ads = setup_ads
+        response = api_client.get(reverse('ad-by-category', args=[category.id]), {'fields': 'id,city'})
+        assert response.data['results'][0] == {'id': ads[2].id, 'city': 'Kraków'}
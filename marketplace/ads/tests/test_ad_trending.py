@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads import trending
+from ads.models import Ad
+from categories.models import Category
+from favorites.models import Favorite
+from messaging.models import Message
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdTrending:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_data(self, settings):
+        settings.TRENDING_HALF_LIFE_HOURS = 24
+        settings.TRENDING_WEIGHTS = {'favorites': 1.0, 'messages': 2.0}
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+        parent = Category.objects.create(name='Elektronika')
+        child = Category.objects.create(name='Telefony', parent=parent)
+        other = Category.objects.create(name='Dom')
+        quiet = Ad.objects.create(user=seller, category=parent, title='Radio', description='Opis', price=50)
+        hot = Ad.objects.create(user=seller, category=child, title='Telefon', description='Opis', price=100)
+        elsewhere = Ad.objects.create(user=seller, category=other, title='Stół', description='Opis', price=300)
+        Favorite.objects.create(user=buyer, ad=hot)
+        Message.objects.create(sender=buyer, recipient=seller, ad=hot, content='Aktualne?')
+        Favorite.objects.create(user=buyer, ad=elsewhere)
+        return parent, quiet, hot, elsewhere
+
+    def test_decayed_sums_halves_weight_every_half_life(self):
+        sums = trending.decayed_sums([1, 1, 2], [0, 3600, 7200], weight=2.0, half_life=3600)
+        assert sums[1] == pytest.approx(3.0)
+        assert sums[2] == pytest.approx(0.5)
+
+    def test_decayed_sums_pure_python_fallback(self, monkeypatch):
+        monkeypatch.setattr(trending, 'np', None)
+        sums = trending.decayed_sums([5, 5], [0, 3600], weight=1.0, half_life=3600)
+        assert sums[5] == pytest.approx(1.5)
+
+    def test_decayed_sums_weights_grouped_counts(self):
+        sums = trending.decayed_sums([1, 2], [0, 3600], weight=1.0, half_life=3600, counts=[3, 4])
+        assert sums[1] == pytest.approx(3.0)
+        assert sums[2] == pytest.approx(2.0)
+
+    def test_compute_scores_combines_events(self, setup_data):
+        parent, quiet, hot, elsewhere = setup_data
+        # Zdarzenia w środku godziny - wiek kubełka godzinowego liczony jest od jego środka.
+        moment = timezone.now().replace(minute=30, second=0, microsecond=0)
+        Favorite.objects.update(created_at=moment)
+        Message.objects.update(timestamp=moment)
+        trending.compute_trending_scores(now=moment + timedelta(hours=24))
+        hot.refresh_from_db()
+        quiet.refresh_from_db()
+        elsewhere.refresh_from_db()
+        assert hot.trending_score == pytest.approx(1.5, rel=1e-3)
+        assert elsewhere.trending_score == pytest.approx(0.5, rel=1e-3)
+        assert quiet.trending_score == 0
+
+    def test_events_outside_window_reset_score(self, setup_data, settings):
+        parent, quiet, hot, elsewhere = setup_data
+        call_command('compute_trending_scores')
+        trending.compute_trending_scores(now=timezone.now() + timedelta(days=settings.TRENDING_WINDOW_DAYS + 1))
+        hot.refresh_from_db()
+        assert hot.trending_score == 0
+
+    def test_list_ordering_trending(self, api_client, setup_data):
+        parent, quiet, hot, elsewhere = setup_data
+        call_command('compute_trending_scores')
+        response = api_client.get(reverse('ad-list'), {'ordering': 'trending'})
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data['results']] == [hot.id, elsewhere.id, quiet.id]
+
+    def test_trending_by_category_includes_subcategories(self, api_client, setup_data):
+        parent, quiet, hot, elsewhere = setup_data
+        call_command('compute_trending_scores')
+        response = api_client.get(reverse('ad-trending-by-category', args=[parent.id]))
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data['results']] == [hot.id, quiet.id]
+
+    def test_view_count_growth_adds_decaying_score(self, setup_data, settings):
+        parent, quiet, hot, elsewhere = setup_data
+        settings.TRENDING_WEIGHTS = {'views': 0.5}
+        now = timezone.now()
+        Ad.objects.filter(pk=quiet.pk).update(view_count=4)
+
+        trending.compute_trending_scores(now=now)
+        quiet.refresh_from_db()
+        assert quiet.trending_views == pytest.approx(4.0)
+        assert quiet.trending_score == pytest.approx(2.0)
+
+        # Po jednym okresie półtrwania: stare wyświetlenia ważą połowę, nowe w całości.
+        Ad.objects.filter(pk=quiet.pk).update(view_count=6)
+        trending.compute_trending_scores(now=now + timedelta(hours=24))
+        quiet.refresh_from_db()
+        assert quiet.trending_views == pytest.approx(4.0)
+        assert quiet.trending_view_count == 6
+        assert quiet.trending_score == pytest.approx(2.0)
+
+        trending.compute_trending_scores(now=now + timedelta(hours=48))
+        quiet.refresh_from_db()
+        assert quiet.trending_score == pytest.approx(1.0)
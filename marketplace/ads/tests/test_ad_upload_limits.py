@@ -0,0 +1,109 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.models import Ad
+from categories.models import Category
+from utils.uploads import LimitedUploadHandler, UnsupportedUpload, UploadTooLarge
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+def make_png(size=(50, 50)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color=(0, 120, 0)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+class TestUploadLimits:
+    @pytest.fixture(autouse=True)
+    def media(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.MAX_UPLOAD_SIZE = 4 * 1024
+        settings.MAX_UPLOAD_REQUEST_OVERHEAD = 1024 * 1024
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+
+    @pytest.fixture
+    def ad_payload(self):
+        category = Category.objects.create(name='Elektronika')
+        return {'title': 'Telefon', 'description': 'Opis', 'price': '100.00', 'category': category.id, 'city': 'Kraków'}
+
+    def test_small_image_is_accepted(self, api_client, user, ad_payload):
+        api_client.force_authenticate(user=user)
+        image = SimpleUploadedFile('ok.png', make_png(), content_type='image/png')
+        response = api_client.post(reverse('ad-create'), {**ad_payload, 'image': image}, format='multipart')
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_oversized_image_is_rejected(self, api_client, user, ad_payload):
+        api_client.force_authenticate(user=user)
+        payload = make_png() + b'\0' * 8 * 1024
+        image = SimpleUploadedFile('big.png', payload, content_type='image/png')
+        response = api_client.post(reverse('ad-create'), {**ad_payload, 'image': image}, format='multipart')
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert not Ad.objects.exists()
+
+    def test_content_length_is_checked_before_reading(self, api_client, user, ad_payload, settings):
+        settings.MAX_UPLOAD_REQUEST_OVERHEAD = 0
+        api_client.force_authenticate(user=user)
+        image = SimpleUploadedFile('ok.png', make_png(), content_type='image/png')
+        response = api_client.post(reverse('ad-create'), {**ad_payload, 'description': 'x' * 8192, 'image': image},
+                                   format='multipart')
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    def test_non_image_is_rejected(self, api_client, user, ad_payload):
+        api_client.force_authenticate(user=user)
+        fake = SimpleUploadedFile('fake.png', b'#!/bin/sh\necho nie obraz\n', content_type='image/png')
+        response = api_client.post(reverse('ad-create'), {**ad_payload, 'image': fake}, format='multipart')
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    def test_ad_update_and_avatar_upload_are_limited(self, api_client, user, ad_payload):
+        ad = Ad.objects.create(user=user, category_id=ad_payload['category'], title='Telefon', description='Opis',
+                               price=100, city='Kraków')
+        api_client.force_authenticate(user=user)
+        big = make_png() + b'\0' * 8 * 1024
+        response = api_client.patch(reverse('ad-detail', args=[ad.id]),
+                                    {'image': SimpleUploadedFile('big.png', big)}, format='multipart')
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        response = api_client.patch(reverse('user-profile-update'),
+                                    {'avatar': SimpleUploadedFile('big.png', big)}, format='multipart')
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    def test_handler_counts_bytes_when_content_length_lies(self):
+        handler = LimitedUploadHandler(max_size=100)
+        handler.handle_raw_input(None, {}, 10, b'boundary')
+        handler.new_file('image', 'a.png', 'image/png', None)
+        handler.receive_data_chunk(make_png()[:64], 0)
+        with pytest.raises(UploadTooLarge):
+            handler.receive_data_chunk(b'\0' * 64, 64)
+
+    def test_handler_checks_signature_across_chunks(self):
+        handler = LimitedUploadHandler(max_size=1000)
+        handler.new_file('image', 'a.webp', 'image/webp', None)
+        handler.receive_data_chunk(b'RIFF', 0)
+        handler.receive_data_chunk(b'\x10\0\0\0WEBPVP8 ', 4)
+
+        handler = LimitedUploadHandler(max_size=1000)
+        handler.new_file('image', 'a.webp', 'image/webp', None)
+        handler.receive_data_chunk(b'RIFF', 0)
+        with pytest.raises(UnsupportedUpload):
+            handler.receive_data_chunk(b'\x10\0\0\0WAVEfmt ', 4)
+
+    def test_handler_rejects_tiny_non_image(self):
+        handler = LimitedUploadHandler(max_size=1000)
+        handler.new_file('image', 'a.png', 'image/png', None)
+        handler.receive_data_chunk(b'abc', 0)
+        with pytest.raises(UnsupportedUpload):
+            handler.file_complete(3)
@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.counters import ViewCounterBuffer, view_counter
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestAdViewCounter:
+    @pytest.fixture(autouse=True)
+    def flush_settings(self, settings):
+        settings.AD_VIEW_FLUSH_THRESHOLD = 3
+        settings.AD_VIEW_FLUSH_INTERVAL = 3600
+        view_counter.flush()
+        cache.clear()
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def ads(self):
+        user = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        category = Category.objects.create(name='Elektronika')
+        return [
+            Ad.objects.create(user=user, category=category, title=f'Oferta {i}', description='Opis', price=100)
+            for i in range(2)
+        ]
+
+    def test_views_are_buffered_until_threshold(self, ads):
+        buffer = ViewCounterBuffer()
+        buffer.record(ads[0].id)
+        buffer.record(ads[1].id)
+        ads[0].refresh_from_db()
+        assert ads[0].view_count == 0
+        assert buffer.pending() == 2
+
+        buffer.record(ads[0].id)
+        ads[0].refresh_from_db()
+        ads[1].refresh_from_db()
+        assert (ads[0].view_count, ads[1].view_count) == (2, 1)
+        assert buffer.pending() == 0
+
+    def test_flush_writes_all_ads_in_one_statement(self, ads):
+        buffer = ViewCounterBuffer()
+        buffer.record(ads[0].id)
+        buffer.record(ads[1].id)
+        with CaptureQueriesContext(connection) as queries:
+            assert buffer.flush() == 2
+        assert len(queries) == 1
+
+    def test_interval_triggers_flush(self, ads, settings):
+        settings.AD_VIEW_FLUSH_INTERVAL = 0
+        ViewCounterBuffer().record(ads[0].id)
+        ads[0].refresh_from_db()
+        assert ads[0].view_count == 1
+
+    def test_timer_flushes_idle_buffer(self, ads, settings):
+        settings.AD_VIEW_FLUSH_INTERVAL = 0.05
+        buffer = ViewCounterBuffer()
+        flushed = threading.Event()
+        buffer.flush = lambda: flushed.set() or 0
+        buffer.record(ads[0].id)
+        # Brak kolejnych record() - zapis wywołuje wątek w tle.
+        assert flushed.wait(2)
+
+    def test_detail_view_records_views(self, api_client, ads):
+        url = reverse('ad-detail', args=[ads[0].id])
+        for _ in range(3):
+            assert api_client.get(url).status_code == status.HTTP_200_OK
+        ads[0].refresh_from_db()
+        assert ads[0].view_count == 3
+
+    def test_missing_ad_is_not_recorded(self, api_client):
+        response = api_client.get(reverse('ad-detail', args=[999]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert view_counter.pending() == 0
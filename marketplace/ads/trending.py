@@ -0,0 +1,111 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from favorites.models import Favorite
+from messaging.models import Message
+from utils.helpers import iter_id_batches
+from .models import Ad
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Zdarzenia są zliczane w bazie w kubełkach godzinowych - wiek kubełka liczymy od jego środka.
+EVENT_BUCKET = 'hour'
+EVENT_BUCKET_SECONDS = 3600
+
+
+def get_event_sources():
+    # (klucz wagi w TRENDING_WEIGHTS, queryset zdarzeń, pole z czasem zdarzenia)
+    return [
+        ('favorites', Favorite.objects.all(), 'created_at'),
+        ('messages', Message.objects.all(), 'timestamp'),
+    ]
+
+
+def decayed_sums(ad_ids, ages, weight, half_life, counts=None):
+    """Suma ``count * weight * 0.5 ** (age / half_life)`` dla każdego ogłoszenia."""
+    if not ad_ids:
+        return {}
+    counts = counts or [1] * len(ad_ids)
+    if np is not None:
+        unique_ids, inverse = np.unique(np.asarray(ad_ids, dtype=np.int64), return_inverse=True)
+        decayed = weight * np.asarray(counts, dtype=np.float64) * np.exp2(-np.asarray(ages, dtype=np.float64) / half_life)
+        sums = np.bincount(inverse, weights=decayed)
+        return dict(zip(unique_ids.tolist(), sums.tolist()))
+
+    sums = defaultdict(float)
+    for ad_id, age, count in zip(ad_ids, ages, counts):
+        sums[ad_id] += count * weight * 0.5 ** (age / half_life)
+    return sums
+
+
+def compute_trending_scores(now=None, batch_size=None):
+    now = now or timezone.now()
+    batch_size = batch_size or settings.TRENDING_BATCH_SIZE
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    since = now - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+    now_ts = now.timestamp()
+
+    scores = defaultdict(float)
+    for key, queryset, time_field in get_event_sources():
+        weight = settings.TRENDING_WEIGHTS.get(key, 0)
+        if not weight:
+            continue
+        # Jeden wiersz na (ogłoszenie, godzinę) zamiast krotki na każde zdarzenie.
+        rows = (
+            queryset.filter(**{f'{time_field}__gte': since, 'ad__is_active': True})
+            .annotate(bucket=Trunc(time_field, EVENT_BUCKET)).order_by()
+            .values('ad_id', 'bucket').annotate(count=Count('id'))
+            .values_list('ad_id', 'bucket', 'count')
+        )
+        ad_ids, ages, counts = [], [], []
+        for ad_id, bucket, count in rows.iterator(chunk_size=batch_size):
+            ad_ids.append(ad_id)
+            ages.append(max(now_ts - bucket.timestamp() - EVENT_BUCKET_SECONDS / 2, 0.0))
+            counts.append(count)
+        for ad_id, value in decayed_sums(ad_ids, ages, weight, half_life, counts).items():
+            scores[ad_id] += value
+
+    return save_trending_scores(scores, batch_size, now)
+
+
+def save_trending_scores(scores, batch_size, now=None):
+    """
+    Zapisuje wynik ze zdarzeń powiększony o składnik wyświetleń. Wyświetlenia nie
+    mają znaczników czasu (ads.counters zapisuje same liczniki), więc przyrost
+    view_count od poprzedniego przeliczenia traktujemy jak zdarzenia z chwili
+    ``now``, a dotychczasową sumę wygaszamy o czas, który minął od tamtego przeliczenia.
+    """
+    now = now or timezone.now()
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    view_weight = settings.TRENDING_WEIGHTS.get('views', 0)
+    fields = ['trending_score', 'trending_views', 'trending_view_count', 'trending_computed_at']
+
+    updated = 0
+    for ids in iter_id_batches(Ad.objects.all(), batch_size):
+        changed = []
+        rows = Ad.objects.filter(pk__in=ids).values_list('pk', 'is_active', 'view_count', *fields)
+        for ad_id, is_active, view_count, current, views, seen, computed_at in rows:
+            elapsed = (now - computed_at).total_seconds() if computed_at else 0.0
+            new_views = max(view_count - seen, 0)
+            views = round(views * 0.5 ** (max(elapsed, 0.0) / half_life) + new_views, 6)
+            score = scores.get(ad_id, 0.0) + (view_weight * views if is_active else 0.0)
+            score = round(score, 6)
+            if score == current and not new_views and not views:
+                continue
+            changed.append(Ad(
+                pk=ad_id, trending_score=score, trending_views=views,
+                trending_view_count=view_count, trending_computed_at=now,
+            ))
+        if changed:
+            with transaction.atomic():
+                Ad.objects.bulk_update(changed, fields)
+            updated += len(changed)
+    return updated
@@ -1,18 +1,26 @@
-from django.urls import path
+from django.urls import path, re_path
 from .views import (
     AdListView,
+    AdFacetsView,
     AdCreateView,
+    AdImportView,
+    AdExportView,
     AdDetailView,
     AdToggleActiveView,
     AdByCategoryView,
+    AdTrendingByCategoryView,
     AdByUserView
 )
 
 urlpatterns = [
     path('', AdListView.as_view(), name='ad-list'),
+    path('facets/', AdFacetsView.as_view(), name='ad-facets'),
     path('create/', AdCreateView.as_view(), name='ad-create'), 
+    re_path(r'^export/(?P<export_format>ndjson|csv)/$', AdExportView.as_view(), name='ad-export'),
+    path('import/', AdImportView.as_view(), name='ad-import'),
     path('<int:pk>/', AdDetailView.as_view(), name='ad-detail'),
     path('<int:ad_id>/toggle-active/', AdToggleActiveView.as_view(), name='ad-toggle-active'),
     path('category/<int:category_id>/', AdByCategoryView.as_view(), name='ad-by-category'),
+    path('category/<int:category_id>/trending/', AdTrendingByCategoryView.as_view(), name='ad-trending-by-category'),
     path('user/<int:user_id>/', AdByUserView.as_view(), name='ad-by-user'),  
 ]
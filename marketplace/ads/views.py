@@ -1,24 +1,100 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from rest_framework import generics, permissions, filters
+from django.db.models import Count, Exists, Max, OuterRef, Sum
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, UnsupportedMediaType, ValidationError
+from favorites.models import Favorite
+from utils.conditional import ConditionalGetMixin, make_etag
+from utils.pagination import KeysetPagination
+from utils.sparse_fields import SparseFieldsViewMixin
+from utils.uploads import LimitedReader, LimitedUploadHandler, LimitedUploadMixin
+from .caching import get_cached_ad_detail
+from .counters import view_counter
+from .exporter import EXPORT_CONTENT_TYPES, aiter_chunks, iter_export, parse_updated_since
+from .facets import get_facets
+from .importer import AdImporter, detect_format
+from .filters import AdFilter, AdSearchFilter, AdOrderingFilter, filter_category_subtree
 from .models import Ad
-from .serializers import AdSerializer
+from .serializers import AD_LIST_FIELDS, AdRowSerializer, AdSerializer
 
-class AdListView(generics.ListAPIView):
+class FavoriteAnnotationMixin:
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_favorite=Exists(Favorite.objects.filter(user=user, ad=OuterRef('pk')))
+            )
+        return queryset
+
+
+class AdListConditionalMixin(ConditionalGetMixin):
+    # Agregat po przefiltrowanym zbiorze zamiast serializacji strony; view_count
+    # pomijamy celowo, żeby buforowane wyświetlenia nie unieważniały list.
+    # Tylko ETag: Max(updated_at) nie zmienia się przy licznikach ani przy ubyciu
+    # wierszy ze zbioru, więc samo If-Modified-Since dawałoby 304 dla starych danych.
+    def get_validators(self):
+        stats = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            last_modified=Max('updated_at'),
+            count=Count('id'),
+            favorites=Sum('favorites_count'),
+            messages=Sum('message_count'),
+            trending=Sum('trending_score'),
+        )
+        user_id = self.request.user.pk if self.request.user.is_authenticated else None
+        etag = make_etag(self.request.get_full_path(), user_id, *stats.values())
+        return etag, None
+
+
+class FastAdListMixin:
+    # Lista serializowana z values() przez AdRowSerializer - bez instancji modelu i pól DRF na wiersz.
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = AdRowSerializer(self.get_requested_fields(), context=self.get_serializer_context())
+        columns = serializer.get_columns(queryset)
+        if hasattr(self.paginator, 'get_ordering'):
+            columns += [field.lstrip('-') for field in self.paginator.get_ordering(request, queryset, self)]
+        rows = queryset.values(*dict.fromkeys(columns))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(rows))
+
+
+class AdListView(
+    AdListConditionalMixin, SparseFieldsViewMixin, FastAdListMixin, FavoriteAnnotationMixin, generics.ListAPIView,
+):
     serializer_class = AdSerializer
+    default_fields = AD_LIST_FIELDS
     permission_classes = [permissions.AllowAny]
     queryset = Ad.objects.filter(is_active=True)
+    pagination_class = KeysetPagination
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'city', 'street', 'postal_code', 'price']
+    filter_backends = [DjangoFilterBackend, AdSearchFilter, AdOrderingFilter]
+    filterset_class = AdFilter
     search_fields = ['title', 'description']
-    ordering_fields = ['price', 'created_at', 'updated_at']
+    ordering_fields = ['price', 'created_at', 'updated_at', 'favorites_count', 'message_count', 'trending_score']
     ordering = ['-created_at']
 
 
-class AdCreateView(generics.CreateAPIView):
+class AdFacetsView(AdListView):
+    pagination_class = None
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            facets = get_facets(queryset, request.query_params)
+        except ValueError as e:
+            raise ValidationError({"price_buckets": str(e)})
+        return Response(facets)
+
+
+class AdCreateView(LimitedUploadMixin, generics.CreateAPIView):
     serializer_class = AdSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -26,10 +102,65 @@ class AdCreateView(generics.CreateAPIView):
         serializer.save(user=self.request.user)
 
 
-class AdDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AdDetailView(
+    LimitedUploadMixin, ConditionalGetMixin, SparseFieldsViewMixin, FavoriteAnnotationMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     serializer_class = AdSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     queryset = Ad.objects.all()
+    validator_fields = ['id', 'updated_at', 'favorites_count', 'message_count', 'view_count']
+
+    def get_cached_detail(self):
+        def compute():
+            ad = self.get_object()
+            # Bez requestu w kontekście - w cache zostają względne adresy plików, niezależne od hosta.
+            context = {**self.get_serializer_context(), 'request': None}
+            data = dict(self.get_serializer(ad, fields=None, context=context).data)
+            etag = make_etag(*[getattr(ad, field) for field in self.validator_fields])
+            return {'data': data, 'etag': etag}
+
+        if not hasattr(self, '_cached_detail'):
+            self._cached_detail = get_cached_ad_detail(self.kwargs[self.lookup_field], compute)
+        return self._cached_detail
+
+    def get_validators(self):
+        # Bez Last-Modified - updated_at nie obejmuje liczników ani is_favorite.
+        if not self.request.user.is_authenticated:
+            return self.get_cached_detail()['etag'], None
+
+        row = self.get_queryset().filter(pk=self.kwargs[self.lookup_field]).values_list(
+            *self.validator_fields, 'is_favorite'
+        ).first()
+        if row is None:
+            return None, None
+        return make_etag(*row, self.request.user.pk), None
+
+    def use_sparse_queryset(self):
+        # Anonimowe odczyty idą z cache pełnej reprezentacji, zawężaną dopiero w retrieve().
+        return super().use_sparse_queryset() and self.request.user.is_authenticated
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            # Odpowiedź zawiera is_favorite zależne od użytkownika - bez cache.
+            response = super().retrieve(request, *args, **kwargs)
+        else:
+            data = self.absolute_media_urls(self.get_cached_detail()['data'])
+            response = Response({name: data[name] for name in self.get_requested_fields() if name in data})
+        view_counter.record(self.kwargs[self.lookup_field])
+        return response
+
+    def absolute_media_urls(self, data):
+        build_absolute_uri = self.request.build_absolute_uri
+        data = dict(data)
+        if data.get('image'):
+            data['image'] = build_absolute_uri(data['image'])
+        if data.get('image_renditions'):
+            data['image_renditions'] = {
+                rendition: {fmt: build_absolute_uri(url) for fmt, url in formats.items()}
+                for rendition, formats in data['image_renditions'].items()
+            }
+        return data
 
     def perform_update(self, serializer):
         if self.request.user != self.get_object().user:
@@ -42,6 +173,72 @@ class AdDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
+class AdImportUploadHandler(LimitedUploadHandler):
+    signatures = None
+
+    def __init__(self, request=None):
+        super().__init__(request, max_size=settings.AD_IMPORT_MAX_SIZE)
+
+
+class AdImportView(LimitedUploadMixin, APIView):
+    """
+    Import katalogu CSV/NDJSON jako plik ``file`` formularza multipart albo
+    bezpośrednio w ciele żądania (Content-Type ``text/csv`` lub
+    ``application/x-ndjson``). Dane są czytane strumieniowo. Ciało bez
+    Content-Length (chunked) jest przerywane po AD_IMPORT_MAX_SIZE bajtów -
+    partie zapisane wcześniej zostają.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    upload_handler_class = AdImportUploadHandler
+
+    def post(self, request):
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ValidationError({"file": "Nie przesłano pliku."})
+            fmt = detect_format(upload.content_type, upload.name)
+            stream = upload
+        else:
+            handler = self.upload_handler_class(request)
+            if int(request.META.get('CONTENT_LENGTH') or 0) > handler.max_size:
+                raise handler.too_large()
+            fmt = detect_format(request.content_type)
+            # request.stream z DRF jest None bez Content-Length (np. chunked) - czytamy ciało żądania
+            # Django, licząc bajty, bo limit z nagłówka nie obejmuje takich żądań.
+            stream = LimitedReader(request._request, handler.max_size, handler.too_large)
+        if fmt is None:
+            raise UnsupportedMediaType(request.content_type, "Obsługiwane formaty importu to CSV i NDJSON.")
+        return Response(AdImporter(request.user).run(stream, fmt))
+
+
+class AdExportView(APIView):
+    """
+    Strumieniowy eksport aktywnych ogłoszeń (NDJSON lub CSV) dla agregatorów.
+    ``?updated_since=<ISO 8601>`` zwraca tylko ogłoszenia zmienione od tej chwili,
+    razem z wyłączonymi i usuniętymi (patrz ads.exporter.iter_export).
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, export_format):
+        updated_since = self.get_updated_since()
+        content = iter_export(export_format, updated_since, request=request)
+        if isinstance(request._request, ASGIRequest):
+            # Pod ASGI strumień musi być asynchroniczny, inaczej Django zbuduje go w całości w pamięci.
+            content = aiter_chunks(content)
+        response = StreamingHttpResponse(content, content_type=EXPORT_CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename="ads.{export_format}"'
+        return response
+
+    def get_updated_since(self):
+        value = self.request.query_params.get('updated_since')
+        if not value:
+            return None
+        try:
+            return parse_updated_since(value)
+        except ValueError as e:
+            raise ValidationError({"updated_since": str(e)})
+
+
 class AdToggleActiveView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -52,22 +249,37 @@ class AdToggleActiveView(APIView):
             return Response({"error": "Ogłoszenie nie zostało znalezione."}, status=404)
 
         ad.is_active = not ad.is_active
-        ad.save()
+        ad.save(update_fields=['is_active', 'updated_at'])
         return Response({"message": "Status ogłoszenia został zmieniony."}, status=200)
 
 
-class AdByCategoryView(generics.ListAPIView):
+class AdByCategoryView(AdListConditionalMixin, SparseFieldsViewMixin, FastAdListMixin, generics.ListAPIView):
     serializer_class = AdSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['price', 'created_at', 'updated_at', 'favorites_count', 'message_count']
+    ordering = ['-created_at']
 
     def get_queryset(self):
         category_id = self.kwargs.get("category_id")
-        return Ad.objects.filter(category_id=category_id, is_active=True)
+        return filter_category_subtree(Ad.objects.filter(is_active=True), category_id)
 
 
-class AdByUserView(generics.ListAPIView):
+class AdTrendingByCategoryView(AdByCategoryView):
+    filter_backends = []
+    ordering = ['-trending_score']
+
+
+class AdByUserView(AdListConditionalMixin, SparseFieldsViewMixin, FastAdListMixin, generics.ListAPIView):
     serializer_class = AdSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['price', 'created_at', 'updated_at', 'favorites_count', 'message_count']
+    ordering = ['-created_at']
 
     def get_queryset(self):
         user_id = self.kwargs.get("user_id")
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
 from django.urls import reverse
 from django.utils.text import slugify
 
@@ -6,6 +8,8 @@ class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='subcategories')
+    # Ścieżka zmaterializowana, np. "1/5/12/" - poddrzewo to path__startswith=<ścieżka węzła>.
+    path = models.CharField(max_length=255, db_index=True, editable=False, default='')
 
     def __str__(self):
         return self.name
@@ -13,6 +17,15 @@ class Category(models.Model):
     def get_absolute_url(self):
         return reverse('category-detail', kwargs={'slug': self.slug})
 
+    def get_subtree(self):
+        return Category.objects.filter(path__startswith=self.path)
+
+    def build_path(self):
+        if self.parent_id is None:
+            return f"{self.pk}/"
+        parent_path = Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).get()
+        return f"{parent_path}{self.pk}/"
+
     def save(self, *args, **kwargs):
         if not self.slug:
             base_slug = slugify(self.name)
@@ -24,4 +37,16 @@ class Category(models.Model):
                 counter += 1
 
             self.slug = slug
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+        old_path = self.path
+        new_path = self.build_path()
+        if new_path == old_path:
+            return
+        if old_path:
+            Category.objects.filter(path__startswith=old_path).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1))
+            )
+        else:
+            Category.objects.filter(pk=self.pk).update(path=new_path)
+        self.path = new_path
@@ -9,4 +9,9 @@ class CategorySerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'name': {'required': True},
             'parent': {'required': False}
-        }
\ No newline at end of file
+        }
+
+    def validate_parent(self, value):
+        if value is not None and self.instance is not None and value.path.startswith(self.instance.path):
+            raise serializers.ValidationError("Kategoria nie może być podkategorią samej siebie.")
+        return value
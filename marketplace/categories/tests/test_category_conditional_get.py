@@ -0,0 +1,42 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from categories.models import Category
+
+@pytest.mark.django_db
+class TestCategoryConditionalGet:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def category(self):
+        return Category.objects.create(name='Elektronika')
+
+    @pytest.mark.parametrize('url_name', ['category-list-create', 'category-detail'])
+    def test_not_modified(self, api_client, category, url_name):
+        url = reverse(url_name, args=[category.id] if url_name == 'category-detail' else [])
+        etag = api_client.get(url)['ETag']
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_list_and_filtered_list_have_different_etags(self, api_client, category):
+        url = reverse('category-list-create')
+        assert api_client.get(url)['ETag'] != api_client.get(url, {'parent': category.id})['ETag']
+
+    def test_etag_changes_after_rename(self, api_client, category):
+        url = reverse('category-detail', args=[category.id])
+        etag = api_client.get(url)['ETag']
+        category.name = 'RTV'
+        category.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['name'] == 'RTV'
@@ -0,0 +1,55 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestCategoryPath:
+    @pytest.fixture
+    def tree(self):
+        electronics = Category.objects.create(name='Elektronika')
+        phones = Category.objects.create(name='Telefony', parent=electronics)
+        smartphones = Category.objects.create(name='Smartfony', parent=phones)
+        home = Category.objects.create(name='Dom')
+        return electronics, phones, smartphones, home
+
+    def test_path_is_built_on_create(self, tree):
+        electronics, phones, smartphones, home = tree
+        assert electronics.path == f"{electronics.id}/"
+        assert phones.path == f"{electronics.id}/{phones.id}/"
+        smartphones.refresh_from_db()
+        assert smartphones.path == f"{electronics.id}/{phones.id}/{smartphones.id}/"
+
+    def test_get_subtree(self, tree):
+        electronics, phones, smartphones, home = tree
+        assert set(electronics.get_subtree()) == {electronics, phones, smartphones}
+        assert set(home.get_subtree()) == {home}
+
+    def test_reparent_moves_whole_subtree(self, tree):
+        electronics, phones, smartphones, home = tree
+        phones.parent = home
+        phones.save()
+        smartphones.refresh_from_db()
+        assert smartphones.path == f"{home.id}/{phones.id}/{smartphones.id}/"
+        assert set(electronics.get_subtree()) == {electronics}
+
+    def test_move_to_root(self, tree):
+        electronics, phones, smartphones, home = tree
+        phones.parent = None
+        phones.save()
+        smartphones.refresh_from_db()
+        assert smartphones.path == f"{phones.id}/{smartphones.id}/"
+
+    def test_cannot_reparent_under_own_descendant(self, tree):
+        electronics, phones, smartphones, home = tree
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='testpassword', is_staff=True)
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        url = reverse('category-detail', kwargs={'pk': electronics.id})
+        response = client.patch(url, {'parent': smartphones.id}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['parent'] == ["Kategoria nie może być podkategorią samej siebie."]
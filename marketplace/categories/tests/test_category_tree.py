@@ -0,0 +1,72 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from categories.models import Category
+
+@pytest.mark.django_db
+class TestCategoryTreeView:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def tree(self):
+        electronics = Category.objects.create(name='Elektronika')
+        phones = Category.objects.create(name='Telefony', parent=electronics)
+        laptops = Category.objects.create(name='Laptopy', parent=electronics)
+        home = Category.objects.create(name='Dom')
+        return electronics, phones, laptops, home
+
+    def test_tree_is_nested(self, api_client, tree):
+        electronics, phones, laptops, home = tree
+        response = api_client.get(reverse('category-tree'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [
+            {'id': home.id, 'name': 'Dom', 'slug': 'dom', 'children': []},
+            {'id': electronics.id, 'name': 'Elektronika', 'slug': 'elektronika', 'children': [
+                {'id': laptops.id, 'name': 'Laptopy', 'slug': 'laptopy', 'children': []},
+                {'id': phones.id, 'name': 'Telefony', 'slug': 'telefony', 'children': []},
+            ]},
+        ]
+
+    def test_tree_is_built_with_one_query_and_cached(self, api_client, tree):
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(reverse('category-tree'))
+        assert len(queries) == 1
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(reverse('category-tree'))
+        assert len(queries) == 0
+
+    def test_cache_is_invalidated_on_save_and_delete(self, api_client, tree):
+        electronics, phones, laptops, home = tree
+        api_client.get(reverse('category-tree'))
+        Category.objects.create(name='Ogród')
+        response = api_client.get(reverse('category-tree'))
+        assert 'Ogród' in [node['name'] for node in response.data]
+        home.delete()
+        response = api_client.get(reverse('category-tree'))
+        assert 'Dom' not in [node['name'] for node in response.data]
+
+    def test_etag_not_modified(self, api_client, tree):
+        response = api_client.get(reverse('category-tree'))
+        etag = response['ETag']
+        response = api_client.get(reverse('category-tree'), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+
+    def test_etag_changes_with_taxonomy(self, api_client, tree):
+        etag = api_client.get(reverse('category-tree'))['ETag']
+        Category.objects.create(name='Ogród')
+        response = api_client.get(reverse('category-tree'), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
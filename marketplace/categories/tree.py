@@ -0,0 +1,38 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from .models import Category
+
+CATEGORY_TREE_CACHE_KEY = 'categories:tree'
+
+
+def build_category_tree():
+    nodes = {}
+    roots = []
+    rows = Category.objects.order_by('name').values_list('id', 'name', 'slug', 'parent_id')
+    for category_id, name, slug, parent_id in rows:
+        nodes[category_id] = {'id': category_id, 'name': name, 'slug': slug, 'parent_id': parent_id, 'children': []}
+
+    for node in nodes.values():
+        parent = nodes.get(node.pop('parent_id'))
+        if parent is None:
+            roots.append(node)
+        else:
+            parent['children'].append(node)
+    return roots
+
+
+def get_category_tree():
+    cached = cache.get(CATEGORY_TREE_CACHE_KEY)
+    if cached is None:
+        tree = build_category_tree()
+        payload = json.dumps(tree, separators=(',', ':'), ensure_ascii=False)
+        cached = {'tree': tree, 'etag': f'"{hashlib.sha1(payload.encode("utf-8")).hexdigest()}"'}
+        cache.set(CATEGORY_TREE_CACHE_KEY, cached, settings.CATEGORY_TREE_CACHE_TIMEOUT)
+    return cached['tree'], cached['etag']
+
+
+def invalidate_category_tree():
+    cache.delete(CATEGORY_TREE_CACHE_KEY)
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import CategoryListCreateView, CategoryRetrieveUpdateDestroyView
+from .views import CategoryListCreateView, CategoryRetrieveUpdateDestroyView, CategoryTreeView
 
 urlpatterns = [
     path('', CategoryListCreateView.as_view(), name='category-list-create'),
+    path('tree/', CategoryTreeView.as_view(), name='category-tree'),
     path('<int:pk>/', CategoryRetrieveUpdateDestroyView.as_view(), name='category-detail'),
 ]
@@ -1,7 +1,11 @@
 from rest_framework import generics, permissions
 from rest_framework.permissions import SAFE_METHODS
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from utils.conditional import ConditionalGetMixin, make_etag
 from .models import Category
 from .serializers import CategorySerializer
+from .tree import get_category_tree
 
 # Create your views here.
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -11,7 +15,14 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.user and request.user.is_staff
 
 
-class CategoryListCreateView(generics.ListCreateAPIView):
+class CategoryConditionalGetMixin(ConditionalGetMixin):
+    # ETag drzewa zmienia się przy każdej zmianie kategorii, więc wystarcza jako wersja całej tabeli.
+    def get_validators(self):
+        tree, tree_etag = get_category_tree()
+        return make_etag(tree_etag, self.request.get_full_path()), None
+
+
+class CategoryListCreateView(CategoryConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
 
@@ -23,7 +34,18 @@ class CategoryListCreateView(generics.ListCreateAPIView):
         return queryset
 
 
-class CategoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryRetrieveUpdateDestroyView(CategoryConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
+
+
+class CategoryTreeView(ConditionalGetMixin, APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get_validators(self):
+        tree, etag = get_category_tree()
+        return etag, None
+
+    def get(self, request):
+        return self.conditional_response(request, lambda: Response(get_category_tree()[0]))
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0003_ad_search_vector'),
+        ('favorites', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', 'ad'], name='favorites_f_user_id_e8ef1a_idx'),
+        ),
+    ]
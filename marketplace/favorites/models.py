@@ -4,4 +4,9 @@ from django.db import models
 class Favorite(models.Model):
     user = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='favorites')
     ad = models.ForeignKey('ads.Ad', on_delete=models.CASCADE, related_name='favorites')
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'ad']),
+        ]
@@ -0,0 +1,16 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ads.models import Ad
+from .models import Favorite
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(sender, instance, created, **kwargs):
+    if created:
+        Ad.objects.filter(pk=instance.ad_id).update(favorites_count=F('favorites_count') + 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(sender, instance, **kwargs):
+    Ad.objects.filter(pk=instance.ad_id).update(favorites_count=Greatest(F('favorites_count') - 1, 0))
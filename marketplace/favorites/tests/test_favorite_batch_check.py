@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from ads.models import Ad
+from categories.models import Category
+from favorites.models import Favorite
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestFavoriteBatchCheckView:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_favorites(self):
+        user = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        category = Category.objects.create(name='Elektronika')
+        ads = [
+            Ad.objects.create(user=seller, category=category, title=f'Oferta {i}', description='Opis', price=100, city='Kraków')
+            for i in range(3)
+        ]
+        Favorite.objects.create(user=user, ad=ads[0])
+        Favorite.objects.create(user=seller, ad=ads[1])
+        return user, ads
+
+    def test_batch_check_unauthenticated(self, api_client):
+        response = api_client.get(reverse('favorite-check-batch'), {'ad_ids': '1,2'})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_batch_check(self, api_client, setup_favorites):
+        user, ads = setup_favorites
+        api_client.force_authenticate(user=user)
+        ad_ids = ','.join(str(ad.id) for ad in ads)
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse('favorite-check-batch'), {'ad_ids': ad_ids})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'is_favorite': {ads[0].id: True, ads[1].id: False, ads[2].id: False}}
+        assert len(queries) == 1
+
+    def test_batch_check_missing_ids(self, api_client, setup_favorites):
+        user, ads = setup_favorites
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse('favorite-check-batch'))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {"error": "Parametr ad_ids jest wymagany."}
+
+    def test_batch_check_invalid_ids(self, api_client, setup_favorites):
+        user, ads = setup_favorites
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse('favorite-check-batch'), {'ad_ids': '1,abc'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_batch_check_too_many_ids(self, api_client, setup_favorites):
+        user, ads = setup_favorites
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse('favorite-check-batch'), {'ad_ids': ','.join(str(i) for i in range(1, 102))})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_ad_list_is_favorite_annotation(self, api_client, setup_favorites):
+        user, ads = setup_favorites
+        response = api_client.get(reverse('ad-list'))
+        assert 'is_favorite' not in response.data['results'][0]
+
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse('ad-list'))
+        assert {item['id']: item['is_favorite'] for item in response.data['results']} == {
+            ads[0].id: True, ads[1].id: False, ads[2].id: False,
+        }
+        response = api_client.get(reverse('ad-detail', kwargs={'pk': ads[0].id}))
+        assert response.data['is_favorite'] is True
@@ -40,3 +40,24 @@ class FavoriteCheckView(APIView):
     def get(self, request, ad_id):
         favorite = Favorite.objects.filter(user=request.user, ad_id=ad_id).exists()
         return Response({"is_favorite": favorite}, status=status.HTTP_200_OK)
+
+
+class FavoriteBatchCheckView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    max_ad_ids = 100
+
+    def get(self, request):
+        raw_ids = request.query_params.get('ad_ids', '')
+        try:
+            ad_ids = {int(ad_id) for ad_id in raw_ids.split(',') if ad_id.strip()}
+        except ValueError:
+            return Response({"error": "Parametr ad_ids musi zawierać listę identyfikatorów."}, status=status.HTTP_400_BAD_REQUEST)
+        if not ad_ids:
+            return Response({"error": "Parametr ad_ids jest wymagany."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ad_ids) > self.max_ad_ids:
+            return Response({"error": f"Można sprawdzić maksymalnie {self.max_ad_ids} ogłoszeń naraz."}, status=status.HTTP_400_BAD_REQUEST)
+
+        favorite_ids = set(
+            Favorite.objects.filter(user=request.user, ad_id__in=ad_ids).values_list('ad_id', flat=True)
+        )
+        return Response({"is_favorite": {ad_id: ad_id in favorite_ids for ad_id in sorted(ad_ids)}}, status=status.HTTP_200_OK)
@@ -2,6 +2,8 @@
 ASGI config for marketplace project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The messaging event stream (/api/messages/stream/) needs to be served by
+an ASGI server through this application.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
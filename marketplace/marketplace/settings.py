@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'users',
     'ads',
     'categories',
@@ -145,11 +146,112 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 MAX_UPLOAD_SIZE = 2 * 1024 * 1024
+# Zapas na pola formularza i nagłówki multipart przy sprawdzaniu Content-Length.
+MAX_UPLOAD_REQUEST_OVERHEAD = 64 * 1024
+
+# Wersje obrazów (maksymalny rozmiar w px) tworzone w tle po zapisie ogłoszenia lub awatara.
+IMAGE_RENDITIONS = {
+    'thumb': (200, 200),
+    'card': (600, 600),
+    'full': (1600, 1600),
+}
+IMAGE_RENDITION_QUALITY = 82
+IMAGE_PIPELINE_WORKERS = 2
+# True - przetwarzanie w wątku żądania (testy, środowiska bez puli wątków).
+IMAGE_PIPELINE_EAGER = False
+
+# Domyślnie pamięć procesu; na produkcji można wskazać współdzielony backend
+# (np. django.core.cache.backends.redis.RedisCache) zmiennymi środowiskowymi.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'marketplace'),
+    }
+}
+
+CATEGORY_TREE_CACHE_TIMEOUT = 60 * 60
+
+# Zmiany ogłoszenia unieważniają wpis od razu, ale liczniki (favorites_count, message_count,
+# view_count) zmieniane przez F() już nie - anonimowy odczyt może je pokazać z opóźnieniem do tego czasu.
+AD_DETAIL_CACHE_TIMEOUT = 60
+AD_DETAIL_CACHE_LOCK_TIMEOUT = 10
+AD_DETAIL_CACHE_LOCK_WAIT = 2
+
+# Import katalogów partnerów: wiersze walidowane i zapisywane partiami po AD_IMPORT_BATCH_SIZE.
+AD_IMPORT_BATCH_SIZE = 500
+AD_IMPORT_MAX_SIZE = 50 * 1024 * 1024
+AD_IMPORT_MAX_REPORTED_ERRORS = 1000
+
+# Eksport dla agregatorów - liczba wierszy pobieranych naraz z kursora bazy.
+AD_EXPORT_CHUNK_SIZE = 2000
+# Jak długo przechowujemy ślady usuniętych ogłoszeń; starszy updated_since wymaga pełnego eksportu.
+AD_TOMBSTONE_RETENTION_DAYS = 30
+
+AD_FACET_PRICE_BUCKETS = [0, 100, 500, 1000, 5000, 20000]
+AD_FACET_MAX_PRICE_BUCKETS = 20
+AD_FACET_CITY_LIMIT = 20
+AD_FACETS_CACHE_TIMEOUT = 60
+
+# Ranking "na czasie": każde zdarzenie traci połowę wagi co TRENDING_HALF_LIFE_HOURS.
+TRENDING_HALF_LIFE_HOURS = 48
+TRENDING_WINDOW_DAYS = 14
+# 'views' - przyrost view_count między przeliczeniami (wyświetlenia nie mają znaczników czasu).
+TRENDING_WEIGHTS = {
+    'favorites': 3.0,
+    'messages': 5.0,
+    'views': 0.2,
+}
+TRENDING_BATCH_SIZE = 1000
+
+# Wyświetlenia ogłoszeń są buforowane w pamięci procesu i zapisywane po AD_VIEW_FLUSH_THRESHOLD
+# wyświetleniach albo (wątek w tle, także bez ruchu) po AD_VIEW_FLUSH_INTERVAL sekundach. Przy awarii
+# procesu (SIGKILL, OOM) tracimy najwyżej wyświetlenia z ostatnich AD_VIEW_FLUSH_INTERVAL sekund.
+AD_VIEW_FLUSH_THRESHOLD = 100
+AD_VIEW_FLUSH_INTERVAL = 30
+
+# InMemoryChannelLayer dostarcza zdarzenia tylko klientom podłączonym do tego samego
+# procesu, dlatego aplikacja działa jako jeden proces ASGI (Dockerfile, docker-compose).
+# Przy wielu procesach lub węzłach BACKEND musi wskazywać warstwę współdzieloną
+# (podklasa messaging.realtime.BaseChannelLayer, np. na Redis pub/sub).
+MESSAGING_CHANNEL_LAYER = {
+    'BACKEND': 'messaging.realtime.InMemoryChannelLayer',
+    'OPTIONS': {'queue_size': 100},
+}
+MESSAGING_STREAM_HEARTBEAT = 15
+# Ważność biletu ?ticket= do otwarcia strumienia (sekundy).
+MESSAGING_STREAM_TICKET_TTL = 30
+
+MESSAGE_RETENTION_DELETED_DAYS = 30
+MESSAGE_RETENTION_INACTIVE_THREAD_DAYS = 365
+MESSAGE_PURGE_BATCH_SIZE = 500
 
 
 MEDIA_URL = '/media/' 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+STORAGES = {
+    'default': {'BACKEND': 'utils.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+# Pola plików, których wartości liczą się jako referencje - plik jest usuwany po zniknięciu ostatniej.
+MEDIA_FILE_REFERENCES = {
+    'ads.Ad': ['image'],
+    'users.UserProfile': ['avatar'],
+}
+# Plik użyty (zapisany lub zdeduplikowany) w tym czasie nie jest usuwany od razu - niezatwierdzony
+# jeszcze wiersz mógł go właśnie wskazać. Pominięte pliki usuwa później komenda sweep_media.
+MEDIA_RELEASE_GRACE_SECONDS = 15 * 60
+# Django serwuje /media/ tylko przy DEBUG. W produkcji robi to reverse proxy/CDN z katalogu MEDIA_ROOT,
+# z tymi samymi nagłówkami - pliki ``xx/<sha256>.<ext>`` nie zmieniają się pod tą samą nazwą. Np. nginx:
+#
+#   location ~ \.deleting$ { return 404; }  # kosze delete_unless_recent
+#   location ~ "^/media/(.+/)?([0-9a-f]{2})/\2[0-9a-f]{62}\.[A-Za-z0-9]+$" {
+#       root /app; add_header Cache-Control "public, max-age=31536000, immutable";
+#   }
+#   location /media/ { root /app; add_header Cache-Control "public, max-age=3600"; }
+MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+MEDIA_MAX_AGE = 60 * 60
+
 STATIC_URL = '/static/'  
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
+from django.urls import path, re_path, include
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views import CustomTokenObtainPairView 
+from .views import CustomTokenObtainPairView, serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -17,3 +19,10 @@ urlpatterns = [
     path('api/favorites/', include('favorites.urls')),
     path('api/messages/', include('messaging.urls')),
 ]
+
+# W produkcji /media/ serwuje reverse proxy/CDN (patrz MEDIA_IMMUTABLE_MAX_AGE w settings).
+if settings.DEBUG:
+    urlpatterns += [re_path(r'^media/(?P<path>.*)$', serve_media, name='media')]
+
+# Pod uvicornem (zamiast runserver) pliki statyczne w trybie DEBUG serwuje Django.
+urlpatterns += staticfiles_urlpatterns()
@@ -1,9 +1,13 @@
 # views.py
+from django.conf import settings
+from django.http import Http404
+from django.views.static import serve
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import CustomTokenObtainPairSerializer
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework import status
 from rest_framework.response import Response
+from utils.storage import TRASH_SUFFIX, ContentAddressedStorage
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
@@ -18,4 +22,16 @@ class CustomTokenObtainPairView(TokenObtainPairView):
                 return Response({'detail': 'Konto użytkownika jest zablokowane.'}, status=status.HTTP_400_BAD_REQUEST)
             raise 
 
-        return Response(serializer.validated_data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+def serve_media(request, path):
+    # Tylko dla DEBUG - nagłówki odpowiadają konfiguracji proxy opisanej przy MEDIA_IMMUTABLE_MAX_AGE.
+    if path.endswith(TRASH_SUFFIX):
+        raise Http404
+    # Pliki adresowane treścią nigdy się nie zmieniają pod tą samą nazwą.
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if ContentAddressedStorage.is_content_addressed(path):
+        response['Cache-Control'] = f'public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = f'public, max-age={settings.MEDIA_MAX_AGE}'
+    return response
@@ -0,0 +1,83 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+from messaging.models import Conversation, Message, UnreadCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Usuwa trwale miękko usunięte wiadomości starsze niż okres retencji "
+        "oraz stare rozmowy dotyczące nieaktywnych ogłoszeń. Działa w małych partiach."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--deleted-days', type=int, default=settings.MESSAGE_RETENTION_DELETED_DAYS)
+        parser.add_argument('--inactive-thread-days', type=int, default=settings.MESSAGE_RETENTION_INACTIVE_THREAD_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.MESSAGE_PURGE_BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=0.0, help="Przerwa między partiami (sekundy).")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        self.batch_size = options['batch_size']
+        self.sleep = options['sleep']
+        self.dry_run = options['dry_run']
+
+        deleted_cutoff = now - timedelta(days=options['deleted_days'])
+        messages = Message.objects.filter(is_deleted=True).filter(
+            Q(deleted_at__lt=deleted_cutoff) | Q(deleted_at__isnull=True, timestamp__lt=deleted_cutoff)
+        )
+        purged_messages = self.purge(messages, self.delete_messages)
+
+        thread_cutoff = now - timedelta(days=options['inactive_thread_days'])
+        threads = Conversation.objects.filter(ad__is_active=False, last_message_at__lt=thread_cutoff)
+        purged_threads = self.purge(threads, self.delete_conversations)
+
+        prefix = "[dry-run] " if self.dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Usunięto {purged_messages} wiadomości i {purged_threads} rozmów."
+        ))
+
+    def purge(self, queryset, delete_batch):
+        if self.dry_run:
+            return queryset.count()
+        total = 0
+        while True:
+            # Każda partia to osobna, krótka transakcja - bez długich blokad w godzinach szczytu.
+            with transaction.atomic():
+                ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:self.batch_size])
+                if not ids:
+                    return total
+                delete_batch(ids)
+            total += len(ids)
+            if self.sleep:
+                time.sleep(self.sleep)
+
+    def delete_messages(self, ids):
+        # last_message ma on_delete=SET_NULL - rozmowom, które tracą ostatnią wiadomość,
+        # wskazujemy najnowszą pozostałą, żeby skrzynka nie pokazywała pustego wątku.
+        affected = list(
+            Conversation.objects.select_for_update().filter(last_message_id__in=ids).values_list('pk', flat=True)
+        )
+        Message.objects.filter(pk__in=ids).delete()
+        if affected:
+            latest = Message.objects.filter(conversation_id=OuterRef('pk')).order_by('-pk').values('pk')[:1]
+            Conversation.objects.filter(pk__in=affected).update(last_message=Subquery(latest))
+
+    def delete_conversations(self, ids):
+        conversations = Conversation.objects.select_for_update().filter(pk__in=ids)
+        unread = Counter()
+        for user_a_id, user_b_id, unread_a, unread_b in conversations.values_list('user_a_id', 'user_b_id', 'unread_a', 'unread_b'):
+            unread[user_a_id] += unread_a
+            unread[user_b_id] += unread_b
+        for user_id, count in unread.items():
+            if count:
+                UnreadCounter.add(user_id, -count)
+        Message.objects.filter(conversation_id__in=ids).delete()
+        Conversation.objects.filter(pk__in=ids).delete()
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from messaging.models import Conversation, Message, UnreadCounter
+from utils.helpers import iter_id_batches
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Przelicza liczniki nieprzeczytanych wiadomości (wątki i użytkownicy) w partiach."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        conversations = self.rebuild_conversations(batch_size)
+        users = self.rebuild_users(batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Przeliczono liczniki: {conversations} rozmów, {users} użytkowników."
+        ))
+
+    def unread_messages(self):
+        return Message.objects.filter(is_read=False, is_deleted=False).order_by()
+
+    def rebuild_conversations(self, batch_size):
+        total = 0
+        for ids in iter_id_batches(Conversation.objects.all(), batch_size):
+            with transaction.atomic():
+                # Najpierw blokady, potem liczenie - przyrost z sygnału nowej wiadomości czeka
+                # na koniec partii, zamiast zostać nadpisany nieaktualną liczbą.
+                conversations = list(Conversation.objects.select_for_update().filter(pk__in=ids).only('id', 'user_a_id', 'user_b_id'))
+                counts = {
+                    (row['conversation_id'], row['recipient_id']): row['count']
+                    for row in self.unread_messages().filter(conversation_id__in=ids)
+                    .values('conversation_id', 'recipient_id').annotate(count=Count('id'))
+                }
+                for conversation in conversations:
+                    conversation.unread_a = counts.get((conversation.pk, conversation.user_a_id), 0)
+                    conversation.unread_b = counts.get((conversation.pk, conversation.user_b_id), 0)
+                Conversation.objects.bulk_update(conversations, ['unread_a', 'unread_b'])
+            total += len(conversations)
+        return total
+
+    def rebuild_users(self, batch_size):
+        total = 0
+        for ids in iter_id_batches(User.objects.all(), batch_size):
+            with transaction.atomic():
+                # Jak wyżej: liczniki użytkowników blokujemy przed policzeniem wiadomości.
+                list(UnreadCounter.objects.select_for_update().filter(user_id__in=ids).values_list('pk', flat=True))
+                counts = dict(
+                    self.unread_messages().filter(recipient_id__in=ids)
+                    .values('recipient_id').annotate(count=Count('id')).values_list('recipient_id', 'count')
+                )
+                UnreadCounter.objects.bulk_create(
+                    [UnreadCounter(user_id=user_id, count=counts.get(user_id, 0)) for user_id in ids],
+                    update_conflicts=True,
+                    unique_fields=['user'],
+                    update_fields=['count'],
+                )
+            total += len(ids)
+        return total
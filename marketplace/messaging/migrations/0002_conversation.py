@@ -0,0 +1,81 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_conversations(apps, schema_editor):
+    Message = apps.get_model('messaging', 'Message')
+    Conversation = apps.get_model('messaging', 'Conversation')
+
+    conversations = {}
+    messages = Message.objects.order_by('timestamp', 'id').values_list(
+        'id', 'ad_id', 'sender_id', 'recipient_id', 'timestamp', 'is_read', 'is_deleted'
+    )
+    for message_id, ad_id, sender_id, recipient_id, timestamp, is_read, is_deleted in messages.iterator(chunk_size=2000):
+        user_a_id, user_b_id = sorted((sender_id, recipient_id))
+        key = (ad_id, user_a_id, user_b_id)
+        conversation = conversations.get(key)
+        if conversation is None:
+            conversation = Conversation(ad_id=ad_id, user_a_id=user_a_id, user_b_id=user_b_id)
+            conversations[key] = conversation
+        conversation.last_message_id = message_id
+        conversation.last_message_at = timestamp
+        if not is_read and not is_deleted:
+            if recipient_id == user_a_id:
+                conversation.unread_a += 1
+            else:
+                conversation.unread_b += 1
+
+    for (ad_id, user_a_id, user_b_id), conversation in conversations.items():
+        conversation.save()
+        Message.objects.filter(
+            ad_id=ad_id,
+            sender_id__in=(user_a_id, user_b_id),
+            recipient_id__in=(user_a_id, user_b_id),
+        ).update(conversation=conversation)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0003_ad_search_vector'),
+        ('messaging', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('unread_a', models.PositiveIntegerField(default=0)),
+                ('unread_b', models.PositiveIntegerField(default=0)),
+                ('ad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to='ads.ad')),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message')),
+                ('user_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='conversation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='messaging.conversation'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['user_a', '-last_message_at', '-id'], name='messaging_c_user_a__58c7f7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['user_b', '-last_message_at', '-id'], name='messaging_c_user_b__a08b2f_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('ad', 'user_a', 'user_b'), name='messaging_conversation_unique_participants'),
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
@@ -1,20 +1,136 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from .realtime import publish_read_receipt
+
+class UnreadCounter(models.Model):
+    user = models.OneToOneField('users.CustomUser', on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.count}"
+
+    @classmethod
+    def add(cls, user_id, delta):
+        value = Greatest(F('count') + delta, 0)
+        if not cls.objects.filter(user_id=user_id).update(count=value):
+            cls.objects.get_or_create(user_id=user_id)
+            cls.objects.filter(user_id=user_id).update(count=value)
+
+    @classmethod
+    def get_count(cls, user_id):
+        return cls.objects.filter(user_id=user_id).values_list('count', flat=True).first() or 0
+
+
+class Conversation(models.Model):
+    # Uczestnicy są uporządkowani (user_a_id < user_b_id), więc para ma jeden wiersz na ogłoszenie.
+    ad = models.ForeignKey('ads.Ad', on_delete=models.CASCADE, related_name='conversations')
+    user_a = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='+')
+    user_b = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='+')
+    last_message = models.ForeignKey('Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message_at = models.DateTimeField(default=timezone.now)
+    unread_a = models.PositiveIntegerField(default=0)
+    unread_b = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Conversation between {self.user_a_id} and {self.user_b_id} about {self.ad_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ad', 'user_a', 'user_b'], name='messaging_conversation_unique_participants'),
+        ]
+        indexes = [
+            models.Index(fields=['user_a', '-last_message_at', '-id']),
+            models.Index(fields=['user_b', '-last_message_at', '-id']),
+        ]
+
+    @staticmethod
+    def ordered_participants(user_id, other_user_id):
+        return (user_id, other_user_id) if user_id <= other_user_id else (other_user_id, user_id)
+
+    @classmethod
+    def for_participants(cls, ad_id, user_id, other_user_id):
+        user_a_id, user_b_id = cls.ordered_participants(user_id, other_user_id)
+        conversation, _ = cls.objects.get_or_create(ad_id=ad_id, user_a_id=user_a_id, user_b_id=user_b_id)
+        return conversation
+
+    def other_user_id(self, user_id):
+        return self.user_b_id if user_id == self.user_a_id else self.user_a_id
+
+    def unread_field(self, user_id):
+        return 'unread_a' if user_id == self.user_a_id else 'unread_b'
+
+    def unread_count(self, user_id):
+        return getattr(self, self.unread_field(user_id))
+
+    def mark_read(self, user_id, up_to=None, message_ids=None):
+        messages = self.messages.filter(recipient_id=user_id, is_read=False, is_deleted=False)
+        if up_to is not None:
+            messages = messages.filter(id__lte=up_to)
+        if message_ids is not None:
+            messages = messages.filter(id__in=message_ids)
+
+        field = self.unread_field(user_id)
+        with transaction.atomic():
+            updated = messages.update(is_read=True)
+            if updated:
+                Conversation.objects.filter(pk=self.pk).update(**{field: Greatest(F(field) - updated, 0)})
+                UnreadCounter.add(user_id, -updated)
+                publish_read_receipt(self, user_id, up_to=up_to, message_ids=message_ids)
+        if updated:
+            self.refresh_from_db(fields=[field])
+        return updated
+
+
+class MessageQuerySet(models.QuerySet):
+    def for_serialization(self):
+        # Stały plan zapytania dla MessageSerializer i __str__ - bez dociągania relacji per wiadomość.
+        return self.select_related('sender', 'recipient', 'ad').only(
+            'id', 'content', 'timestamp', 'is_read', 'is_deleted', 'conversation_id',
+            'sender__id', 'sender__username', 'sender__email',
+            'recipient__id', 'recipient__username', 'recipient__email',
+            'ad__id', 'ad__title',
+        )
+
 
 class Message(models.Model):
     sender = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='sent_messages')
     recipient = models.ForeignKey('users.CustomUser', on_delete=models.CASCADE, related_name='received_messages')
     ad = models.ForeignKey('ads.Ad', on_delete=models.CASCADE, related_name='messages')
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, null=True, blank=True, related_name='messages')
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
     is_deleted = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = MessageQuerySet.as_manager()
 
     def __str__(self):
         return f"From {self.sender} to {self.recipient} about {self.ad.title}"
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['conversation', 'id']),
+            models.Index(fields=['deleted_at'], condition=models.Q(is_deleted=True), name='messaging_message_deleted_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Zapis i przyrost liczników z sygnału post_save w jednej transakcji - rebuild_unread_counters
+        # pod blokadą nie policzy wiadomości, której przyrost jeszcze nie doszedł.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def soft_delete(self):
+        now = timezone.now()
+        with transaction.atomic():
+            was_unread = Message.objects.filter(pk=self.pk, is_deleted=False, is_read=False).update(is_deleted=True, deleted_at=now)
+            if was_unread:
+                field = self.conversation.unread_field(self.recipient_id)
+                Conversation.objects.filter(pk=self.conversation_id).update(**{field: Greatest(F(field) - 1, 0)})
+                UnreadCounter.add(self.recipient_id, -1)
+            else:
+                Message.objects.filter(pk=self.pk, is_deleted=False).update(is_deleted=True, deleted_at=now)
         self.is_deleted = True
-        self.save()
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+_channel_layer = None
+_channel_layer_lock = threading.Lock()
+
+
+def user_group(user_id):
+    return f"user.{user_id}"
+
+
+class BaseChannelLayer(ABC):
+    """
+    Warstwa rozgłaszania zdarzeń do podłączonych klientów.
+
+    ``publish`` jest wywoływane synchronicznie (np. z sygnałów), a
+    ``subscribe`` i ``unsubscribe`` (z ``Subscription.close()``) z pętli
+    zdarzeń widoku strumieniującego.
+    """
+
+    @abstractmethod
+    def publish(self, group, event):
+        """Przekazuje zdarzenie wszystkim subskrypcjom grupy."""
+
+    @abstractmethod
+    def subscribe(self, group):
+        """Zwraca nową ``Subscription`` zapisaną do grupy."""
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        """Wypisuje subskrypcję z grupy; wywoływane przy zamknięciu strumienia."""
+
+
+class Subscription:
+    def __init__(self, layer, group, queue_size):
+        self.layer = layer
+        self.group = group
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, event):
+        # Wolny klient nie może blokować nadawcy - przy pełnej kolejce gubimy najstarsze zdarzenie.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.layer.unsubscribe(self)
+
+
+class InMemoryChannelLayer(BaseChannelLayer):
+    """Warstwa w pamięci procesu - dla testów i wdrożeń jednowęzłowych."""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def publish(self, group, event):
+        with self._lock:
+            subscriptions = list(self._groups.get(group, ()))
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.put, event)
+
+    def subscribe(self, group):
+        subscription = Subscription(self, group, self.queue_size)
+        with self._lock:
+            self._groups.setdefault(group, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._groups.get(subscription.group)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._groups[subscription.group]
+
+    def subscriber_count(self, group):
+        with self._lock:
+            return len(self._groups.get(group, ()))
+
+
+def get_channel_layer():
+    global _channel_layer
+    if _channel_layer is None:
+        with _channel_layer_lock:
+            if _channel_layer is None:
+                config = settings.MESSAGING_CHANNEL_LAYER
+                _channel_layer = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _channel_layer
+
+
+def reset_channel_layer():
+    global _channel_layer
+    _channel_layer = None
+
+
+def publish_on_commit(user_ids, event):
+    def publish():
+        layer = get_channel_layer()
+        for user_id in user_ids:
+            layer.publish(user_group(user_id), event)
+    transaction.on_commit(publish)
+
+
+def publish_message(message):
+    publish_on_commit([message.sender_id, message.recipient_id], {
+        'type': 'message',
+        'message': {
+            'id': message.id,
+            'conversation': message.conversation_id,
+            'ad': message.ad_id,
+            'sender': message.sender_id,
+            'recipient': message.recipient_id,
+            'content': message.content,
+            'timestamp': message.timestamp.isoformat(),
+        },
+    })
+
+
+def publish_read_receipt(conversation, reader_id, up_to=None, message_ids=None):
+    publish_on_commit([conversation.other_user_id(reader_id)], {
+        'type': 'read',
+        'conversation': conversation.id,
+        'reader': reader_id,
+        'up_to': up_to,
+        'ids': message_ids,
+    })
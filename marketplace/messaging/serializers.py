@@ -1,38 +1,107 @@
 from rest_framework import serializers
-from .models import Message
+from django.contrib.auth import get_user_model
+from ads.models import Ad
+from .models import Conversation, Message
+
+User = get_user_model()
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'username']
+
+
+class AdSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Ad
+        fields = ['id', 'title']
+
 
 class MessageSerializer(serializers.ModelSerializer):
-    sender = serializers.StringRelatedField(read_only=True)
-    recipient = serializers.StringRelatedField(read_only=True)
-    ad = serializers.StringRelatedField(read_only=True)
+    sender = UserSummarySerializer(read_only=True)
+    # Odbiorca wynika z rozmowy (albo z ogłoszenia przy pierwszej wiadomości) - nie da się go podać ani zmienić.
+    recipient = UserSummarySerializer(read_only=True)
+    ad = AdSummarySerializer(read_only=True)
+    conversation = serializers.PrimaryKeyRelatedField(
+        queryset=Conversation.objects.select_related('user_a', 'user_b'), write_only=True, required=False,
+    )
 
     class Meta:
         model = Message
-        fields = ['id', 'sender', 'recipient', 'ad', 'content', 'timestamp', 'is_read']
+        fields = ['id', 'sender', 'recipient', 'ad', 'conversation', 'content', 'timestamp', 'is_read']
         read_only_fields = ['id', 'sender', 'timestamp', 'is_read']
         extra_kwargs = {
             'content': {'required': True},
-            'recipient': {'required': True},
             'ad': {'required': True}
         }
 
     def validate(self, attrs):
+        if self.instance is not None:
+            # Edycja zmienia tylko treść - rozmowa i odbiorca zostają.
+            attrs.pop('conversation', None)
+            return attrs
+
         sender = self.context['request'].user
-        recipient = attrs.get('recipient')
-        ad = attrs.get('ad')
+        ad = attrs.get('ad') or self.context.get('ad')
         content = attrs.get('content')
-        if not recipient:
-            raise serializers.ValidationError("Odbiorca wiadomości jest wymagany.")
         if not ad:
             raise serializers.ValidationError("Ogłoszenie jest wymagane.")
         if ad and not ad.is_active:
             raise serializers.ValidationError("Ogłoszenie jest nieaktywne.")
         if not content:
             raise serializers.ValidationError("Treść wiadomości jest wymagana.")
-        if sender == recipient:
-            raise serializers.ValidationError("Nie możesz wysłać wiadomości do siebie.")
+        recipient = self.get_recipient(sender, ad, attrs.get('conversation'))
+        if not recipient.is_active:
+            raise serializers.ValidationError("Odbiorca wiadomości jest nieaktywny.")
+        attrs['recipient'] = recipient
         return attrs
 
+    def get_recipient(self, sender, ad, conversation):
+        if conversation is None:
+            # Pierwsza wiadomość trafia do wystawiającego; on sam odpowiada w istniejącej rozmowie.
+            if ad.user_id == sender.id:
+                raise serializers.ValidationError({'conversation': ["Wskaż rozmowę, na którą odpowiadasz."]})
+            return ad.user
+        if conversation.ad_id != ad.id or sender.id not in (conversation.user_a_id, conversation.user_b_id):
+            raise serializers.ValidationError({'conversation': ["Nie uczestniczysz w tej rozmowie o ogłoszeniu."]})
+        return conversation.user_b if conversation.user_a_id == sender.id else conversation.user_a
+
     def create(self, validated_data):
         validated_data['sender'] = self.context['request'].user
         return super().create(validated_data)
+
+
+class LastMessageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Message
+        fields = ['id', 'sender', 'content', 'timestamp', 'is_read']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.is_deleted:
+            data['content'] = None
+        return data
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    ad = AdSummarySerializer(read_only=True)
+    other_user = serializers.SerializerMethodField()
+    last_message = LastMessageSerializer(read_only=True)
+    unread_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Conversation
+        fields = ['id', 'ad', 'other_user', 'last_message', 'last_message_at', 'unread_count']
+
+    def get_other_user(self, obj):
+        user_id = self.context['request'].user.id
+        other_user = obj.user_b if obj.user_a_id == user_id else obj.user_a
+        return UserSummarySerializer(other_user).data
+
+    def get_unread_count(self, obj):
+        return obj.unread_count(self.context['request'].user.id)
+
+
+class MarkReadSerializer(serializers.Serializer):
+    up_to = serializers.IntegerField(required=False, min_value=1)
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=500)
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+from ads.models import Ad
+from .models import Conversation, Message, UnreadCounter
+from .realtime import publish_message
+
+@receiver(pre_save, sender=Message)
+def assign_conversation(sender, instance, **kwargs):
+    if instance.conversation_id is None:
+        instance.conversation = Conversation.for_participants(instance.ad_id, instance.sender_id, instance.recipient_id)
+
+
+@receiver(post_save, sender=Message)
+def update_conversation(sender, instance, created, **kwargs):
+    if not created:
+        return
+    conversation = instance.conversation
+    updates = {'last_message': instance, 'last_message_at': instance.timestamp}
+    if not instance.is_read:
+        unread_field = conversation.unread_field(instance.recipient_id)
+        updates[unread_field] = F(unread_field) + 1
+    with transaction.atomic():
+        Conversation.objects.filter(pk=conversation.pk).update(**updates)
+        if not instance.is_read:
+            UnreadCounter.add(instance.recipient_id, 1)
+        Ad.objects.filter(pk=instance.ad_id).update(message_count=F('message_count') + 1)
+    publish_message(instance)
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import secrets
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .realtime import get_channel_layer, user_group
+
+
+STREAM_TICKET_SALT = 'messaging.stream-ticket'
+STREAM_TICKET_USED_KEY = 'messaging:stream-ticket:{}'
+
+
+def issue_stream_ticket(user):
+    """
+    Krótko ważny, jednorazowy bilet do otwarcia strumienia. EventSource
+    w przeglądarce nie pozwala ustawić nagłówka Authorization, a token JWT
+    w adresie trafiałby do logów serwerów i historii przeglądarki.
+    """
+    return signing.dumps({'u': user.pk, 'n': secrets.token_urlsafe(16)}, salt=STREAM_TICKET_SALT)
+
+
+def redeem_stream_ticket(ticket):
+    ttl = settings.MESSAGING_STREAM_TICKET_TTL
+    try:
+        payload = signing.loads(ticket, salt=STREAM_TICKET_SALT, max_age=ttl)
+    except signing.BadSignature:
+        return None
+    # Ponowne użycie biletu (np. z logów) jest odrzucane - przy współdzielonym cache także między procesami.
+    if not cache.add(STREAM_TICKET_USED_KEY.format(payload['n']), 1, ttl):
+        return None
+    return get_user_model()._default_manager.filter(pk=payload['u']).first()
+
+
+def authenticate_stream_request(request):
+    authenticator = JWTAuthentication()
+    result = authenticator.authenticate(request)
+    if result is not None:
+        return result[0]
+    ticket = request.GET.get('ticket')
+    if ticket:
+        return redeem_stream_ticket(ticket)
+    return None
+
+
+async def event_stream(group, heartbeat):
+    subscription = get_channel_layer().subscribe(group)
+    try:
+        yield ': connected\n\n'
+        while True:
+            try:
+                event = await subscription.get(timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        subscription.close()
+
+
+class MessageStreamView(View):
+    """
+    Strumień Server-Sent Events z nowymi wiadomościami i potwierdzeniami
+    odczytu zalogowanego użytkownika. Wymaga serwera ASGI (marketplace.asgi).
+    Przeglądarka uwierzytelnia się biletem ``?ticket=`` z MessageStreamTicketView.
+    """
+    http_method_names = ['get']
+
+    async def get(self, request):
+        try:
+            user = await sync_to_async(authenticate_stream_request)(request)
+        except (AuthenticationFailed, InvalidToken, TokenError):
+            user = None
+        if user is None:
+            return JsonResponse({"detail": "Nie podano poprawnych danych uwierzytelniających."}, status=401)
+        if not user.is_active:
+            return JsonResponse({"detail": "Twoje konto jest zablokowane."}, status=403)
+
+        response = StreamingHttpResponse(
+            event_stream(user_group(user.id), settings.MESSAGING_STREAM_HEARTBEAT),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
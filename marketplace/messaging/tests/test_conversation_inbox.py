@@ -0,0 +1,113 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from messaging.models import Conversation, Message
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestConversationInbox:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def create_user(self):
+        def make_user(**kwargs):
+            kwargs.setdefault('email', f"{kwargs.get('username', 'testuser')}@example.com")
+            kwargs.setdefault('password', 'testpassword')
+            return User.objects.create_user(**kwargs)
+        return make_user
+
+    @pytest.fixture
+    def create_ad(self):
+        category = Category.objects.create(name='Testowa kategoria')
+
+        def make_ad(user, title='Testowa oferta'):
+            return Ad.objects.create(user=user, title=title, price=10.0, category=category)
+        return make_ad
+
+    def test_message_creates_single_conversation_per_pair(self, create_user, create_ad):
+        seller = create_user(username='seller')
+        buyer = create_user(username='buyer')
+        ad = create_ad(seller)
+        first = Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Dzień dobry')
+        second = Message.objects.create(sender=seller, recipient=buyer, ad=ad, content='Witam')
+        assert first.conversation_id == second.conversation_id
+        assert Conversation.objects.count() == 1
+
+        conversation = Conversation.objects.get()
+        assert conversation.last_message_id == second.id
+        assert conversation.unread_count(seller.id) == 1
+        assert conversation.unread_count(buyer.id) == 1
+
+    def test_inbox_unauthenticated(self, api_client):
+        response = api_client.get(reverse('conversation-list'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_inbox_lists_threads_by_latest_message(self, api_client, create_user, create_ad):
+        seller = create_user(username='seller')
+        buyer = create_user(username='buyer')
+        other = create_user(username='other')
+        bike = create_ad(seller, title='Rower')
+        phone = create_ad(seller, title='Telefon')
+        Message.objects.create(sender=buyer, recipient=seller, ad=bike, content='Czy rower aktualny?')
+        Message.objects.create(sender=other, recipient=seller, ad=phone, content='Czy telefon aktualny?')
+        Message.objects.create(sender=other, recipient=seller, ad=phone, content='Halo?')
+        last = Message.objects.create(sender=seller, recipient=buyer, ad=bike, content='Tak')
+        Message.objects.create(sender=buyer, recipient=other, ad=phone, content='Nie mój wątek')
+
+        api_client.force_authenticate(user=seller)
+        response = api_client.get(reverse('conversation-list'))
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert len(results) == 2
+        assert results[0]['ad'] == {'id': bike.id, 'title': 'Rower'}
+        assert results[0]['other_user'] == {'id': buyer.id, 'username': 'buyer'}
+        assert results[0]['last_message']['id'] == last.id
+        assert results[0]['last_message']['content'] == 'Tak'
+        assert results[0]['unread_count'] == 1
+        assert results[1]['other_user'] == {'id': other.id, 'username': 'other'}
+        assert results[1]['unread_count'] == 2
+
+    def test_inbox_query_count_does_not_depend_on_history(self, api_client, create_user, create_ad):
+        seller = create_user(username='seller')
+        ad = create_ad(seller)
+        buyers = [create_user(username=f'buyer{i}') for i in range(5)]
+        for buyer in buyers:
+            for _ in range(3):
+                Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Pytanie')
+
+        api_client.force_authenticate(user=seller)
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse('conversation-list'))
+        assert len(response.data['results']) == 5
+        assert len(queries) == 1
+
+    def test_deleted_last_message_content_is_hidden(self, api_client, create_user, create_ad):
+        seller = create_user(username='seller')
+        buyer = create_user(username='buyer')
+        ad = create_ad(seller)
+        message = Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Usunięta')
+        message.soft_delete()
+        api_client.force_authenticate(user=seller)
+        response = api_client.get(reverse('conversation-list'))
+        assert response.data['results'][0]['last_message']['content'] is None
+
+    def test_message_list_returns_own_messages(self, api_client, create_user, create_ad):
+        seller = create_user(username='seller')
+        buyer = create_user(username='buyer')
+        other = create_user(username='other')
+        ad = create_ad(seller)
+        Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Pytanie')
+        Message.objects.create(sender=other, recipient=seller, ad=ad, content='Inne pytanie')
+        api_client.force_authenticate(user=buyer)
+        response = api_client.get(reverse('message-list'))
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['content'] for item in response.data['results']] == ['Pytanie']
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from messaging.models import Conversation, Message
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestConversationReadView:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def thread(self):
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+        category = Category.objects.create(name='Testowa kategoria')
+        ad = Ad.objects.create(user=seller, title='Rower', price=10.0, category=category)
+        incoming = [Message.objects.create(sender=buyer, recipient=seller, ad=ad, content=f'Pytanie {i}') for i in range(4)]
+        outgoing = Message.objects.create(sender=seller, recipient=buyer, ad=ad, content='Odpowiedź')
+        return seller, buyer, ad, incoming, outgoing
+
+    def url(self, ad, user):
+        return reverse('conversation-mark-read', kwargs={'ad_id': ad.id, 'user_id': user.id})
+
+    def test_mark_read_unauthenticated(self, api_client, thread):
+        seller, buyer, ad, incoming, outgoing = thread
+        response = api_client.patch(self.url(ad, buyer))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_mark_whole_thread_read(self, api_client, thread):
+        seller, buyer, ad, incoming, outgoing = thread
+        api_client.force_authenticate(user=seller)
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.patch(self.url(ad, buyer), {}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"updated": 4, "unread_count": 0}
+        assert Message.objects.filter(recipient=seller, is_read=False).count() == 0
+        outgoing.refresh_from_db()
+        assert not outgoing.is_read
+        assert len([q for q in queries if q['sql'].startswith('UPDATE "messaging_message"')]) == 1
+
+    def test_mark_read_up_to(self, api_client, thread):
+        seller, buyer, ad, incoming, outgoing = thread
+        api_client.force_authenticate(user=seller)
+        response = api_client.patch(self.url(ad, buyer), {'up_to': incoming[1].id}, format='json')
+        assert response.data == {"updated": 2, "unread_count": 2}
+        assert list(Message.objects.filter(recipient=seller, is_read=False).order_by('id')) == incoming[2:]
+
+    def test_mark_read_ids(self, api_client, thread):
+        seller, buyer, ad, incoming, outgoing = thread
+        api_client.force_authenticate(user=seller)
+        response = api_client.patch(self.url(ad, buyer), {'ids': [incoming[0].id, incoming[3].id, outgoing.id]}, format='json')
+        assert response.data == {"updated": 2, "unread_count": 2}
+
+    def test_mark_read_twice_does_not_drift(self, api_client, thread):
+        seller, buyer, ad, incoming, outgoing = thread
+        api_client.force_authenticate(user=seller)
+        api_client.patch(self.url(ad, buyer), {'up_to': incoming[1].id}, format='json')
+        response = api_client.patch(self.url(ad, buyer), {'up_to': incoming[1].id}, format='json')
+        assert response.data == {"updated": 0, "unread_count": 2}
+
+    def test_single_message_read_updates_counter(self, api_client, thread):
+        seller, buyer, ad, incoming, outgoing = thread
+        api_client.force_authenticate(user=seller)
+        api_client.patch(reverse('message-mark-read', kwargs={'id': incoming[0].id}))
+        conversation = Conversation.objects.get()
+        assert conversation.unread_count(seller.id) == 3
+
+    def test_mark_read_unknown_conversation(self, api_client, thread):
+        seller, buyer, ad, incoming, outgoing = thread
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpassword')
+        api_client.force_authenticate(user=seller)
+        response = api_client.patch(self.url(ad, other), {}, format='json')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data == {"error": "Nie znaleziono rozmowy."}
+
+    def test_mark_read_invalid_payload(self, api_client, thread):
+        seller, buyer, ad, incoming, outgoing = thread
+        api_client.force_authenticate(user=seller)
+        response = api_client.patch(self.url(ad, buyer), {'up_to': 'abc'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
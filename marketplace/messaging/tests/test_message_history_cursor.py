@@ -0,0 +1,69 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from messaging.models import Message
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestMessageHistoryCursor:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def thread(self):
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+        category = Category.objects.create(name='Testowa kategoria')
+        ad = Ad.objects.create(user=seller, title='Rower', price=10.0, category=category)
+        messages = []
+        for i in range(7):
+            sender, recipient = (buyer, seller) if i % 2 == 0 else (seller, buyer)
+            messages.append(Message.objects.create(sender=sender, recipient=recipient, ad=ad, content=f'Wiadomość {i}'))
+        return seller, buyer, ad, messages
+
+    def url(self, ad, user):
+        return reverse('message-by-ad-and-user', kwargs={'ad_id': ad.id, 'user_id': user.id})
+
+    def test_latest_page_is_newest_first(self, api_client, thread):
+        seller, buyer, ad, messages = thread
+        api_client.force_authenticate(user=seller)
+        response = api_client.get(self.url(ad, buyer), {'limit': 3})
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data] == [m.id for m in reversed(messages[-3:])]
+        assert 'rel="previous"' in response['Link']
+        assert 'rel="next"' in response['Link']
+
+    def test_before_cursor_walks_history(self, api_client, thread):
+        seller, buyer, ad, messages = thread
+        api_client.force_authenticate(user=buyer)
+        response = api_client.get(self.url(ad, seller), {'limit': 5, 'before': messages[3].id})
+        assert [item['id'] for item in response.data] == [m.id for m in reversed(messages[:3])]
+        assert 'rel="previous"' not in response['Link']
+
+    def test_after_cursor_returns_only_new_messages(self, api_client, thread):
+        seller, buyer, ad, messages = thread
+        api_client.force_authenticate(user=seller)
+        response = api_client.get(self.url(ad, buyer), {'after': messages[4].id})
+        assert [item['id'] for item in response.data] == [messages[6].id, messages[5].id]
+
+        response = api_client.get(self.url(ad, buyer), {'after': messages[6].id})
+        assert response.data == []
+        assert 'after=%d' % messages[6].id in response['Link']
+
+    def test_after_cursor_with_limit_returns_oldest_unseen_first(self, api_client, thread):
+        seller, buyer, ad, messages = thread
+        api_client.force_authenticate(user=seller)
+        response = api_client.get(self.url(ad, buyer), {'after': messages[0].id, 'limit': 2})
+        assert [item['id'] for item in response.data] == [messages[2].id, messages[1].id]
+
+    def test_invalid_cursor(self, api_client, thread):
+        seller, buyer, ad, messages = thread
+        api_client.force_authenticate(user=seller)
+        response = api_client.get(self.url(ad, buyer), {'before': 'abc'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
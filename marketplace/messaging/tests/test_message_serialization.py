@@ -0,0 +1,124 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from messaging.models import Conversation, Message
+from messaging.serializers import MessageSerializer
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestMessageSerialization:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_thread(self):
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+        category = Category.objects.create(name='Testowa kategoria')
+        ad = Ad.objects.create(user=seller, title='Rower', price=10.0, category=category)
+
+        def send(count):
+            for i in range(count):
+                sender, recipient = (buyer, seller) if i % 2 == 0 else (seller, buyer)
+                Message.objects.create(sender=sender, recipient=recipient, ad=ad, content=f'Wiadomość {i}')
+        return seller, buyer, ad, send
+
+    def test_message_embeds_compact_summaries(self, setup_thread):
+        seller, buyer, ad, send = setup_thread
+        send(1)
+        data = MessageSerializer(Message.objects.for_serialization().get()).data
+        assert data['sender'] == {'id': buyer.id, 'username': 'buyer'}
+        assert data['recipient'] == {'id': seller.id, 'username': 'seller'}
+        assert data['ad'] == {'id': ad.id, 'title': 'Rower'}
+
+    def test_serializing_queryset_needs_no_extra_queries(self, setup_thread):
+        seller, buyer, ad, send = setup_thread
+        send(10)
+        messages = list(Message.objects.for_serialization())
+        with CaptureQueriesContext(connection) as queries:
+            MessageSerializer(messages, many=True).data
+            [str(message) for message in messages]
+        assert len(queries) == 0
+
+    @pytest.mark.parametrize('url_name', ['message-by-ad-and-user', 'message-list'])
+    def test_page_query_count_is_constant(self, api_client, setup_thread, url_name):
+        seller, buyer, ad, send = setup_thread
+        api_client.force_authenticate(user=seller)
+        kwargs = {'ad_id': ad.id, 'user_id': buyer.id} if url_name == 'message-by-ad-and-user' else {}
+        url = reverse(url_name, kwargs=kwargs)
+
+        send(2)
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url)
+        small_page = len(queries)
+        assert response.status_code == status.HTTP_200_OK
+
+        send(20)
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(url)
+        assert len(queries) == small_page
+
+    def test_create_message_by_ad(self, api_client, setup_thread):
+        seller, buyer, ad, send = setup_thread
+        api_client.force_authenticate(user=buyer)
+        url = reverse('message-create-by-ad', kwargs={'ad_id': ad.id})
+        response = api_client.post(url, {'content': 'Czy aktualne?'}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['recipient'] == {'id': seller.id, 'username': 'seller'}
+        assert response.data['sender'] == {'id': buyer.id, 'username': 'buyer'}
+        assert Message.objects.filter(ad=ad, sender=buyer, recipient=seller).exists()
+
+    def test_recipient_cannot_be_chosen(self, api_client, setup_thread):
+        seller, buyer, ad, send = setup_thread
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpassword')
+        api_client.force_authenticate(user=buyer)
+        url = reverse('message-create-by-ad', kwargs={'ad_id': ad.id})
+
+        response = api_client.post(url, {'recipient': other.id, 'content': 'Czy aktualne?'}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        message = Message.objects.get()
+        assert message.recipient == seller
+
+        serializer = MessageSerializer(message, data={'recipient': other.id, 'content': 'Zmiana'}, partial=True)
+        assert serializer.is_valid(), serializer.errors
+        serializer.save()
+        message.refresh_from_db()
+        assert message.content == 'Zmiana'
+        assert message.recipient == seller
+
+    def test_seller_replies_within_conversation(self, api_client, setup_thread):
+        seller, buyer, ad, send = setup_thread
+        send(1)
+        conversation = Conversation.objects.get()
+        api_client.force_authenticate(user=seller)
+        url = reverse('message-create-by-ad', kwargs={'ad_id': ad.id})
+
+        response = api_client.post(url, {'content': 'Tak'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'conversation' in response.data
+
+        response = api_client.post(url, {'conversation': conversation.id, 'content': 'Tak'}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['recipient'] == {'id': buyer.id, 'username': 'buyer'}
+        assert Message.objects.filter(conversation=conversation).count() == 2
+
+    def test_conversation_of_other_users_is_rejected(self, api_client, setup_thread):
+        seller, buyer, ad, send = setup_thread
+        send(1)
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpassword')
+        api_client.force_authenticate(user=other)
+        url = reverse('message-create-by-ad', kwargs={'ad_id': ad.id})
+
+        response = api_client.post(url, {'conversation': Conversation.objects.get().id, 'content': 'Hej'}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Message.objects.count() == 1
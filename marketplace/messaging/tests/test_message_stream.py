@@ -0,0 +1,135 @@
+import asyncio
+import json
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from messaging.models import Message
+from messaging.streams import issue_stream_ticket, redeem_stream_ticket
+from messaging.realtime import BaseChannelLayer, InMemoryChannelLayer, get_channel_layer, reset_channel_layer, user_group
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestMessageStream:
+    @pytest.fixture(autouse=True)
+    def channel_layer(self):
+        reset_channel_layer()
+        yield get_channel_layer()
+        reset_channel_layer()
+
+    @pytest.fixture
+    def setup_thread(self):
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+        category = Category.objects.create(name='Testowa kategoria')
+        ad = Ad.objects.create(user=seller, title='Rower', price=10.0, category=category)
+        return seller, buyer, ad
+
+    def test_in_memory_layer_delivers_to_group(self):
+        layer = InMemoryChannelLayer(queue_size=2)
+
+        async def scenario():
+            subscription = layer.subscribe('user.1')
+            other = layer.subscribe('user.2')
+            for i in range(3):
+                layer.publish('user.1', {'type': 'message', 'n': i})
+            await asyncio.sleep(0)
+            received = [await subscription.get(timeout=1), await subscription.get(timeout=1)]
+            assert other.queue.empty()
+            subscription.close()
+            other.close()
+            return received
+
+        assert async_to_sync(scenario)() == [{'type': 'message', 'n': 1}, {'type': 'message', 'n': 2}]
+        assert layer.subscriber_count('user.1') == 0
+
+    def test_message_create_publishes_to_both_participants(self, channel_layer, setup_thread, django_capture_on_commit_callbacks):
+        seller, buyer, ad = setup_thread
+        published = []
+        channel_layer.publish = lambda group, event: published.append((group, event))
+        with django_capture_on_commit_callbacks(execute=True):
+            message = Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Dzień dobry')
+        assert [group for group, _ in published] == [user_group(buyer.id), user_group(seller.id)]
+        assert published[0][1]['type'] == 'message'
+        assert published[0][1]['message']['id'] == message.id
+
+    def test_mark_read_publishes_receipt_to_sender(self, channel_layer, setup_thread, django_capture_on_commit_callbacks):
+        seller, buyer, ad = setup_thread
+        message = Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Dzień dobry')
+        published = []
+        channel_layer.publish = lambda group, event: published.append((group, event))
+        with django_capture_on_commit_callbacks(execute=True):
+            message.conversation.mark_read(seller.id, up_to=message.id)
+        assert published == [(user_group(buyer.id), {
+            'type': 'read', 'conversation': message.conversation_id, 'reader': seller.id, 'up_to': message.id, 'ids': None,
+        })]
+
+    def test_stream_requires_authentication(self):
+        async def scenario():
+            return await AsyncClient().get(reverse('message-stream'))
+        response = async_to_sync(scenario)()
+        assert response.status_code == 401
+
+    def test_stream_delivers_events(self, channel_layer, setup_thread):
+        seller, buyer, ad = setup_thread
+        api_client = APIClient()
+        api_client.force_authenticate(user=seller)
+        ticket = api_client.post(reverse('message-stream-ticket')).data['ticket']
+
+        async def scenario():
+            response = await AsyncClient().get(reverse('message-stream'), {'ticket': ticket})
+            assert response.status_code == 200
+            assert response['Content-Type'] == 'text/event-stream'
+            chunks = aiter(response.streaming_content)
+            first = await anext(chunks)
+            channel_layer.publish(user_group(seller.id), {'type': 'message', 'message': {'id': 1}})
+            second = await anext(chunks)
+            await chunks.aclose()
+            return first, second
+
+        first, second = async_to_sync(scenario)()
+        assert first == b': connected\n\n'
+        event, data = second.decode().strip().split('\n')
+        assert event == 'event: message'
+        assert json.loads(data[len('data: '):]) == {'type': 'message', 'message': {'id': 1}}
+        assert channel_layer.subscriber_count(user_group(seller.id)) == 0
+
+    def test_stream_ticket_is_single_use_and_expires(self, setup_thread, settings):
+        seller, buyer, ad = setup_thread
+        cache.clear()
+        ticket = issue_stream_ticket(seller)
+        assert redeem_stream_ticket(ticket) == seller
+        assert redeem_stream_ticket(ticket) is None
+        assert redeem_stream_ticket(ticket + 'x') is None
+
+        settings.MESSAGING_STREAM_TICKET_TTL = -1
+        assert redeem_stream_ticket(issue_stream_ticket(seller)) is None
+
+    def test_stream_rejects_access_token_in_query(self, setup_thread):
+        seller, buyer, ad = setup_thread
+        token = str(RefreshToken.for_user(seller).access_token)
+
+        async def scenario():
+            return await AsyncClient().get(reverse('message-stream'), {'token': token})
+        assert async_to_sync(scenario)().status_code == 401
+
+    def test_stream_ticket_requires_authentication(self):
+        assert APIClient().post(reverse('message-stream-ticket')).status_code == 401
+
+    def test_channel_layer_backend_must_implement_unsubscribe(self):
+        class IncompleteLayer(BaseChannelLayer):
+            def publish(self, group, event):
+                pass
+
+            def subscribe(self, group):
+                pass
+
+        with pytest.raises(TypeError):
+            IncompleteLayer()
@@ -0,0 +1,76 @@
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from messaging.models import Conversation, Message, UnreadCounter
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestPurgeMessages:
+    @pytest.fixture
+    def setup_users(self):
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+        category = Category.objects.create(name='Testowa kategoria')
+        ad = Ad.objects.create(user=seller, title='Rower', price=10.0, category=category)
+        return seller, buyer, ad
+
+    def test_purges_old_soft_deleted_messages_in_batches(self, setup_users):
+        seller, buyer, ad = setup_users
+        old = [Message.objects.create(sender=buyer, recipient=seller, ad=ad, content=f'Stara {i}') for i in range(5)]
+        recent = Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Świeża')
+        kept = Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Zostaje')
+        for message in old + [recent]:
+            message.soft_delete()
+        Message.objects.filter(pk__in=[m.pk for m in old]).update(deleted_at=timezone.now() - timedelta(days=31))
+
+        call_command('purge_messages', batch_size=2, deleted_days=30)
+
+        assert set(Message.objects.values_list('pk', flat=True)) == {recent.pk, kept.pk}
+        conversation = Conversation.objects.get()
+        assert conversation.last_message_id == kept.pk
+
+    def test_purging_last_message_points_conversation_to_latest_remaining(self, setup_users):
+        seller, buyer, ad = setup_users
+        earlier = Message.objects.create(sender=seller, recipient=buyer, ad=ad, content='Wcześniejsza')
+        last = Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Ostatnia')
+        last.soft_delete()
+        Message.objects.filter(pk=last.pk).update(deleted_at=timezone.now() - timedelta(days=31))
+
+        call_command('purge_messages', deleted_days=30)
+
+        assert Conversation.objects.get().last_message_id == earlier.pk
+
+    def test_legacy_deleted_messages_use_timestamp(self, setup_users):
+        seller, buyer, ad = setup_users
+        message = Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Stara')
+        Message.objects.filter(pk=message.pk).update(is_deleted=True, deleted_at=None, timestamp=timezone.now() - timedelta(days=40))
+        call_command('purge_messages', deleted_days=30)
+        assert not Message.objects.exists()
+
+    def test_ages_out_threads_on_inactive_ads(self, setup_users):
+        seller, buyer, ad = setup_users
+        other_ad = Ad.objects.create(user=seller, title='Telefon', price=10.0, category=ad.category)
+        Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Stary wątek')
+        Message.objects.create(sender=buyer, recipient=seller, ad=other_ad, content='Aktywny wątek')
+        Ad.objects.filter(pk=ad.pk).update(is_active=False)
+        Conversation.objects.update(last_message_at=timezone.now() - timedelta(days=400))
+        assert UnreadCounter.get_count(seller.id) == 2
+
+        call_command('purge_messages', inactive_thread_days=365)
+
+        assert list(Conversation.objects.values_list('ad_id', flat=True)) == [other_ad.id]
+        assert list(Message.objects.values_list('ad_id', flat=True)) == [other_ad.id]
+        assert UnreadCounter.get_count(seller.id) == 1
+
+    def test_dry_run_deletes_nothing(self, setup_users):
+        seller, buyer, ad = setup_users
+        message = Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Stara')
+        message.soft_delete()
+        Message.objects.update(deleted_at=timezone.now() - timedelta(days=31))
+        call_command('purge_messages', dry_run=True)
+        assert Message.objects.count() == 1
@@ -0,0 +1,78 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from messaging.models import Conversation, Message, UnreadCounter
+from ads.models import Ad
+from categories.models import Category
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+@pytest.mark.django_db
+class TestUnreadCounters:
+    @pytest.fixture
+    def api_client(self):
+        return APIClient()
+
+    @pytest.fixture
+    def setup_users(self):
+        seller = User.objects.create_user(username='seller', email='seller@example.com', password='testpassword')
+        buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpassword')
+        category = Category.objects.create(name='Testowa kategoria')
+        ad = Ad.objects.create(user=seller, title='Rower', price=10.0, category=category)
+        return seller, buyer, other, ad
+
+    def test_counter_follows_create_read_and_delete(self, setup_users):
+        seller, buyer, other, ad = setup_users
+        messages = [Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Pytanie') for _ in range(3)]
+        Message.objects.create(sender=other, recipient=seller, ad=ad, content='Pytanie')
+        assert UnreadCounter.get_count(seller.id) == 4
+
+        messages[0].conversation.mark_read(seller.id, message_ids=[messages[0].id])
+        assert UnreadCounter.get_count(seller.id) == 3
+
+        messages[1].soft_delete()
+        messages[1].soft_delete()
+        assert UnreadCounter.get_count(seller.id) == 2
+        conversation = Conversation.objects.get(pk=messages[0].conversation_id)
+        assert conversation.unread_count(seller.id) == 1
+
+        messages[0].soft_delete()
+        assert UnreadCounter.get_count(seller.id) == 2
+
+    def test_unread_count_endpoint(self, api_client, setup_users):
+        seller, buyer, other, ad = setup_users
+        Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Pytanie')
+        api_client.force_authenticate(user=seller)
+        response = api_client.get(reverse('message-unread-count'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"unread_count": 1}
+
+        api_client.force_authenticate(user=buyer)
+        response = api_client.get(reverse('message-unread-count'))
+        assert response.data == {"unread_count": 0}
+
+    def test_unread_count_unauthenticated(self, api_client):
+        response = api_client.get(reverse('message-unread-count'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_rebuild_command_reconciles_counters(self, setup_users):
+        seller, buyer, other, ad = setup_users
+        Message.objects.create(sender=buyer, recipient=seller, ad=ad, content='Pytanie')
+        Message.objects.create(sender=other, recipient=seller, ad=ad, content='Pytanie')
+        Message.objects.create(sender=seller, recipient=buyer, ad=ad, content='Odpowiedź')
+        Message.objects.filter(recipient=buyer).update(is_read=True)
+        UnreadCounter.objects.update(count=42)
+        Conversation.objects.update(unread_a=7, unread_b=7)
+
+        call_command('rebuild_unread_counters', batch_size=1)
+
+        assert UnreadCounter.get_count(seller.id) == 2
+        assert UnreadCounter.get_count(buyer.id) == 0
+        assert UnreadCounter.get_count(other.id) == 0
+        for conversation in Conversation.objects.all():
+            assert conversation.unread_count(seller.id) == 1
+            assert conversation.unread_count(conversation.other_user_id(seller.id)) == 0
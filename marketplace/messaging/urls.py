@@ -2,15 +2,25 @@ from django.urls import path
 from .views import (
     MessageCreateByAdView,
     MessageListView,
+    ConversationListView,
+    UnreadCountView,
+    MessageStreamTicketView,
     MessageDetailView,
     MessageReadView,
     MessageByAdAndUserView,
+    ConversationReadView,
 )
+from .streams import MessageStreamView
 
 urlpatterns = [
     path('', MessageListView.as_view(), name='message-list'),
+    path('inbox/', ConversationListView.as_view(), name='conversation-list'),
+    path('stream/', MessageStreamView.as_view(), name='message-stream'),
+    path('stream/ticket/', MessageStreamTicketView.as_view(), name='message-stream-ticket'),
+    path('unread-count/', UnreadCountView.as_view(), name='message-unread-count'),
     path('by-ad/<int:ad_id>/create/', MessageCreateByAdView.as_view(), name='message-create-by-ad'),
     path('<int:id>/', MessageDetailView.as_view(), name='message-detail'),
     path('<int:id>/read/', MessageReadView.as_view(), name='message-mark-read'),
     path('by-ad/<int:ad_id>/user/<int:user_id>/', MessageByAdAndUserView.as_view(), name='message-by-ad-and-user'),
+    path('by-ad/<int:ad_id>/user/<int:user_id>/read/', ConversationReadView.as_view(), name='conversation-mark-read'),
 ]
\ No newline at end of file
@@ -1,15 +1,18 @@
 from rest_framework import generics, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.conf import settings
 from django.db.models import Q
-from .models import Message
+from .models import Conversation, Message, UnreadCounter
 from ads.models import Ad
-from .serializers import MessageSerializer
+from .serializers import ConversationSerializer, MarkReadSerializer, MessageSerializer
+from .streams import issue_stream_ticket
 from rest_framework.permissions import BasePermission
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from utils.helpers import ActiveUserVerifier
+from utils.pagination import IdCursorPagination, KeysetPagination
 from django.core.exceptions import PermissionDenied
 
 User = get_user_model()
@@ -47,17 +50,52 @@ class MessageCreateByAdView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated, IsActiveUser]
     queryset = Message.objects.all()
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['ad'] = get_object_or_404(Ad, id=self.kwargs['ad_id'])
+        return context
+
     def perform_create(self, serializer):
         ad_id = self.kwargs['ad_id']
         serializer.save(sender=self.request.user, ad_id=ad_id)
 
 class MessageListView(generics.ListAPIView):
+    serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    pagination_class = KeysetPagination
+    ordering = ['-timestamp']
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Message.objects.filter(Q(receiver=user) | Q(sender=user)).select_related('sender', 'receiver', 'ad')
-        return queryset.filter(sender__is_active=True, receiver__is_active=True)
+        queryset = Message.objects.filter(Q(recipient=user) | Q(sender=user)).for_serialization()
+        return queryset.filter(sender__is_active=True, recipient__is_active=True)
+
+class ConversationListView(generics.ListAPIView):
+    serializer_class = ConversationSerializer
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+    pagination_class = KeysetPagination
+    ordering = ['-last_message_at']
+
+    def get_queryset(self):
+        user = self.request.user
+        return Conversation.objects.filter(Q(user_a=user) | Q(user_b=user)).select_related(
+            'ad', 'user_a', 'user_b', 'last_message'
+        )
+
+class UnreadCountView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+
+    def get(self, request):
+        return Response({"unread_count": UnreadCounter.get_count(request.user.id)}, status=200)
+
+class MessageStreamTicketView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+
+    def post(self, request):
+        return Response({
+            "ticket": issue_stream_ticket(request.user),
+            "expires_in": settings.MESSAGING_STREAM_TICKET_TTL,
+        }, status=200)
 
 class MessageDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = MessageSerializer
@@ -65,10 +103,10 @@ class MessageDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Message.objects.filter(Q(receiver=user) | Q(sender=user)).select_related('sender', 'receiver').filter(sender__is_active=True, receiver__is_active=True)
+        return Message.objects.filter(Q(recipient=user) | Q(sender=user)).for_serialization().filter(sender__is_active=True, recipient__is_active=True)
 
     def perform_destroy(self, instance):
-        if instance.sender == self.request.user or instance.receiver == self.request.user:
+        if instance.sender == self.request.user or instance.recipient == self.request.user:
             instance.soft_delete()
             return Response({"message": "Wiadomość została usunięta."}, status=204)
         return Response({"error": "Brak uprawnień."}, status=403)
@@ -82,17 +120,35 @@ class MessageReadView(APIView):
 
     def patch(self, request, id):
         try:
-            message = Message.objects.get(id=id, recipient=request.user, sender__is_active=True, recipient__is_active=True)
+            message = Message.objects.select_related('conversation').get(id=id, recipient=request.user, sender__is_active=True, recipient__is_active=True)
         except Message.DoesNotExist:
             return Response({"error": "Nie znaleziono wiadomości."}, status=404)
 
-        message.is_read = True
-        message.save()
+        message.conversation.mark_read(request.user.id, message_ids=[message.id])
         return Response({"message": "Wiadomość oznaczona jako przeczytana."}, status=200)
 
+class ConversationReadView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsActiveUser]
+
+    def patch(self, request, ad_id, user_id):
+        user_a_id, user_b_id = Conversation.ordered_participants(request.user.id, user_id)
+        conversation = Conversation.objects.filter(ad_id=ad_id, user_a_id=user_a_id, user_b_id=user_b_id).first()
+        if conversation is None:
+            return Response({"error": "Nie znaleziono rozmowy."}, status=404)
+
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = conversation.mark_read(
+            request.user.id,
+            up_to=serializer.validated_data.get('up_to'),
+            message_ids=serializer.validated_data.get('ids'),
+        )
+        return Response({"updated": updated, "unread_count": conversation.unread_count(request.user.id)}, status=200)
+
 class MessageByAdAndUserView(generics.ListAPIView):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated, AreBothUsersActive]
+    pagination_class = IdCursorPagination
 
     def dispatch(self, request, *args, **kwargs):
         try:
@@ -103,20 +159,9 @@ class MessageByAdAndUserView(generics.ListAPIView):
         return super().dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        ad_id = self.kwargs['ad_id']
-        other_user_id = self.kwargs['user_id']
-        user_id = self.request.user.id
-
-        queryset1 = Message.objects.filter(
-            ad_id=ad_id,
-            sender_id=user_id,
-            recipient_id=other_user_id
-        ).select_related('sender', 'recipient')
-
-        queryset2 = Message.objects.filter(
-            ad_id=ad_id,
-            recipient_id=user_id,
-            sender_id=other_user_id
-        ).select_related('sender', 'recipient')
-
-        return queryset1.union(queryset2)
\ No newline at end of file
+        user_a_id, user_b_id = Conversation.ordered_participants(self.request.user.id, self.kwargs['user_id'])
+        return Message.objects.filter(
+            conversation__ad_id=self.kwargs['ad_id'],
+            conversation__user_a_id=user_a_id,
+            conversation__user_b_id=user_b_id,
+        ).for_serialization()
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_userprofile_avatar_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='avatar',
+            field=models.ImageField(blank=True, db_index=True, default='images/default-avatar.png', null=True, upload_to='users/avatars/'),
+        ),
+    ]
@@ -62,7 +62,8 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 
 class UserProfile(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='profile')
-    avatar = models.ImageField(upload_to='users/avatars/', blank=True, null=True, default='images/default-avatar.png')
+    avatar = models.ImageField(upload_to='users/avatars/', blank=True, null=True, default='images/default-avatar.png', db_index=True)
+    avatar_renditions = models.JSONField(default=dict, blank=True, editable=False)
     phone = models.CharField(max_length=15, blank=True)
     address = models.CharField(max_length=255, blank=True)
     bio = models.TextField(blank=True)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.core.validators import RegexValidator
+from utils.images import ImageRenditionsField
 from .models import CustomUser, UserProfile
 from .validators import (
     validate_unique_email,
@@ -71,6 +72,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', required=False)
     email = serializers.EmailField(source='user.email', required=False)
     avatar = serializers.ImageField(required=False)
+    avatar_renditions = ImageRenditionsField(storage=UserProfile._meta.get_field('avatar').storage)
 
     phone_regex = RegexValidator(
         regex=r'^\+?1?\d{9,15}$',
@@ -82,7 +84,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = UserProfile
-        fields = ['username', 'email', 'avatar', 'phone', 'address', 'bio']
+        fields = ['username', 'email', 'avatar', 'avatar_renditions', 'phone', 'address', 'bio']
 
     def validate(self, data):
         user_data = data.get('user', {})
@@ -1,8 +1,30 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
+from utils.images import schedule_renditions
+from utils.storage import release_deleted_file, release_replaced_file, remember_file
 from .models import CustomUser, UserProfile
 
 @receiver(post_save, sender=CustomUser)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def generate_avatar_renditions(sender, instance, **kwargs):
+    schedule_renditions(instance, 'avatar', 'avatar_renditions')
+
+
+@receiver(post_init, sender=UserProfile)
+def remember_avatar_file(sender, instance, **kwargs):
+    remember_file(instance, 'avatar', 'avatar_renditions')
+
+
+@receiver(post_save, sender=UserProfile)
+def release_replaced_avatar_file(sender, instance, created, **kwargs):
+    release_replaced_file(instance, 'avatar', 'avatar_renditions', created=created)
+
+
+@receiver(post_delete, sender=UserProfile)
+def release_deleted_avatar_file(sender, instance, **kwargs):
+    release_deleted_file(instance, 'avatar', 'avatar_renditions')
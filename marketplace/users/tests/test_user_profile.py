@@ -168,4 +168,37 @@ class TestPublicUserProfileView:
         assert response.data['avatar'] == f'{settings.MEDIA_URL}images/default-avatar.png'
         assert response.data['phone'] == ''
         assert response.data['address'] == ''
-        assert response.data['bio'] == ''
\ No newline at end of file
+        assert response.data['bio'] == ''
+
+@pytest.mark.django_db
+class TestPublicUserProfileConditionalGet:
+    def test_profile_not_modified(self, api_client, create_user):
+        user = create_user(username="etag_user")
+        url = reverse('public-user-profile', kwargs={'username': user.username})
+        etag = api_client.get(url)['ETag']
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+
+    def test_profile_etag_changes_after_update(self, api_client, create_user):
+        user = create_user(username="etag_user")
+        url = reverse('public-user-profile', kwargs={'username': user.username})
+        etag = api_client.get(url)['ETag']
+        UserProfile.objects.filter(user=user).update(bio="Nowy opis")
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['bio'] == "Nowy opis"
+        assert response['ETag'] != etag
+
+    def test_missing_profile_has_no_etag(self, api_client):
+        response = api_client.get(reverse('public-user-profile', kwargs={'username': "non_existent_user"}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert not response.has_header('ETag')
+
+    def test_deactivated_profile_returns_404_despite_etag(self, api_client, create_user):
+        user = create_user(username="etag_user")
+        url = reverse('public-user-profile', kwargs={'username': user.username})
+        etag = api_client.get(url)['ETag']
+        CustomUser.objects.filter(pk=user.pk).update(is_active=False)
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -9,6 +9,8 @@ from rest_framework import status
 from django.contrib.auth import update_session_auth_hash
 import logging
 from utils.helpers import ActiveUserVerifier  
+from utils.conditional import ConditionalGetMixin, make_etag
+from utils.uploads import LimitedUploadMixin
 
 logger = logging.getLogger(__name__)
 active_user_verifier = ActiveUserVerifier() 
@@ -29,7 +31,7 @@ class MeView(generics.RetrieveAPIView):
         return user
 
 
-class UserProfileUpdateView(generics.UpdateAPIView):
+class UserProfileUpdateView(LimitedUploadMixin, generics.UpdateAPIView):
     serializer_class = UserProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -55,17 +57,38 @@ class UserProfileUpdateView(generics.UpdateAPIView):
         logger.info(f"Dane serializatora po zapisie: {serializer.instance.user.username}, {serializer.instance.user.email}")
 
 
-class PublicUserProfileView(generics.GenericAPIView):
+class PublicUserProfileView(ConditionalGetMixin, generics.GenericAPIView):
     permission_classes = []
+    validator_fields = [
+        'user__username', 'user__email', 'user__is_active', 'avatar', 'avatar_renditions', 'phone', 'address', 'bio',
+    ]
+
+    def get_validators(self):
+        # Profil nie ma znacznika czasu modyfikacji, więc ETag liczymy z kolumn zwracanych w odpowiedzi.
+        row = UserProfile.objects.filter(user__username=self.kwargs['username']).values_list(
+            *self.validator_fields
+        ).first()
+        if row is None:
+            return None, None
+        return make_etag(*row), None
 
     def get(self, request, username):
+        # Widoczność przed sprawdzeniem ETag - nieaktywny profil ma dać 404, a nie 304.
+        user = self.get_visible_user(request, username)
+        return self.conditional_response(request, lambda: self.get_profile(user))
+
+    def get_visible_user(self, request, username):
         try:
             user = CustomUser.objects.get(username=username)
-            if not user.is_active and request.user != user and not request.user.is_staff:
-                raise NotFound(detail="Użytkownik nie znaleziony") 
-            profile = UserProfile.objects.get(user=user)
         except CustomUser.DoesNotExist:
             raise NotFound(detail="Użytkownik nie znaleziony")
+        if not user.is_active and request.user != user and not request.user.is_staff:
+            raise NotFound(detail="Użytkownik nie znaleziony")
+        return user
+
+    def get_profile(self, user):
+        try:
+            profile = UserProfile.objects.get(user=user)
         except UserProfile.DoesNotExist:
             profile = None
 
@@ -0,0 +1,41 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    raw = '|'.join(str(part) for part in parts)
+    return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+class ConditionalGetMixin:
+    """
+    Obsługa warunkowego GET (ETag/Last-Modified, odpowiedź 304).
+
+    Widok implementuje ``get_validators()`` zwracające ``(etag, last_modified)``;
+    walidatory powinny wynikać z tanich zapytań (agregaty, kilka kolumn),
+    bo są liczone przed serializacją odpowiedzi.
+    """
+
+    def get_validators(self):
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+        )
+
+    def conditional_response(self, request, build_response):
+        etag, last_modified = self.get_validators()
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = build_response()
+            if response.status_code != 200:
+                return response
+        if etag:
+            response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
@@ -3,4 +3,14 @@ from rest_framework.exceptions import PermissionDenied
 class ActiveUserVerifier:
     def verify(self, user):
         if not user.is_active:
-            raise PermissionDenied("Twoje konto jest zablokowane.")
\ No newline at end of file
+            raise PermissionDenied("Twoje konto jest zablokowane.")
+
+
+def iter_id_batches(queryset, batch_size):
+    last_id = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
@@ -0,0 +1,167 @@
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+from rest_framework import serializers
+from .storage import ContentAddressedStorage, release_file
+
+logger = logging.getLogger(__name__)
+
+# format w mapie wersji -> (format Pillow, rozszerzenie pliku)
+RENDITION_FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_PIPELINE_WORKERS, thread_name_prefix='image-renditions'
+            )
+        return _executor
+
+
+def rendition_target(source_name, extension):
+    # Nazwę pliku nadaje magazyn ze skrótu treści - wybieramy tylko katalog i rozszerzenie.
+    directory = posixpath.dirname(source_name)
+    if ContentAddressedStorage.is_content_addressed(source_name):
+        directory = posixpath.dirname(directory)
+    return posixpath.join(directory, 'renditions', f'rendition.{extension}')
+
+
+def render_renditions(field_file):
+    """
+    Tworzy wersje obrazu z IMAGE_RENDITIONS w formatach WebP i JPEG. Orientacja
+    z EXIF jest nakładana na piksele, a same metadane nie są zapisywane.
+    """
+    storage = field_file.storage
+    with storage.open(field_file.name, 'rb') as source, Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    has_alpha = 'A' in image.getbands()
+    variants = {
+        'webp': image.convert('RGBA' if has_alpha else 'RGB'),
+        'jpeg': image.convert('RGB'),
+    }
+
+    renditions = {}
+    for rendition, size in settings.IMAGE_RENDITIONS.items():
+        renditions[rendition] = {}
+        for fmt, (pil_format, extension) in RENDITION_FORMATS.items():
+            resized = variants[fmt].copy()
+            resized.thumbnail(size, Image.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, quality=settings.IMAGE_RENDITION_QUALITY)
+            name = rendition_target(field_file.name, extension)
+            renditions[rendition][fmt] = storage.save(name, ContentFile(buffer.getvalue()))
+    return renditions
+
+
+def rendition_names(renditions):
+    for rendition, formats in (renditions or {}).items():
+        if rendition == 'source':
+            continue
+        yield from formats.values()
+
+
+def source_name(instance, field_name):
+    field_file = getattr(instance, field_name)
+    # Wartość domyślna pola (np. wspólny awatar) nie dostaje własnych wersji.
+    if not field_file or field_file.name == instance._meta.get_field(field_name).get_default():
+        return None
+    return field_file.name
+
+
+def process_renditions(model_label, pk, field_name, renditions_field):
+    model = apps.get_model(model_label)
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field_name)
+    previous = getattr(instance, renditions_field) or {}
+    name = source_name(instance, field_name)
+    if name == previous.get('source'):
+        return
+
+    renditions = {}
+    if name is not None:
+        try:
+            renditions = render_renditions(field_file)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            logger.exception("Nie udało się przetworzyć obrazu %s.", name)
+            return
+        renditions['source'] = name
+
+    # Obraz mógł zostać podmieniony w trakcie przetwarzania - wtedy wyniki są już nieaktualne.
+    # Zwalniamy je jak zastąpiony plik: zostają, jeśli ten sam obraz wskazuje inny wiersz,
+    # a świeżo zapisane pliki usunie później sweep_media.
+    current = model._default_manager.filter(pk=pk).values_list(field_name, flat=True).first()
+    if current != field_file.name:
+        release_file(field_file.storage, name, renditions)
+        return
+
+    # Poprzednie wersje zwalnia utils.storage.release_file razem z poprzednim plikiem źródłowym.
+    setattr(instance, renditions_field, renditions)
+    auto_now = [field.name for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+    instance.save(update_fields=[renditions_field, *auto_now])
+
+
+def _run_in_worker(*args):
+    close_old_connections()
+    try:
+        process_renditions(*args)
+    except Exception:
+        logger.exception("Błąd przetwarzania wersji obrazu %s.", args)
+    finally:
+        close_old_connections()
+
+
+def enqueue_renditions(*args):
+    if settings.IMAGE_PIPELINE_EAGER:
+        process_renditions(*args)
+    else:
+        get_executor().submit(_run_in_worker, *args)
+
+
+def schedule_renditions(instance, field_name, renditions_field):
+    renditions = getattr(instance, renditions_field) or {}
+    if source_name(instance, field_name) == renditions.get('source'):
+        return
+    args = (instance._meta.label, instance.pk, field_name, renditions_field)
+    transaction.on_commit(partial(enqueue_renditions, *args))
+
+
+class ImageRenditionsField(serializers.Field):
+    """Mapa ``{wersja: {format: url}}`` z zapisanych ścieżek wersji obrazu."""
+
+    def __init__(self, storage=None, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.storage = storage or default_storage
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        result = {}
+        for rendition, formats in value.items():
+            if rendition == 'source':
+                continue
+            result[rendition] = {}
+            for fmt, name in formats.items():
+                url = self.storage.url(name)
+                result[rendition][fmt] = request.build_absolute_uri(url) if request is not None else url
+        return result
@@ -0,0 +1,254 @@
+import base64
+import datetime
+import decimal
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorValueEncoder(json.JSONEncoder):
+    # DjangoJSONEncoder obcina mikrosekundy, co psułoby porównania po created_at.
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, decimal.Decimal):
+            return str(o)
+        return super().default(o)
+
+
+class PageSizeMixin:
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+
+class KeysetPagination(PageSizeMixin, BasePagination):
+    """
+    Stronicowanie kursorowe (keyset) po aktywnym porządku sortowania.
+
+    Kursor przechowuje wartości kolumn sortowania ostatniego (lub pierwszego)
+    wiersza strony, a kolejna strona jest wybierana warunkiem
+    ``(a, b, id) > (x, y, z)`` zamiast OFFSET, więc koszt strony nie rośnie
+    wraz z głębokością przewijania.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ['-created_at']
+    invalid_cursor_message = 'Nieprawidłowy kursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = bool(self.cursor and self.cursor['r'])
+        ordering = [self._flip(field) for field in self.ordering] if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self._position_filter(ordering, self.cursor['v']))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = [ordering]
+
+        keys = []
+        for field in ordering:
+            if field.lstrip('-') in ('id', 'pk'):
+                break
+            keys.append(field)
+        tiebreaker = '-pk' if keys and keys[0].startswith('-') else 'pk'
+        return keys + [tiebreaker]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, obj, reverse):
+        payload = {
+            'o': self.ordering,
+            'v': [self._value(obj, field) for field in self.ordering],
+            'r': int(reverse),
+        }
+        raw = json.dumps(payload, cls=CursorValueEncoder, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            cursor = {'o': list(payload['o']), 'v': list(payload['v']), 'r': int(payload['r'])}
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if cursor['o'] != self.ordering or len(cursor['v']) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def _position_filter(self, ordering, values):
+        first = ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        position = Q()
+        for index, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clause = Q(**{f'{field.lstrip("-")}__{lookup}': values[index]})
+            for previous, value in zip(ordering[:index], values):
+                clause &= Q(**{previous.lstrip('-'): value})
+            position |= clause
+        return Q(**{f'{first.lstrip("-")}__{bound}': values[0]}) & position
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _value(obj, field):
+        # Wiersze z values() mają klucze w postaci pełnych ścieżek, np. "pk" lub "category__name".
+        if isinstance(obj, dict):
+            return obj[field.lstrip('-')]
+        value = obj
+        for attr in field.lstrip('-').split('__'):
+            value = getattr(value, attr)
+        return value
+
+
+class IdCursorPagination(PageSizeMixin, BasePagination):
+    """
+    Stronicowanie po identyfikatorze z kursorami ``before``/``after``.
+
+    Odpowiedź pozostaje listą (od najnowszych), a odnośniki do starszej
+    i nowszej strony są zwracane w nagłówku ``Link``. ``?after=<id>``
+    pozwala pobrać tylko wiadomości nowsze od ostatnio widzianej.
+    """
+    before_query_param = 'before'
+    after_query_param = 'after'
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 200
+    invalid_cursor_message = 'Nieprawidłowy kursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.before = self._cursor(request, self.before_query_param)
+        self.after = self._cursor(request, self.after_query_param)
+
+        if self.before is not None:
+            queryset = queryset.filter(pk__lt=self.before)
+        if self.after is not None:
+            queryset = queryset.filter(pk__gt=self.after).order_by('pk')
+        else:
+            queryset = queryset.order_by('-pk')
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.after is not None:
+            results.reverse()
+            self.has_older = True
+        else:
+            self.has_older = has_more
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        links = []
+        previous_link = self.get_previous_link()
+        next_link = self.get_next_link()
+        if previous_link:
+            links.append(f'<{previous_link}>; rel="previous"')
+        if next_link:
+            links.append(f'<{next_link}>; rel="next"')
+        headers = {'Link': ', '.join(links)} if links else None
+        return Response(data, headers=headers)
+
+    def get_paginated_response_schema(self, schema):
+        return schema
+
+    def get_previous_link(self):
+        if not self.page or not self.has_older:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.after_query_param)
+        return replace_query_param(url, self.before_query_param, self.page[-1].pk)
+
+    def get_next_link(self):
+        if not self.page:
+            if self.after is None:
+                return None
+            return self.request.build_absolute_uri()
+        url = remove_query_param(self.request.build_absolute_uri(), self.before_query_param)
+        return replace_query_param(url, self.after_query_param, self.page[0].pk)
+
+    def _cursor(self, request, param):
+        value = request.query_params.get(param)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,71 @@
+from rest_framework.exceptions import ValidationError
+
+SAFE_READ_METHODS = ('GET', 'HEAD')
+
+
+class SparseFieldsSerializerMixin:
+    """Serializer przyjmuje ``fields=[...]`` i usuwa pozostałe pola."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsViewMixin:
+    """
+    Obsługa ``?fields=a,b`` i ``?omit=c`` dla odczytu. Wybrane pola zawężają
+    zarówno odpowiedź, jak i listę kolumn w ``only()``; kolumny sortowania
+    paginatora są dołączane zawsze, żeby kursor nie doczytywał wierszy.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    # None oznacza wszystkie pola z Meta.fields serializera.
+    default_fields = None
+
+    def get_requested_fields(self):
+        if hasattr(self, '_requested_fields'):
+            return self._requested_fields
+
+        available = list(self.get_serializer_class().Meta.fields)
+        fields = self._split_param(self.fields_query_param) or list(self.default_fields or available)
+        omit = self._split_param(self.omit_query_param)
+        unknown = sorted((set(fields) | set(omit)) - set(available))
+        if unknown:
+            raise ValidationError({"fields": f"Nieznane pola: {', '.join(unknown)}."})
+
+        self._requested_fields = [name for name in available if name in fields and name not in omit]
+        return self._requested_fields
+
+    def is_sparse_request(self):
+        return self.request.method in SAFE_READ_METHODS
+
+    def use_sparse_queryset(self):
+        return self.is_sparse_request()
+
+    def get_serializer(self, *args, **kwargs):
+        if self.is_sparse_request():
+            kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.use_sparse_queryset():
+            return queryset
+        return queryset.only(*self.get_only_columns(queryset))
+
+    def get_only_columns(self, queryset):
+        opts = queryset.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+        columns = [opts.pk.name]
+        columns += [name for name in self.get_requested_fields() if name in concrete]
+        paginator = self.paginator
+        if paginator is not None and hasattr(paginator, 'get_ordering'):
+            ordering = paginator.get_ordering(self.request, queryset, self)
+            columns += [field.lstrip('-') for field in ordering if field.lstrip('-') in concrete]
+        return list(dict.fromkeys(columns))
+
+    def _split_param(self, name):
+        value = self.request.query_params.get(name, '')
+        return [part.strip() for part in value.split(',') if part.strip()]
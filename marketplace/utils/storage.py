@@ -0,0 +1,203 @@
+import hashlib
+import os
+import posixpath
+import re
+import time
+import uuid
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+CONTENT_ADDRESSED_NAME = re.compile(r'(?:^|/)([0-9a-f]{2})/([0-9a-f]{64})(?:\.[A-Za-z0-9]+)?$')
+TRASH_SUFFIX = '.deleting'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Nazwa pliku to skrót SHA-256 jego zawartości, np. ``ads/images/ab/ab12…ef.jpg``.
+    Identyczne pliki zapisują się raz, a treść pod daną nazwą nigdy się nie
+    zmienia, więc może być cache'owana bez terminu ważności.
+    """
+    hash_chunk_size = 64 * 1024
+
+    def __init__(self, **kwargs):
+        # Równoległy zapis tej samej treści nadpisuje plik identycznymi bajtami.
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.touch(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def touch(self, name):
+        # Świeży czas modyfikacji chroni istniejący plik przed równoległym delete_unless_recent.
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete_unless_recent(self, name, grace):
+        """
+        Usuwa plik, o ile nie był użyty w ciągu ostatnich ``grace`` sekund.
+        Plik jest najpierw przenoszony pod tymczasową nazwę: zapis tej samej
+        treści przed przeniesieniem odświeża czas modyfikacji (plik wraca na
+        miejsce), a po przeniesieniu nie znajduje pliku i zapisuje go od nowa.
+        """
+        path = self.path(name)
+        trash = f'{path}.{uuid.uuid4().hex}{TRASH_SUFFIX}'
+        try:
+            os.replace(path, trash)
+        except FileNotFoundError:
+            return False
+        if time.time() - os.stat(trash).st_mtime < grace:
+            os.replace(trash, path)
+            return False
+        os.remove(trash)
+        return True
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(self.hash_chunk_size):
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        checksum = digest.hexdigest()
+        directory, filename = posixpath.split(str(name).replace('\\', '/'))
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(directory, checksum[:2], f'{checksum}{extension}')
+
+    @staticmethod
+    def is_content_addressed(name):
+        match = CONTENT_ADDRESSED_NAME.search(name)
+        return bool(match) and match.group(2).startswith(match.group(1))
+
+
+def is_referenced(name):
+    for model_label, field_names in settings.MEDIA_FILE_REFERENCES.items():
+        manager = apps.get_model(model_label)._default_manager
+        if any(manager.filter(**{field_name: name}).exists() for field_name in field_names):
+            return True
+    return False
+
+
+def release_file(storage, name, renditions=None):
+    """
+    Usuwa plik (i jego wersje), gdy nie wskazuje na niego już żaden wiersz
+    z MEDIA_FILE_REFERENCES. Licznik referencji wynika z zapytań, więc nie
+    rozjeżdża się z danymi; wersje obrazu dzielą los pliku źródłowego.
+    Pliki użyte w ciągu MEDIA_RELEASE_GRACE_SECONDS zostają dla sweep_media.
+    """
+    from .images import rendition_names
+
+    if not name or is_referenced(name):
+        return False
+    grace = settings.MEDIA_RELEASE_GRACE_SECONDS
+    if not delete_stored_file(storage, name, grace):
+        return False
+    for rendition in rendition_names(renditions):
+        delete_stored_file(storage, rendition, grace)
+    return True
+
+
+def delete_stored_file(storage, name, grace):
+    if isinstance(storage, ContentAddressedStorage):
+        return storage.delete_unless_recent(name, grace)
+    storage.delete(name)
+    return True
+
+
+def referenced_names():
+    """Nazwy plików wskazywane przez wiersze MEDIA_FILE_REFERENCES, łącznie z ich wersjami."""
+    from .images import rendition_names
+
+    names = set()
+    for model_label, field_names in settings.MEDIA_FILE_REFERENCES.items():
+        model = apps.get_model(model_label)
+        for field_name in field_names:
+            renditions_field = f'{field_name}_renditions'
+            columns = [field_name]
+            if any(field.name == renditions_field for field in model._meta.concrete_fields):
+                columns.append(renditions_field)
+            for row in model._default_manager.values_list(*columns).iterator(chunk_size=2000):
+                names.add(row[0])
+                if len(row) > 1:
+                    names.update(rendition_names(row[1]))
+    names.discard(None)
+    names.discard('')
+    return names
+
+
+def sweep_unreferenced_files(storage, grace, directory=''):
+    """
+    Usuwa pliki adresowane treścią, których nie wskazuje żaden wiersz i które
+    nie były używane przez ``grace`` sekund, oraz pozostałości po przerwanym
+    usuwaniu. Zwraca liczbę usuniętych plików.
+    """
+    referenced = referenced_names()
+    deleted = 0
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            directories, files = storage.listdir(current)
+        except FileNotFoundError:
+            continue
+        pending.extend(posixpath.join(current, name) for name in directories)
+        for filename in files:
+            name = posixpath.join(current, filename)
+            if filename.endswith(TRASH_SUFFIX):
+                if time.time() - os.stat(storage.path(name)).st_mtime >= grace:
+                    storage.delete(name)
+                    deleted += 1
+            elif storage.is_content_addressed(name) and name not in referenced:
+                deleted += storage.delete_unless_recent(name, grace)
+    return deleted
+
+
+def stored_name(instance, field_name):
+    # Bez dostępu przez deskryptor - pole odroczone (only()) nie jest doczytywane.
+    value = instance.__dict__.get(field_name)
+    return getattr(value, 'name', value) or None
+
+
+def remember_file(instance, field_name, renditions_field):
+    instance._stored_files = getattr(instance, '_stored_files', {})
+    if field_name in instance.__dict__:
+        instance._stored_files[field_name] = (
+            stored_name(instance, field_name), instance.__dict__.get(renditions_field),
+        )
+
+
+def release_replaced_file(instance, field_name, renditions_field, created=False):
+    previous, renditions = getattr(instance, '_stored_files', {}).get(field_name, (None, None))
+    remember_file(instance, field_name, renditions_field)
+    # Dla nowego wiersza zapamiętana wartość to nazwa przesłanego pliku, a nie plik w magazynie.
+    if created or previous is None or previous == stored_name(instance, field_name) or is_default(instance, field_name, previous):
+        return
+    storage = instance._meta.get_field(field_name).storage
+    transaction.on_commit(partial(release_file, storage, previous, renditions))
+
+
+def release_deleted_file(instance, field_name, renditions_field):
+    name = stored_name(instance, field_name)
+    if name is None or is_default(instance, field_name, name):
+        return
+    storage = instance._meta.get_field(field_name).storage
+    transaction.on_commit(partial(release_file, storage, name, instance.__dict__.get(renditions_field)))
+
+
+def is_default(instance, field_name, name):
+    return name == instance._meta.get_field(field_name).get_default()
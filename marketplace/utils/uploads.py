@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# Sygnatury (magic bytes) obsługiwanych formatów obrazów: (przesunięcie, bajty).
+IMAGE_SIGNATURES = [
+    [(0, b'\xff\xd8\xff')],                            # JPEG
+    [(0, b'\x89PNG\r\n\x1a\n')],                       # PNG
+    [(0, b'GIF87a')],                                  # GIF
+    [(0, b'GIF89a')],
+    [(0, b'RIFF'), (8, b'WEBP')],                      # WebP
+]
+SIGNATURE_LENGTH = 12
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Przesłany plik jest zbyt duży."
+    default_code = 'upload_too_large'
+
+
+class UnsupportedUpload(APIException):
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    default_detail = "Nieobsługiwany format pliku. Dozwolone są obrazy JPEG, PNG, GIF i WebP."
+    default_code = 'unsupported_upload'
+
+
+def matches_signature(header, signatures):
+    return any(
+        all(header[offset:offset + len(magic)] == magic for offset, magic in signature)
+        for signature in signatures
+    )
+
+
+class LimitedUploadHandler(FileUploadHandler):
+    """
+    Pierwszy w łańcuchu handler plików: przerywa odbiór żądania, zanim zostanie
+    zbuforowane, gdy Content-Length lub liczba odebranych bajtów przekracza
+    MAX_UPLOAD_SIZE albo początek pliku nie pasuje do sygnatur obrazów.
+    Dane przekazuje dalej bez kopiowania, zapis zostaje domyślnym handlerom.
+    ``signatures = None`` wyłącza sprawdzanie sygnatur (pliki nie będące obrazami).
+    """
+    signatures = IMAGE_SIGNATURES
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size if max_size is not None else settings.MAX_UPLOAD_SIZE
+
+    def too_large(self):
+        megabytes = self.max_size / (1024 * 1024)
+        return UploadTooLarge(f"Przesłany plik jest zbyt duży. Maksymalny rozmiar to {megabytes:g} MB.")
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > self.max_size + settings.MAX_UPLOAD_REQUEST_OVERHEAD:
+            raise self.too_large()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            raise self.too_large()
+        if self.signatures is not None and len(self.header) < SIGNATURE_LENGTH:
+            self.header += raw_data[:SIGNATURE_LENGTH - len(self.header)]
+            if len(self.header) >= SIGNATURE_LENGTH and not matches_signature(self.header, self.signatures):
+                raise UnsupportedUpload()
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.signatures is None:
+            return None
+        if len(self.header) < SIGNATURE_LENGTH and not matches_signature(self.header, self.signatures):
+            raise UnsupportedUpload()
+        return None
+
+
+class LimitedReader:
+    """
+    Strumień ciała żądania z limitem odebranych bajtów. Content-Length nie
+    wystarcza - żądanie ``Transfer-Encoding: chunked`` albo bez nagłówka
+    jest czytane do końca, więc liczymy bajty przy każdym ``read()``.
+    """
+
+    def __init__(self, stream, max_size, too_large):
+        self.stream = stream
+        self.max_size = max_size
+        self.too_large = too_large
+        self.received = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.received += len(data)
+        if self.received > self.max_size:
+            raise self.too_large()
+        return data
+
+
+class LimitedUploadMixin:
+    upload_handler_class = LimitedUploadHandler
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Przed uwierzytelnieniem i parsowaniem - później Django nie pozwala zmienić handlerów.
+        request.upload_handlers.insert(0, self.upload_handler_class(request))
+        return super().initialize_request(request, *args, **kwargs)